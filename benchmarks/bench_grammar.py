@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+文法分析基准测试
+语料：
+    textbook: utils/Class_*_GrammarAnalysis.py 中 __main__ 部分的教材文法（按源码解析，不执行）
+    expr:     n 级优先级的表达式文法（左递归）        E0->E0+E1|E1 ... En->(E0)|i
+    expr_ll:  n 级优先级的表达式文法（消除左递归后） E0->E1G0, G0->+E1G0|ε ...
+    chain:    长度为 n 的非终结符链                  A->B|aB, B->C|bC, ...
+    wide:     n 个候选式                             S->aS|bS|...|ε
+    epsilon:  n 个可推空的非终结符                   S->ABC..., A->aA|ε, ...
+对每个文法、每种算法分别计时 init() 的各个 stepN_* 阶段（多次运行取总时间最短的一次），
+单独运行一次 init() 用 tracemalloc 记录内存峰值，并用随机句子计时 solve()
+结果以 JSON 输出，可保存后与其他提交的结果比较：
+    python benchmarks/bench_grammar.py > new.json
+    python benchmarks/bench_grammar.py --compare old.json
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.Class_LL1_GrammarAnalysis import LL1  # noqa: E402
+from utils.Class_LR0_GrammarAnalysis import LR0  # noqa: E402
+from utils.Class_SLR1_GrammarAnalysis import SLR1  # noqa: E402
+from utils.Class_LR1_GrammarAnalysis import LR1  # noqa: E402
+from utils.Grammar_Sampler import SentenceSampler  # noqa: E402
+
+ANALYZERS = {
+    'll1': (LL1, 'isLL1'),
+    'lr0': (LR0, 'isLR0'),
+    'slr1': (SLR1, 'isSLR1'),
+    'lr1': (LR1, 'isLR1'),
+}
+
+FAMILIES = ('textbook', 'expr', 'expr_ll', 'chain', 'wide', 'epsilon')
+
+NONTERMINALS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# 可作终结符的单个字符（不含产生式中的分隔符、结束符 # 和 ε）
+TERMINALS = "abcdefghijklmnopqrstuvwxyz0123456789+*/%&^~!?@$;:,.=<([{"
+
+MIN_COMPARE_SECONDS = 0.001
+
+
+def textbook_grammars():
+    """utils/Class_*_GrammarAnalysis.py 中 __main__ 部分的文法，按内容去重：[(名称, 产生式), ...]"""
+    grammars = {}
+    for name in ('LL1', 'LR0', 'SLR1', 'LR1'):
+        path = os.path.join(ROOT, 'utils', f'Class_{name}_GrammarAnalysis.py')
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            if not (isinstance(node, ast.If) and "__main__" in ast.unparse(node.test)):
+                continue
+            for stmt in node.body:
+                if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.List) \
+                        and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id.startswith('grammar'):
+                    productions = tuple(ast.literal_eval(stmt.value))
+                    label = f"{name}.{stmt.targets[0].id}"
+                    while label in grammars.values():  # 同一文件中同名变量被重新赋值
+                        label += "'"
+                    grammars.setdefault(productions, label)
+    return [(label, list(productions)) for productions, label in grammars.items()]
+
+
+def expr_grammar(n):
+    """n 级优先级的左递归表达式文法，n <= 25"""
+    if n + 1 > len(NONTERMINALS):
+        return None
+    grammar = [f"{NONTERMINALS[k]}->{NONTERMINALS[k]}{TERMINALS[10 + k]}{NONTERMINALS[k + 1]}|{NONTERMINALS[k + 1]}"
+               for k in range(n)]
+    return grammar + [f"{NONTERMINALS[n]}->({NONTERMINALS[0]})|i"]
+
+
+def expr_ll_grammar(n):
+    """n 级优先级的右递归表达式文法（LL(1)），n <= 12"""
+    if 2 * n + 1 > len(NONTERMINALS):
+        return None
+    level = NONTERMINALS[:n + 1]
+    rest = NONTERMINALS[n + 1:]
+    grammar = []
+    for k in range(n):
+        grammar += [f"{level[k]}->{level[k + 1]}{rest[k]}",
+                    f"{rest[k]}->{TERMINALS[10 + k]}{level[k + 1]}{rest[k]}|ε"]
+    return grammar + [f"{level[n]}->({level[0]})|i"]
+
+
+def chain_grammar(n):
+    """长度为 n 的非终结符链，n <= 26"""
+    if n > len(NONTERMINALS):
+        return None
+    grammar = [f"{NONTERMINALS[k]}->{NONTERMINALS[k + 1]}|{TERMINALS[k]}{NONTERMINALS[k + 1]}" for k in range(n - 1)]
+    return grammar + [f"{NONTERMINALS[n - 1]}->{TERMINALS[n - 1]}"]
+
+
+def wide_grammar(n):
+    """n 个候选式的文法"""
+    if n > len(TERMINALS):
+        return None
+    return ["S->" + "|".join(f"{TERMINALS[k]}S" for k in range(n)) + "|ε"]
+
+
+def epsilon_grammar(n):
+    """n 个可推空的非终结符依次连接，n <= 25"""
+    if n + 1 > len(NONTERMINALS):
+        return None
+    symbols = NONTERMINALS[1:n + 1]
+    return [f"A->{symbols}"] + [f"{v}->{TERMINALS[k]}{v}|ε" for k, v in enumerate(symbols)]
+
+
+SCALED = {
+    'expr': expr_grammar,
+    'expr_ll': expr_ll_grammar,
+    'chain': chain_grammar,
+    'wide': wide_grammar,
+    'epsilon': epsilon_grammar,
+}
+
+
+def corpus(families, sizes):
+    """[(名称, 族, 规模, 产生式), ...]，超出单字符符号上限的规模跳过"""
+    cases = []
+    for family in families:
+        if family == 'textbook':
+            cases += [(label, family, None, grammar) for label, grammar in textbook_grammars()]
+            continue
+        for n in sizes:
+            grammar = SCALED[family](n)
+            if grammar is not None:
+                cases.append((f"{family}-{n}", family, n, grammar))
+    return cases
+
+
+class Timeout(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """限制运行时间（LL1 在部分文法上不会终止），没有 SIGALRM 的平台上不限制"""
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def handler(signum, frame):
+        raise Timeout()
+    old = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+def timed_init(cls, grammar):
+    """运行一次 init()，返回 (分析器, {阶段: 秒}, 总秒数)；各 stepN_* 用实例属性包装计时"""
+    analyzer = cls(list(grammar))
+    phases = {}
+
+    def timed(name, step):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return step(*args, **kwargs)
+            finally:
+                phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+        return wrapper
+    steps = [name for name in dir(cls) if name.startswith('step')]
+    for name in steps:  # 实例属性覆盖类方法，init() 结束后去掉
+        setattr(analyzer, name, timed(name, getattr(analyzer, name)))
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # 分析器会打印DFA等信息
+            analyzer.init()
+        return analyzer, phases, time.perf_counter() - start
+    finally:
+        for name in steps:
+            delattr(analyzer, name)
+
+
+def peak_memory(cls, grammar):
+    """init() 期间的内存峰值（字节）"""
+    tracemalloc.start()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            cls(list(grammar)).init()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def parse_inputs(grammar, length, count):
+    sampler = SentenceSampler(grammar, length + 8, seed=0)
+    n = sampler.nearest_length(length)
+    return sampler.sentences(n, count) if n is not None else []
+
+
+def bench_case(label, family, size, grammar, algorithm, repeat, timeout, inputs):
+    cls, flag = ANALYZERS[algorithm]
+    result = {"grammar": label, "family": family, "size": size, "algorithm": algorithm,
+              "productions": len(grammar)}
+    try:
+        with time_limit(timeout):
+            best = None
+            for _ in range(repeat):
+                analyzer, phases, total = timed_init(cls, grammar)
+                if best is None or total < best[2]:
+                    best = (analyzer, phases, total)
+            analyzer, phases, total = best
+            result["init"] = total
+            result["phases"] = phases
+            result["other"] = max(0.0, total - sum(phases.values()))  # 打印DFA等不在 stepN_* 中的部分
+            result["peakBytes"] = peak_memory(cls, grammar)
+            if hasattr(analyzer, 'all_DFA'):
+                result["states"] = len(analyzer.all_DFA)
+            result["accepted"] = bool(getattr(analyzer, flag))
+            if result["accepted"] and inputs:
+                start = time.perf_counter()
+                for s in inputs:
+                    analyzer.solve(s, 'none')
+                result["parse"] = {"inputs": len(inputs), "chars": sum(map(len, inputs)),
+                                   "seconds": time.perf_counter() - start}
+    except Timeout:
+        result["error"] = f"timeout after {timeout}s"
+    except Exception as e:  # 如LL1遇到左递归
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new, threshold):
+    """按 (文法, 算法) 比较 init 时间，返回变慢超过 threshold 倍的项（不到 MIN_COMPARE_SECONDS 的计时误差大，不比较）"""
+    before = {(r["grammar"], r["algorithm"]): r for r in old["results"] if "init" in r}
+    slower = []
+    for r in new["results"]:
+        o = before.get((r["grammar"], r["algorithm"]))
+        if o is not None and "init" in r and max(o["init"], r["init"]) >= MIN_COMPARE_SECONDS:
+            ratio = r["init"] / o["init"]
+            if ratio > threshold:
+                slower.append({"grammar": r["grammar"], "algorithm": r["algorithm"],
+                               "before": o["init"], "after": r["init"], "ratio": round(ratio, 2)})
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文法分析基准测试，结果以 JSON 输出")
+    parser.add_argument("--algorithms", default="ll1,lr0,slr1", help="逗号分隔，可选 ll1,lr0,slr1,lr1")
+    parser.add_argument("--families", default=",".join(FAMILIES), help=f"逗号分隔，可选 {','.join(FAMILIES)}")
+    parser.add_argument("--sizes", default="4,8,12,24", help="合成文法的规模，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每项 init() 运行次数，取最小值")
+    parser.add_argument("--timeout", type=float, default=5, help="每项的时间上限（秒）")
+    parser.add_argument("--input-length", type=int, default=50, help="solve() 计时所用句子的长度")
+    parser.add_argument("--inputs", type=int, default=20, help="solve() 计时所用句子的个数，0 时不计时")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="与之前保存的结果比较，输出变慢的项")
+    parser.add_argument("--threshold", type=float, default=1.5, help="比较时视为变慢的倍数")
+    args = parser.parse_args()
+
+    algorithms = [a for a in args.algorithms.split(",") if a]
+    families = [f for f in args.families.split(",") if f]
+    for name in algorithms:
+        if name not in ANALYZERS:
+            parser.error(f"不支持的算法: {name}")
+    for name in families:
+        if name not in FAMILIES:
+            parser.error(f"不支持的文法族: {name}")
+    sizes = [int(n) for n in args.sizes.split(",") if n]
+
+    results = []
+    for label, family, size, grammar in corpus(families, sizes):
+        inputs = parse_inputs(grammar, args.input_length, args.inputs) if args.inputs else []
+        for algorithm in algorithms:
+            results.append(bench_case(label, family, size, grammar, algorithm, args.repeat, args.timeout, inputs))
+            print(f"[bench] {label} {algorithm}", file=sys.stderr)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "results": results
+    }
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report["slower"] = compare(json.load(f), report, args.threshold)
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+    print()
+    return 1 if report.get("slower") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+响应序列化基准测试
+对大的自动机（接口返回的 data）比较三种序列化方式的吞吐量（字节/秒）：
+    flask:  原来的 jsonify（标准库 json，ensure_ascii、sort_keys，得到字符串后再编码为 UTF-8）
+    stdlib: services/json_response.py 未安装 orjson 时的路径
+    orjson: services/json_response.py 使用 orjson 的路径
+语料：
+    slr1/lr1: n 级优先级的表达式文法（benchmarks/bench_grammar.py 的 expr 族）的 SLR1、LR1 分析结果
+    regex:    (a|b)*a(a|b)...(a|b)，第 n 个字符为 a 的串，DFA 有 2^n 个状态
+结果以 JSON 输出：
+    python benchmarks/bench_json.py --sizes 4,8,12 --regex-sizes 4,6
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import services.json_response as json_response  # noqa: E402
+from bench_grammar import expr_grammar, git_commit  # noqa: E402
+from services.analysis_data import ANALYSIS_DATA, analyzer_options  # noqa: E402
+from services.fa_service import regex_to_dfam  # noqa: E402
+from services.grammar_cache import build_analyzer  # noqa: E402
+
+
+def flask_dumps(obj):
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(",", ":")).encode('utf-8')
+
+
+def stdlib_dumps(obj):
+    orjson, json_response.orjson = json_response.orjson, None
+    try:
+        return json_response.dumps_bytes(obj)
+    finally:
+        json_response.orjson = orjson
+
+
+ENCODERS = {
+    'flask': flask_dumps,
+    'stdlib': stdlib_dumps,
+    'orjson': json_response.dumps_bytes,
+}
+
+
+def corpus(sizes, regex_sizes):
+    """[(名称, data), ...]"""
+    cases = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # 分析器会打印DFA等信息
+        for n in sizes:
+            grammar = expr_grammar(n)
+            if grammar is None:
+                continue
+            for kind in ('slr1', 'lr1'):
+                analyzer = build_analyzer(kind, grammar, analyzer_options(kind, {}))
+                if kind == 'lr1' and analyzer.over_budget:
+                    continue
+                cases.append((f"expr-{n}.{kind}", ANALYSIS_DATA[kind](analyzer)))
+        for n in regex_sizes:
+            cases.append((f"regex-{n}", regex_to_dfam("(a|b)*a" + "(a|b)" * (n - 1))))
+    return cases
+
+
+def bench(obj, encoder, repeat):
+    """多次序列化取最短时间，返回 (字节数, 秒)"""
+    best = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(encoder(obj))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return size, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="响应序列化基准测试，结果以 JSON 输出")
+    parser.add_argument("--sizes", default="4,8,12", help="表达式文法的规模，逗号分隔")
+    parser.add_argument("--regex-sizes", default="4,6,8", help="正则表达式的规模，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每项序列化次数，取最小值")
+    args = parser.parse_args()
+
+    encoders = {name: fn for name, fn in ENCODERS.items() if name != 'orjson' or json_response.orjson is not None}
+    sizes = [int(n) for n in args.sizes.split(",") if n]
+    regex_sizes = [int(n) for n in args.regex_sizes.split(",") if n]
+
+    results = []
+    for label, data in corpus(sizes, regex_sizes):
+        result = {"case": label, "encoders": {}}
+        for name, encoder in encoders.items():
+            size, seconds = bench(data, encoder, args.repeat)
+            result["encoders"][name] = {"bytes": size, "seconds": seconds,
+                                        "mbPerSecond": round(size / seconds / 1e6, 1) if seconds else None}
+        if 'orjson' in encoders:
+            result["speedup"] = round(result["encoders"]["flask"]["seconds"] / result["encoders"]["orjson"]["seconds"], 1)
+        results.append(result)
+        print(f"[bench] {label}", file=sys.stderr)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orjson": getattr(json_response.orjson, '__version__', None),
+            "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "results": results
+    }
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@ import time
 from datetime import datetime
 from database import get_db_connection
 from blueprints.api_key import load_api_config, should_use_deepseek
-from openai import OpenAI
+from services.http_clients import get_http_session, get_openai_client
 
 ai_proxy_bp = Blueprint('ai_proxy', __name__, url_prefix='/api')
 
@@ -28,7 +28,7 @@ def get_deepseek_client():
     api_key = config.get('api_key', '')
     if not api_key:
         return None
-    return OpenAI(api_key=api_key, base_url=DEEPSEEK_BASE_URL)
+    return get_openai_client(api_key, DEEPSEEK_BASE_URL)
 
 
 def get_hunyuan_client():
@@ -37,7 +37,7 @@ def get_hunyuan_client():
     api_key = config.get('hunyuan_api_key', '')
     if not api_key:
         return None
-    return OpenAI(api_key=api_key, base_url=HUNYUAN_BASE_URL)
+    return get_openai_client(api_key, HUNYUAN_BASE_URL)
 
 
 def get_available_client():
@@ -468,7 +468,7 @@ def get_balance_proxy():
         }), 500
     
     try:
-        response = requests.get(
+        response = get_http_session().get(
             'https://api.deepseek.com/user/balance',
             headers={
                 'Accept': 'application/json',
@@ -10,6 +10,7 @@ from flask import Blueprint, request, jsonify
 import hashlib
 import requests
 from database import get_db_connection
+from services.http_clients import get_http_session
 
 api_key_bp = Blueprint('api_key', __name__, url_prefix='/api')
 
@@ -32,7 +33,7 @@ def _validate_deepseek_key(api_key: str) -> tuple[bool, str]:
         return False, "API 密钥格式不正确，应以 'sk-' 开头"
 
     try:
-        response = requests.get(
+        response = get_http_session().get(
             'https://api.deepseek.com/user/balance',
             headers={
                 'Accept': 'application/json',
@@ -256,7 +257,7 @@ def get_deepseek_balance(api_key: str) -> tuple[bool, float, str]:
         return False, 0.0, "API Key 未配置"
     
     try:
-        response = requests.get(
+        response = get_http_session().get(
             'https://api.deepseek.com/user/balance',
             headers={
                 'Accept': 'application/json',
@@ -2,45 +2,37 @@
 FA (Finite Automaton) 有限自动机相关接口蓝图
 包含正则表达式转 NFA、DFA、最小化 DFA 等功能
 """
-from flask import Blueprint, request, jsonify
-from bidict import bidict
-import utils.Regex_to_DFAM as RF
+from flask import Blueprint
+from services.executor import run_cpu
+from services.catalog_service import catalog_regex
+from services.fa_service import cache_result, cached_result, regex_to_dfam
+from services.http_cache import etag_response, regex_etag, request_params
 
 fa_bp = Blueprint('fa', __name__, url_prefix='/api')
 
 
-@fa_bp.route('/Regex_to_DFAM', methods=['POST'])
+@fa_bp.route('/Regex_to_DFAM', methods=['GET', 'POST'])
 def Regex_to_DFAM():
-    """正则表达式转 NFA/DFA/最小化DFA"""
-    data = request.get_json()
+    """正则表达式转 NFA/DFA/最小化DFA（GET 时正则表达式作为查询参数 inpRegex，结果带 ETag，可协商缓存）"""
+    data = request_params()
     regex = data.get('inpRegex')
-    
-    if RF.is_valid_regex(regex):
-        RF.all_validate_State = {}
-        RF.nfa_state_id_map = bidict()
-        RF.State._id_counter = 0
 
-        regex, cins = RF.insert_concatenation(regex)
-        profix = RF.shunt(regex)
-        nfa, NFA_dot_str = RF.Regex_to_NFA(profix)
-        table, table_to_num, initial_states, termination_states, transition_map, DFA_dot_str = RF.NFA_to_DFA(nfa, cins)
-        P, P_change, table_to_num_min, Min_DFA_dot_str = RF.Min_DFA(table_to_num, initial_states, termination_states, transition_map, cins)
-
-        return jsonify({
-            "code": 0,
-            "data": {
-                'table': table,  # NFA->DFA 的 转换表（子集法）
-                'table_to_num': table_to_num,  # NFA->DFA 的 状态转换表
-                'table_to_num_min': table_to_num_min,  # 最小化DFA 的 状态转换表
-                'P': P,  # 最小化DFA 的 结果
-                'P_change': P_change,  # 最小化DFA的结果 的 迭代过程
-                'NFA_dot_str': NFA_dot_str,  # 绘制NFA的dot
-                'DFA_dot_str': DFA_dot_str,  # 绘制DFA的dot
-                'Min_DFA_dot_str': Min_DFA_dot_str,  # 绘制最小化DFA的dot
+    def build():
+        result = catalog_regex(regex)  # 教材中的正则表达式直接返回预先计算的结果
+        if result is None and isinstance(regex, str):
+            result = cached_result(regex)
+        if result is None:
+            result = run_cpu(regex_to_dfam, regex)  # 在计算子进程中执行
+            if result is not None:
+                cache_result(regex, result)
+        if result is not None:
+            return {
+                "code": 0,
+                "data": result
+            }
+        else:
+            return {
+                "code": 1,
+                "message": "不合规的正则表达式，请重新输入！"
             }
-        }), 200
-    else:
-        return jsonify({
-            "code": 1,
-            "message": "不合规的正则表达式，请重新输入！"
-        }), 200
+    return etag_response(regex_etag(regex), build)
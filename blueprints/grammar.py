@@ -0,0 +1,255 @@
+"""
+文法编辑相关接口蓝图
+包含 增量文法分析功能（逐条编辑产生式时只提交修改）、多算法统一分析、文法变换、分析程序生成、随机句子生成、
+按单词书写的文法分析功能
+"""
+from flask import Blueprint, Response, request, jsonify
+from services.analysis_data import ANALYSIS_DATA, analyzer_options, check_analyzer_params, lr1_over_budget_message
+from services.codegen_service import parser_source
+from services.grammar_cache import get_analyzer, grammar_hash, normalize_productions
+from services.incremental_service import BaseNotFound, DiffError, reanalyse, reanalyse_info
+from services.sample_service import check_sample_params, sample_grammar
+from services.token_service import analyse_tokens, check_token_params, parse_definitions
+from services.transform_service import check_transform_params, transform_grammar
+from services.unified_service import analyse_all, parse_algorithms
+from utils.Grammar_Tokens import TokenGrammarError
+from utils.Grammar_Transform import NAMING_PRIME, OPERATIONS, TransformError
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
+
+grammar_bp = Blueprint('grammar', __name__, url_prefix='/api/grammar')
+
+
+@grammar_bp.route('/incremental', methods=['POST'])
+def incremental_analyse():
+    """
+    增量文法分析
+    请求: {"algorithm": "slr1", "baseHash": 修改前文法的哈希, "diff": [修改...],
+          "inpProductions": 修改后的完整产生式（可选，找不到修改前的文法时使用）}
+    首次分析时只提交 inpProductions，返回的 grammarHash 作为下一次修改的 baseHash
+    """
+    data = request.get_json()
+    kind = data.get('algorithm')
+    if kind not in ANALYSIS_DATA:
+        return jsonify({
+            "code": 1,
+            "message": f"algorithm 必须是 {', '.join(ANALYSIS_DATA)} 之一"
+        }), 200
+    error = check_analyzer_params(kind, data)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    options = analyzer_options(kind, data)
+    try:
+        analyzer, productions, mode = reanalyse(kind, data.get('baseHash'), data.get('diff') or [],
+                                                data.get('inpProductions'), **options)
+    except DiffError as e:
+        return jsonify({
+            "code": 1,
+            "message": str(e)
+        }), 200
+    except BaseNotFound:
+        return jsonify({
+            "code": 2,
+            "message": "修改前的文法已失效，请提交完整的产生式（inpProductions）"
+        }), 200
+    if kind == 'lr1' and analyzer.over_budget:
+        return jsonify({
+            "code": 1,
+            "message": lr1_over_budget_message(analyzer)
+        }), 200
+
+    result = reanalyse_info(analyzer, productions, mode)
+    result["analysis"] = ANALYSIS_DATA[kind](analyzer)
+    return jsonify({
+        "code": 0,
+        "data": result
+    }), 200
+
+
+@grammar_bp.route('/analyse', methods=['POST'])
+def unified_analyse():
+    """
+    多算法统一分析：/api/grammar/analyse?algorithms=ll1,lr0,slr1,lalr1
+    请求: {"inpProductions": [...], "algorithms": 可选，与查询参数二选一, "prune": 可选，构造前删除无用符号}
+    返回各算法的分析结果，格式与单独分析的接口相同
+    """
+    data = request.get_json()
+    try:
+        algorithms = parse_algorithms(request.args.get('algorithms') or data.get('algorithms') or '')
+    except ValueError as e:
+        return jsonify({
+            "code": 1,
+            "message": str(e)
+        }), 200
+    text_list = data.get('inpProductions')
+    if not isinstance(text_list, list) or not normalize_productions(text_list):
+        return jsonify({
+            "code": 1,
+            "message": "缺少 inpProductions"
+        }), 200
+
+    return jsonify({
+        "code": 0,
+        "data": analyse_all(text_list, algorithms, bool(data.get('prune')))
+    }), 200
+
+
+@grammar_bp.route('/transform', methods=['POST'])
+def transform():
+    """
+    文法变换（消除左递归、提取左公因子）
+    请求: {"inpProductions": [...], "operations": ["left_recursion", "left_factoring"]（可选，按顺序执行）,
+          "naming": "prime"（新非终结符命名为 A'、A''）或 "letter"（先用未使用的大写字母）}
+    """
+    data = request.get_json()
+    text_list = data.get('inpProductions')
+    operations = data.get('operations', list(OPERATIONS))
+    naming = data.get('naming', NAMING_PRIME)
+    error = check_transform_params(operations, naming)
+    if not error and (not isinstance(text_list, list) or not normalize_productions(text_list)):
+        error = "缺少 inpProductions"
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+
+    try:
+        result = transform_grammar(text_list, operations, naming)
+    except TransformError as e:
+        return jsonify({
+            "code": 1,
+            "message": str(e)
+        }), 200
+    return jsonify({
+        "code": 0,
+        "data": result
+    }), 200
+
+
+@grammar_bp.route('/codegen', methods=['POST'])
+def codegen():
+    """
+    生成专用的 Python 分析程序（LL(1) 为递归下降程序，LR 类为表驱动程序）
+    请求: {"algorithm": "ll1"/"lr0"/"slr1"/"lr1", "inpProductions": [...],
+          "download": 可选，为真时直接返回 .py 文件, 其余参数与单独分析的接口相同（prune、lalr 等）}
+    """
+    data = request.get_json()
+    kind = data.get('algorithm')
+    if kind not in ANALYSIS_DATA:
+        return jsonify({
+            "code": 1,
+            "message": f"algorithm 必须是 {', '.join(ANALYSIS_DATA)} 之一"
+        }), 200
+    text_list = data.get('inpProductions')
+    error = "" if isinstance(text_list, list) and normalize_productions(text_list) else "缺少 inpProductions"
+    error = error or check_analyzer_params(kind, data)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    analyzer = get_analyzer(kind, text_list, **analyzer_options(kind, data))
+    if kind == 'lr1' and analyzer.over_budget:
+        return jsonify({
+            "code": 1,
+            "message": lr1_over_budget_message(analyzer)
+        }), 200
+    source = parser_source(kind, analyzer)
+    if source is None:
+        return jsonify({
+            "code": 1,
+            "message": f"文法不是{kind.upper()}文法，无法生成分析程序"
+        }), 200
+
+    filename = f"{kind}_parser.py"
+    if data.get('download'):
+        return Response(source, mimetype='text/x-python',
+                        headers={"Content-Disposition": f"attachment; filename={filename}"})
+    return jsonify({
+        "code": 0,
+        "data": {
+            "grammarHash": grammar_hash(normalize_productions(text_list)),
+            "filename": filename,
+            "source": source
+        }
+    }), 200
+
+
+@grammar_bp.route('/sample', methods=['POST'])
+def sample():
+    """
+    随机句子生成
+    请求: {"inpProductions": [...], "length": 目标长度, "count": 句子个数（默认10）,
+          "nearMisses": 近似句子个数（默认0）, "seed": 可选，随机数种子}
+    推不出目标长度的句子时使用最接近的长度（返回的 length）
+    """
+    data = request.get_json()
+    text_list = data.get('inpProductions')
+    length = data.get('length', 10)
+    count = data.get('count', 10)
+    near_misses = data.get('nearMisses', 0)
+    error = check_sample_params(length, count, near_misses)
+    if not error and (not isinstance(text_list, list) or not normalize_productions(text_list)):
+        error = "缺少 inpProductions"
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+
+    result = sample_grammar(text_list, length, count, near_misses, data.get('seed'))
+    if result["length"] is None:
+        return jsonify({
+            "code": 1,
+            "message": "该文法推不出任何句子"
+        }), 200
+    return jsonify({
+        "code": 0,
+        "data": result
+    }), 200
+
+
+@grammar_bp.route('/tokens', methods=['POST'])
+def tokens_analyse():
+    """
+    按单词书写的文法分析（多字符符号）
+    请求: {"algorithm": "slr1", "inpProductions": ["Expr -> Expr \"+\" Term | Term", ...],
+          "tokens": {"id": "[a-z][a-z0-9]*", ...} 单词类别的正则表达式,
+          "inpStrs": 可选，要分析的输入串, "trace"/"tree": 同 *AnalyseBatch, 其他分析器参数同各分析接口}
+    """
+    data = request.get_json()
+    kind = data.get('algorithm', 'slr1')
+    error = check_token_params(data)
+    if not error and kind not in ANALYSIS_DATA:
+        error = f"algorithm 必须是 {', '.join(ANALYSIS_DATA)} 之一"
+    error = error or check_analyzer_params(kind, data)
+    definitions, definitions_error = parse_definitions(data.get('tokens'))
+    error = error or definitions_error
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+
+    try:
+        result = analyse_tokens(kind, data.get('inpProductions'), definitions, data.get('inpStrs') or [],
+                                parse_trace_mode(data.get('trace', 'none')), parse_tree_format(data.get('tree')),
+                                **analyzer_options(kind, data))
+    except TokenGrammarError as e:
+        return jsonify({
+            "code": 1,
+            "message": str(e)
+        }), 200
+    if result["analysis"] is None:
+        return jsonify({
+            "code": 1,
+            "message": result["message"]
+        }), 200
+    return jsonify({
+        "code": 0,
+        "data": result
+    }), 200
@@ -0,0 +1,81 @@
+"""
+异步分析任务接口蓝图
+包含 任务提交、任务查询（轮询）、任务进度推送（SSE）功能
+"""
+import json
+import time
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from database.job_store import JOB_FINISHED, get_job
+from services.job_service import JOB_TIMEOUT, check_job_params, submit_job
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api')
+
+EVENTS_INTERVAL = 0.5  # SSE 检查任务进度的间隔（秒）
+
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    提交异步分析任务
+    请求体: {"type": "ll1|lr0|slr1|lr1|fa|batch", "params": {与对应同步接口相同的参数}}
+        batch 任务的 params 另需 algorithm（ll1/lr0/slr1/lr1）、inpStrs、trace，可选 tree（语法树格式）
+    """
+    data = request.get_json() or {}
+    job_type = data.get('type')
+    params = data.get('params')
+    error = check_job_params(job_type, params)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    job_id = submit_job(job_type, params)
+    return jsonify({
+        "code": 0,
+        "data": {
+            "job_id": job_id,
+            "status": "queued"
+        }
+    }), 200
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def query_job(job_id):
+    """查询任务状态、进度，完成后返回结果"""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({
+            "code": 1,
+            "message": "任务不存在或已过期"
+        }), 200
+    return jsonify({
+        "code": 0,
+        "data": job
+    }), 200
+
+
+@jobs_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """以 SSE 推送任务进度，任务结束时推送最终状态（含结果）后关闭"""
+
+    def events():
+        last = None
+        deadline = time.time() + JOB_TIMEOUT + 60
+        while time.time() < deadline:
+            job = get_job(job_id, with_result=False)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'message': '任务不存在或已过期'}, ensure_ascii=False)}\n\n"
+                return
+            if job['status'] in JOB_FINISHED:
+                job = get_job(job_id)
+                yield f"event: {job['status']}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                return
+            current = (job['status'], job['stage'], job['updated_at'])
+            if current != last:
+                last = current
+                yield f"event: progress\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            time.sleep(EVENTS_INTERVAL)  # gevent 下为协作式等待
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
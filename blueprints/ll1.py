@@ -1,9 +1,15 @@
 """
 LL1 语法分析相关接口蓝图
-包含 LL1 文法分析和输入串分析功能
+包含 LL1 文法分析和输入串分析、批量输入串分析功能
 """
 from flask import Blueprint, request, jsonify
-from utils.Class_LL1_GrammarAnalysis import LL1
+from services.analysis_data import ll1_data, prune_options
+from services.grammar_cache import get_analyzer
+from services.parse_service import solve_input
+from services.catalog_service import catalog_data
+from services.batch_service import analyse_batch, check_batch_inputs
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
 
 ll1_bp = Blueprint('ll1', __name__, url_prefix='/api')
 
@@ -13,42 +19,13 @@ def LL1anlyse():
     """LL1 文法分析"""
     data = request.get_json()
     text_list = data.get('inpProductions')
-    ll1 = LL1(text_list)
-    ll1.init()
-
-    # dist<str , set>类型，其中value为set类型，不好转换json，将其转为list类型
-    formulas_dict = ll1.formulas_dict
-    first = ll1.first
-    follow = ll1.follow
-    for key in formulas_dict:
-        formulas_dict[key] = list(formulas_dict[key])
-    for key in first:
-        first[key] = list(first[key])
-    for key in follow:
-        follow[key] = list(follow[key])
-
-    # dist<tuple , str>， 其中key为tuple类型，不好转换json，将其转为str类型
-    table = ll1.table
-    new_table = {}
-    for (x, y), value in table.items():
-        # 将元组键转换为字符串，这里使用 | 作为分隔符
-        new_key = f"{x}|{y}"
-        new_table[new_key] = value
-
-    data = {
-        "S": ll1.S,
-        "Vn": ll1.Vn,
-        "Vt": ll1.Vt,
-        "formulas_dict": formulas_dict,
-        "first": first,
-        "follow": follow,
-        "table": new_table,
-        "isLL1": ll1.isLL1
-    }
+    result = catalog_data('ll1', text_list, prune_options(data))  # 教材文法直接返回预先计算的结果
+    if result is None:
+        result = ll1_data(get_analyzer('ll1', text_list, **prune_options(data)))
 
     return jsonify({
         "code": 0,
-        "data": data
+        "data": result
     }), 200
 
 
@@ -58,10 +35,29 @@ def LL1AnlyseInp():
     data = request.get_json()
     text_list = data.get('inpProductions')
     inp_str = data.get('inpStr')
-    ll1 = LL1(text_list)
-    ll1.init()
-    ll1.solve(inp_str)
+    ll1 = get_analyzer('ll1', text_list, **prune_options(data))
+    info = solve_input(ll1, inp_str, parse_trace_mode(data.get('trace')), parse_tree_format(data.get('tree')))
+    return jsonify({
+        "code": 0,
+        "data": info
+    }), 200
+
+
+@ll1_bp.route('/LL1AnalyseBatch', methods=['POST'])
+def LL1AnlyseBatch():
+    """LL1 批量输入串分析（文法只构造一次）"""
+    data = request.get_json()
+    text_list = data.get('inpProductions')
+    inputs = data.get('inpStrs')
+    error = check_batch_inputs(inputs)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    result = analyse_batch('ll1', text_list, inputs, parse_trace_mode(data.get('trace', 'none')),
+                           parse_tree_format(data.get('tree')), **prune_options(data))
     return jsonify({
         "code": 0,
-        "data": ll1.info
+        "data": result
     }), 200
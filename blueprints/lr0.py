@@ -1,64 +1,67 @@
 """
 LR0 语法分析相关接口蓝图
-包含 LR0 文法分析和输入串分析功能
+包含 LR0 文法分析和输入串分析、批量输入串分析功能
 """
 from flask import Blueprint, request, jsonify
-from utils.Class_LR0_GrammarAnalysis import LR0
+from services.analysis_data import lr0_data, prune_options
+from services.grammar_cache import get_analyzer
+from services.parse_service import solve_input
+from services.catalog_service import catalog_data
+from services.http_cache import etag_response, grammar_etag, request_params
+from services.batch_service import analyse_batch, check_batch_inputs
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
 
 lr0_bp = Blueprint('lr0', __name__, url_prefix='/api')
 
 
-@lr0_bp.route('/LR0Analyse', methods=['POST'])
+@lr0_bp.route('/LR0Analyse', methods=['GET', 'POST'])
 def LR0Anlyse():
-    """LR0 文法分析"""
-    data = request.get_json()
+    """LR0 文法分析（GET 时产生式作为查询参数 inpProductions，结果带 ETag，可协商缓存）"""
+    data = request_params()
     text_list = data.get('inpProductions')
-    lr0 = LR0(text_list)
-    lr0.init()
+    options = prune_options(data)
 
-    # dist<tuple , str>， 其中key为tuple类型，不好转换json，将其转为str类型
-    actions = lr0.actions
-    gotos = lr0.gotos
-    new_actions = {}
-    new_gotos = {}
-    for (x, y), value in actions.items():
-        # 将元组键转换为字符串，这里使用 | 作为分隔符
-        new_key = f"{x}|{y}"
-        new_actions[new_key] = value
-    for (x, y), value in gotos.items():
-        # 将元组键转换为字符串，这里使用 | 作为分隔符
-        new_key = f"{x}|{y}"
-        new_gotos[new_key] = value
+    def build():
+        result = catalog_data('lr0', text_list, options)  # 教材文法直接返回预先计算的结果
+        if result is None:
+            result = lr0_data(get_analyzer('lr0', text_list, **options))
+        return {
+            "code": 0,
+            "data": result
+        }
+    return etag_response(grammar_etag('lr0', text_list, options), build)
 
-    data = {
-        "S": lr0.S,
-        "Vn": lr0.Vn,
-        "Vt": lr0.Vt,
-        "formulas_list": lr0.formulas_list,
-        "dot_items": lr0.dot_items,
-        "all_dfa": [dfa.to_dict() for dfa in lr0.all_DFA],
-        "actions": new_actions,
-        "gotos": new_gotos,
-        "isLR0": lr0.isLR0,
-        "LR0_dot_str": lr0.dot
-    }
 
+@lr0_bp.route('/LR0AnalyseInp', methods=['POST'])
+def LR0AnlyseInp():
+    """LR0 输入串分析"""
+    data = request.get_json()
+    text_list = data.get('inpProductions')
+    inp_str = data.get('inpStr')
+    lr0 = get_analyzer('lr0', text_list, **prune_options(data))
+    info = solve_input(lr0, inp_str, parse_trace_mode(data.get('trace')), parse_tree_format(data.get('tree')))
     return jsonify({
         "code": 0,
-        "data": data
+        "data": info
     }), 200
 
 
-@lr0_bp.route('/LR0AnalyseInp', methods=['POST'])
-def LR0AnlyseInp():
-    """LR0 输入串分析"""
+@lr0_bp.route('/LR0AnalyseBatch', methods=['POST'])
+def LR0AnlyseBatch():
+    """LR0 批量输入串分析（文法只构造一次）"""
     data = request.get_json()
     text_list = data.get('inpProductions')
-    inp_str = data.get('inpStr')
-    lr0 = LR0(text_list)
-    lr0.init()
-    lr0.solve(inp_str)
+    inputs = data.get('inpStrs')
+    error = check_batch_inputs(inputs)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    result = analyse_batch('lr0', text_list, inputs, parse_trace_mode(data.get('trace', 'none')),
+                           parse_tree_format(data.get('tree')), **prune_options(data))
     return jsonify({
         "code": 0,
-        "data": lr0.info
+        "data": result
     }), 200
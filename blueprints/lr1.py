@@ -0,0 +1,97 @@
+"""
+LR1 语法分析相关接口蓝图
+包含 规范LR(1)/LALR(1) 文法分析和输入串分析、批量输入串分析功能
+"""
+from flask import Blueprint, request, jsonify
+from services.analysis_data import check_lr1_params, lr1_data, lr1_options, lr1_over_budget_message
+from services.grammar_cache import get_analyzer
+from services.parse_service import solve_input
+from services.catalog_service import catalog_data
+from services.batch_service import batch_summary, check_batch_inputs, parse_batch
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
+
+lr1_bp = Blueprint('lr1', __name__, url_prefix='/api')
+
+
+def build_lr1(data):
+    """根据请求参数获取已初始化的LR1分析器（命中缓存时直接复用）"""
+    return get_analyzer('lr1', data.get('inpProductions'), **lr1_options(data))
+
+
+@lr1_bp.route('/LR1Analyse', methods=['POST'])
+def LR1Anlyse():
+    """LR1 文法分析"""
+    data = request.get_json()
+    error = check_lr1_params(data)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    result = catalog_data('lr1', data.get('inpProductions'), lr1_options(data))  # 教材文法直接返回预先计算的结果
+    if result is not None:
+        return jsonify({
+            "code": 0,
+            "data": result
+        }), 200
+    lr1 = build_lr1(data)
+    if lr1.over_budget:
+        return jsonify({
+            "code": 1,
+            "message": lr1_over_budget_message(lr1)
+        }), 200
+
+    return jsonify({
+        "code": 0,
+        "data": lr1_data(lr1)
+    }), 200
+
+
+@lr1_bp.route('/LR1AnalyseInp', methods=['POST'])
+def LR1AnlyseInp():
+    """LR1 输入串分析"""
+    data = request.get_json()
+    inp_str = data.get('inpStr')
+    error = check_lr1_params(data)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    lr1 = build_lr1(data)
+    if lr1.over_budget:
+        return jsonify({
+            "code": 1,
+            "message": lr1_over_budget_message(lr1)
+        }), 200
+    info = solve_input(lr1, inp_str, parse_trace_mode(data.get('trace')), parse_tree_format(data.get('tree')))
+    return jsonify({
+        "code": 0,
+        "data": info
+    }), 200
+
+
+@lr1_bp.route('/LR1AnalyseBatch', methods=['POST'])
+def LR1AnlyseBatch():
+    """LR1 批量输入串分析（文法只构造一次）"""
+    data = request.get_json()
+    inputs = data.get('inpStrs')
+    error = check_batch_inputs(inputs) or check_lr1_params(data)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    lr1 = build_lr1(data)
+    if lr1.over_budget:
+        return jsonify({
+            "code": 1,
+            "message": lr1_over_budget_message(lr1)
+        }), 200
+    results = parse_batch(lr1, inputs, parse_trace_mode(data.get('trace', 'none')),
+                          parse_tree_format(data.get('tree')))
+    return jsonify({
+        "code": 0,
+        "data": batch_summary(results)
+    }), 200
@@ -1,62 +1,36 @@
 """
 SLR1 语法分析相关接口蓝图
-包含 SLR1 文法分析和输入串分析功能
+包含 SLR1 文法分析和输入串分析、批量输入串分析功能
 """
 from flask import Blueprint, request, jsonify
-from utils.Class_SLR1_GrammarAnalysis import SLR1
+from services.analysis_data import slr1_data, prune_options
+from services.grammar_cache import get_analyzer
+from services.parse_service import solve_input
+from services.catalog_service import catalog_data
+from services.http_cache import etag_response, grammar_etag, request_params
+from services.batch_service import analyse_batch, check_batch_inputs
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
 
 slr1_bp = Blueprint('slr1', __name__, url_prefix='/api')
 
 
-@slr1_bp.route('/SLR1Analyse', methods=['POST'])
+@slr1_bp.route('/SLR1Analyse', methods=['GET', 'POST'])
 def SLR1Anlyse():
-    """SLR1 文法分析"""
-    data = request.get_json()
+    """SLR1 文法分析（GET 时产生式作为查询参数 inpProductions，结果带 ETag，可协商缓存）"""
+    data = request_params()
     text_list = data.get('inpProductions')
-    slr1 = SLR1(text_list)
-    slr1.init()
-
-    # dist<tuple , str>， 其中key为tuple类型，不好转换json，将其转为str类型
-    actions = slr1.actions
-    gotos = slr1.gotos
-    new_actions = {}
-    new_gotos = {}
-    for (x, y), value in actions.items():
-        # 将元组键转换为字符串，这里使用 | 作为分隔符
-        new_key = f"{x}|{y}"
-        new_actions[new_key] = value
-    for (x, y), value in gotos.items():
-        # 将元组键转换为字符串，这里使用 | 作为分隔符
-        new_key = f"{x}|{y}"
-        new_gotos[new_key] = value
-
-    # 处理First和Follow集合，将set类型转换为list类型以便JSON序列化
-    first = slr1.first
-    follow = slr1.follow
-    for key in first:
-        first[key] = list(first[key])
-    for key in follow:
-        follow[key] = list(follow[key])
-
-    data = {
-        "S": slr1.S,
-        "Vn": slr1.Vn,
-        "Vt": slr1.Vt,
-        "formulas_list": slr1.formulas_list,
-        "first": first,
-        "follow": follow,
-        "dot_items": slr1.dot_items,
-        "all_dfa": [dfa.to_dict() for dfa in slr1.all_DFA],
-        "actions": new_actions,
-        "gotos": new_gotos,
-        "isSLR1": slr1.isSLR1,
-        "SLR1_dot_str": slr1.dot
-    }
+    options = prune_options(data)
 
-    return jsonify({
-        "code": 0,
-        "data": data
-    }), 200
+    def build():
+        result = catalog_data('slr1', text_list, options)  # 教材文法直接返回预先计算的结果
+        if result is None:
+            result = slr1_data(get_analyzer('slr1', text_list, **options))
+        return {
+            "code": 0,
+            "data": result
+        }
+    return etag_response(grammar_etag('slr1', text_list, options), build)
 
 
 @slr1_bp.route('/SLR1AnalyseInp', methods=['POST'])
@@ -65,20 +39,15 @@ def SLR1AnlyseInp():
     data = request.get_json()
     text_list = data.get('inpProductions')
     inp_str = data.get('inpStr')
-    slr1 = SLR1(text_list)
-    slr1.init()
-    slr1.solve(inp_str)
+    slr1 = get_analyzer('slr1', text_list, **prune_options(data))
+    info = solve_input(slr1, inp_str, parse_trace_mode(data.get('trace')), parse_tree_format(data.get('tree')))
 
-    # 处理First和Follow集合，将set类型转换为list类型以便JSON序列化
-    first = slr1.first
-    follow = slr1.follow
-    for key in first:
-        first[key] = list(first[key])
-    for key in follow:
-        follow[key] = list(follow[key])
+    # 处理First和Follow集合，将set类型转换为list类型以便JSON序列化（分析器可能被缓存复用，不能原地修改）
+    first = {key: list(value) for key, value in slr1.first.items()}
+    follow = {key: list(value) for key, value in slr1.follow.items()}
 
     # 合并分析结果和First/Follow集合
-    result_data = slr1.info.copy()
+    result_data = info.copy()
     result_data["first"] = first
     result_data["follow"] = follow
 
@@ -86,3 +55,23 @@ def SLR1AnlyseInp():
         "code": 0,
         "data": result_data
     }), 200
+
+
+@slr1_bp.route('/SLR1AnalyseBatch', methods=['POST'])
+def SLR1AnlyseBatch():
+    """SLR1 批量输入串分析（文法只构造一次）"""
+    data = request.get_json()
+    text_list = data.get('inpProductions')
+    inputs = data.get('inpStrs')
+    error = check_batch_inputs(inputs)
+    if error:
+        return jsonify({
+            "code": 1,
+            "message": error
+        }), 200
+    result = analyse_batch('slr1', text_list, inputs, parse_trace_mode(data.get('trace', 'none')),
+                           parse_tree_format(data.get('tree')), **prune_options(data))
+    return jsonify({
+        "code": 0,
+        "data": result
+    }), 200
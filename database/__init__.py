@@ -4,6 +4,7 @@
 """
 import os
 import sqlite3
+import threading
 from pathlib import Path
 
 # 数据库文件路径
@@ -43,19 +44,40 @@ ERROR_TYPES = {
 }
 
 
-def get_db_connection():
-    """获取数据库连接"""
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
     conn = sqlite3.connect(str(DATABASE_PATH))
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def get_db_connection():
+    """获取数据库连接（首次使用时初始化数据库）"""
+    init_database()
+    return _connect()
+
+
 def init_database():
-    """初始化数据库，创建表和索引"""
+    """
+    初始化数据库，创建表和索引（幂等，每个进程只执行一次）
+    gunicorn 在 master 中执行（gunicorn.conf.py 的 on_starting），fork 出的 worker 继承已初始化的状态，不再执行建表语句
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        _create_tables()
+        _initialized = True
+
+
+def _create_tables():
     # 确保数据库目录存在
     DATABASE_DIR.mkdir(parents=True, exist_ok=True)
     
-    conn = get_db_connection()
+    conn = _connect()
     cursor = conn.cursor()
     
     # 创建错误统计主表
@@ -168,6 +190,19 @@ def init_database():
     print(f"[Database] 数据库初始化完成: {DATABASE_PATH}")
 
 
+def init_all_databases():
+    """初始化统计数据库、分析表存储和任务存储（gunicorn master 启动时调用一次）"""
+    from database.job_store import init_job_store
+    from database.table_store import init_table_store, maintain_table_store
+    from services.grammar_cache import ANALYZER_FORMAT_VERSION
+    init_database()
+    init_table_store()
+    deleted = maintain_table_store(ANALYZER_FORMAT_VERSION)
+    if deleted:
+        print(f"[Database] 分析表存储删除了 {deleted} 条旧版本或过期的记录")
+    init_job_store()
+
+
 def reset_database():
     """重置数据库（删除所有数据）"""
     conn = get_db_connection()
@@ -184,12 +219,11 @@ def reset_database():
 
 def delete_database():
     """删除数据库文件"""
+    global _initialized
+    _initialized = False
     if DATABASE_PATH.exists():
         DATABASE_PATH.unlink()
         print(f"[Database] 数据库文件已删除: {DATABASE_PATH}")
     else:
         print("[Database] 数据库文件不存在")
 
-
-# 初始化数据库（导入时自动执行）
-init_database()
@@ -0,0 +1,166 @@
+"""
+异步分析任务存储
+与 stats.db 同目录的 jobs.db，保存任务状态、进度和结果（JSON），所有 gunicorn worker 共享，
+任何 worker 都能响应任务查询；结果在完成后保留 JOB_RESULT_TTL 秒
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from database import DATABASE_DIR
+
+# 数据库文件路径
+JOB_STORE_PATH = DATABASE_DIR / "jobs.db"
+
+# 任务状态
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_FINISHED = (JOB_DONE, JOB_FAILED)
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def get_job_store_connection():
+    """获取任务存储的数据库连接"""
+    conn = sqlite3.connect(str(JOB_STORE_PATH), timeout=5)
+    conn.execute('PRAGMA journal_mode=WAL')  # 多进程并发读写
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_job_store():
+    """初始化任务存储（幂等）"""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        DATABASE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = get_job_store_connection()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    deadline_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_expires ON analysis_jobs(expires_at)')
+            conn.commit()
+        finally:
+            conn.close()
+        _initialized = True
+
+
+def _execute(sql: str, params: tuple) -> int:
+    init_job_store()
+    conn = get_job_store_connection()
+    try:
+        cursor = conn.execute(sql, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def create_job(job_type: str, timeout: float, ttl: float) -> str:
+    """
+    新建任务（状态为 queued），同时清理已过期的任务
+
+    Args:
+        job_type: 任务类型
+        timeout: 执行时限（秒），超过后查询时视为失败
+        ttl: 任务及结果的保留时间（秒）
+
+    Returns:
+        任务ID
+    """
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    purge_expired_jobs(now)
+    _execute('''
+        INSERT INTO analysis_jobs
+        (job_id, job_type, status, created_at, updated_at, deadline_at, expires_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (job_id, job_type, JOB_QUEUED, now, now, now + timeout, now + timeout + ttl))
+    return job_id
+
+
+def update_job_progress(job_id: str, stage: str, progress: Optional[Dict[str, Any]] = None) -> None:
+    """更新任务阶段和进度（任务开始执行后状态为 running）"""
+    _execute('''
+        UPDATE analysis_jobs SET status = ?, stage = ?, progress = ?, updated_at = ?
+        WHERE job_id = ? AND status IN (?, ?)
+    ''', (JOB_RUNNING, stage, json.dumps(progress or {}, ensure_ascii=False), time.time(),
+          job_id, JOB_QUEUED, JOB_RUNNING))
+
+
+def finish_job(job_id: str, result: Any, ttl: float) -> None:
+    """保存任务结果"""
+    now = time.time()
+    _execute('''
+        UPDATE analysis_jobs SET status = ?, stage = ?, result = ?, updated_at = ?, expires_at = ?
+        WHERE job_id = ?
+    ''', (JOB_DONE, JOB_DONE, json.dumps(result, ensure_ascii=False), now, now + ttl, job_id))
+
+
+def fail_job(job_id: str, error: str, ttl: float) -> None:
+    """标记任务失败"""
+    now = time.time()
+    _execute('''
+        UPDATE analysis_jobs SET status = ?, error = ?, updated_at = ?, expires_at = ?
+        WHERE job_id = ? AND status != ?
+    ''', (JOB_FAILED, error, now, now + ttl, job_id, JOB_DONE))
+
+
+def get_job(job_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    查询任务
+
+    Returns:
+        任务信息，不存在或已过期时返回 None；
+        未完成且超过执行时限的任务（如所在 worker 已重启）返回 failed
+    """
+    init_job_store()
+    conn = get_job_store_connection()
+    try:
+        row = conn.execute('SELECT * FROM analysis_jobs WHERE job_id = ?', (job_id,)).fetchone()
+    finally:
+        conn.close()
+    now = time.time()
+    if row is None or row['expires_at'] < now:
+        return None
+    job = {
+        "job_id": row['job_id'],
+        "type": row['job_type'],
+        "status": row['status'],
+        "stage": row['stage'],
+        "progress": json.loads(row['progress']) if row['progress'] else {},
+        "error": row['error'],
+        "created_at": row['created_at'],
+        "updated_at": row['updated_at']
+    }
+    if job['status'] not in JOB_FINISHED and row['deadline_at'] < now:
+        job['status'] = JOB_FAILED
+        job['error'] = "任务超时或执行中断"
+    if with_result and job['status'] == JOB_DONE:
+        job['result'] = json.loads(row['result'])
+    return job
+
+
+def purge_expired_jobs(now: Optional[float] = None) -> int:
+    """删除已过期的任务，返回删除条数"""
+    return _execute('DELETE FROM analysis_jobs WHERE expires_at < ?', (now or time.time(),))
@@ -0,0 +1,172 @@
+"""
+已编译分析表持久化存储
+与 stats.db 同目录的 tables.db，以 SQLite BLOB 保存序列化后的分析器（分析表、项目集族、DOT等），
+键为 (文法哈希, 算法, 格式版本)。所有 gunicorn worker 共享，worker 重启后无需重新构造
+记录按最近访问时间淘汰：超过 TABLE_STORE_TTL 秒未访问的删除，条数、总字节数超过上限时先删最久未访问的
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from database import DATABASE_DIR
+
+# 数据库文件路径
+TABLE_STORE_PATH = DATABASE_DIR / "tables.db"
+
+# 最多保存的记录条数、序列化后的总字节数
+TABLE_STORE_MAX_ROWS = int(os.environ.get('TABLE_STORE_MAX_ROWS', 5000))
+TABLE_STORE_MAX_BYTES = int(os.environ.get('TABLE_STORE_MAX_BYTES', 512 * 1024 * 1024))
+
+# 记录超过该秒数未被访问时删除
+TABLE_STORE_TTL = float(os.environ.get('TABLE_STORE_TTL', 30 * 24 * 3600))
+
+# 读取时距上次记录的访问时间超过该秒数才更新（避免每次读取都写数据库）
+TOUCH_INTERVAL = 60
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def get_table_store_connection():
+    """获取分析表存储的数据库连接"""
+    conn = sqlite3.connect(str(TABLE_STORE_PATH), timeout=5)
+    conn.execute('PRAGMA journal_mode=WAL')  # 多进程并发读写
+    return conn
+
+
+def init_table_store():
+    """初始化分析表存储（幂等）"""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        DATABASE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = get_table_store_connection()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS compiled_tables (
+                    grammar_hash TEXT NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    format_version INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    last_access REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (grammar_hash, algorithm, format_version)
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(compiled_tables)')}
+            if 'last_access' not in columns:  # 旧版本建的表：补上大小和访问时间
+                conn.execute('ALTER TABLE compiled_tables ADD COLUMN size INTEGER NOT NULL DEFAULT 0')
+                conn.execute('ALTER TABLE compiled_tables ADD COLUMN last_access REAL NOT NULL DEFAULT 0')
+                conn.execute('UPDATE compiled_tables SET size = length(payload), last_access = ?', (time.time(),))
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_tables_access ON compiled_tables(last_access)')
+            conn.commit()
+        finally:
+            conn.close()
+        _initialized = True
+
+
+def load_compiled(grammar_hash: str, algorithm: str, format_version: int, with_size: bool = False):
+    """
+    读取已编译的分析器
+
+    Returns:
+        反序列化后的对象，不存在或读取失败时返回 None；
+        with_size 为真时返回 (对象, 序列化后的字节数)，不存在或读取失败时为 (None, 0)
+    """
+    try:
+        init_table_store()
+        conn = get_table_store_connection()
+        try:
+            key = (grammar_hash, algorithm, format_version)
+            row = conn.execute('''
+                SELECT payload, last_access FROM compiled_tables
+                WHERE grammar_hash = ? AND algorithm = ? AND format_version = ?
+            ''', key).fetchone()
+            now = time.time()
+            if row is not None and now - row[1] > TOUCH_INTERVAL:
+                conn.execute('''
+                    UPDATE compiled_tables SET last_access = ?
+                    WHERE grammar_hash = ? AND algorithm = ? AND format_version = ?
+                ''', (now,) + key)
+                conn.commit()
+        finally:
+            conn.close()
+        if row is None:
+            return (None, 0) if with_size else None
+        obj = pickle.loads(row[0])
+        return (obj, len(row[0])) if with_size else obj
+    except Exception as e:
+        print(f"[TableStore] 读取失败: {e}")
+        return (None, 0) if with_size else None
+
+
+def save_compiled(grammar_hash: str, algorithm: str, format_version: int, obj) -> int:
+    """保存已编译的分析器，已存在时覆盖，返回序列化后的字节数（进程内缓存以此估算内存占用），失败时返回 0"""
+    try:
+        init_table_store()
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = get_table_store_connection()
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO compiled_tables
+                (grammar_hash, algorithm, format_version, payload, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (grammar_hash, algorithm, format_version, sqlite3.Binary(payload), len(payload), time.time()))
+            _evict(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(payload)
+    except Exception as e:
+        print(f"[TableStore] 写入失败: {e}")
+        return 0
+
+
+def _evict(conn, now=None) -> int:
+    """删除过期的记录，条数、总字节数超过上限时再按最久未访问的顺序删除，返回删除条数"""
+    now = time.time() if now is None else now
+    deleted = conn.execute('DELETE FROM compiled_tables WHERE last_access < ?', (now - TABLE_STORE_TTL,)).rowcount
+    rows, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM compiled_tables').fetchone()
+    if rows <= TABLE_STORE_MAX_ROWS and total <= TABLE_STORE_MAX_BYTES:
+        return deleted
+    victims = []
+    for key_hash, algorithm, version, size in conn.execute('''
+            SELECT grammar_hash, algorithm, format_version, size FROM compiled_tables ORDER BY last_access
+            '''):
+        if rows <= TABLE_STORE_MAX_ROWS and total <= TABLE_STORE_MAX_BYTES:
+            break
+        victims.append((key_hash, algorithm, version))
+        rows -= 1
+        total -= size
+    conn.executemany('''
+        DELETE FROM compiled_tables WHERE grammar_hash = ? AND algorithm = ? AND format_version = ?
+    ''', victims)
+    return deleted + len(victims)
+
+
+def purge_old_versions(format_version: int) -> int:
+    """删除旧格式版本的记录，返回删除条数"""
+    init_table_store()
+    conn = get_table_store_connection()
+    try:
+        cursor = conn.execute('DELETE FROM compiled_tables WHERE format_version != ?', (format_version,))
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def maintain_table_store(format_version: int) -> int:
+    """删除旧格式版本的记录和应淘汰的记录（启动时调用），返回删除条数"""
+    deleted = purge_old_versions(format_version)
+    conn = get_table_store_connection()
+    try:
+        deleted += _evict(conn)
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
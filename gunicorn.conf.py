@@ -3,9 +3,22 @@ Gunicorn 配置文件
 支持 40+ 并发用户
 """
 
-import multiprocessing
 import os
 
+# 预加载应用：master 导入应用并预热缓存后再 fork worker，worker 以写时复制方式共享，启动更快、总内存更小
+# GUNICORN_PRELOAD=0 时每个 worker 各自导入应用
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# 预加载时 master 会导入 requests/urllib3 等模块，gevent 补丁必须在此之前打上
+# （worker 中再打补丁时 ssl 已被导入，会出现递归深度错误）
+if preload_app:
+    from gevent import monkey
+    monkey.patch_all()
+
+import gc
+import multiprocessing
+import threading
+
 # 服务器绑定
 bind = "0.0.0.0:5000"
 
@@ -50,18 +63,32 @@ daemon = False
 # PID 文件
 pidfile = "gunicorn.pid"
 
-# 预加载应用（节省内存）
-# 注意：设置为 True 可能导致 gevent + requests 出现递归深度错误
-preload_app = False
-
 # 工作模式配置
 def post_fork(server, worker):
     """Worker 启动后执行"""
+    # 连接不能跨进程共用：HTTP/OpenAI 客户端在 worker 中首次使用时重新创建
+    # （数据库连接每次请求时新建，计算子进程池在 worker 中首次使用时启动）
+    if server.cfg.preload_app:
+        from services.http_clients import reset_clients
+        reset_clients()
     server.log.info(f"Worker spawned (pid: {worker.pid})")
 
 def on_starting(server):
-    """服务器启动时执行"""
+    """服务器启动时执行（master 中，fork worker 之前）"""
     server.log.info("Gunicorn starting...")
+    # 建表只在 master 中执行一次，worker 继承已初始化的状态，启动/重启 worker 时不再执行
+    from database import init_all_databases
+    init_all_databases()
+    if server.cfg.preload_app:
+        from services.warmup import WARMUP_ENABLED, warm_caches
+        if WARMUP_ENABLED:
+            server.log.info(f"Caches warmed: {warm_caches()}")
+        # 线程不能跨 fork：等待 master 中启动的临时线程（如限流器的过期清理定时器）结束
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and not thread.daemon:
+                thread.join(1)
+        # 把已有对象移出垃圾回收的跟踪范围，避免 worker 中的回收扫描写入这些内存页，破坏写时复制
+        gc.freeze()
 
 def on_exit(server):
     """服务器退出时执行"""
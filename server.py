@@ -9,10 +9,19 @@ from blueprints.fa import fa_bp
 from blueprints.ll1 import ll1_bp
 from blueprints.lr0 import lr0_bp
 from blueprints.slr1 import slr1_bp
+from blueprints.lr1 import lr1_bp
 from blueprints.stats import stats_bp
 from blueprints.ai_proxy import ai_proxy_bp
+from blueprints.jobs import jobs_bp
+from blueprints.grammar import grammar_bp
+from services.executor import ExecutorBusy, ExecutorTimeout
+from services.grammar_cache import InvalidProductions
+from services.http_cache import compress_response
+from services.json_response import FastJSONProvider
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # 响应使用 orjson 序列化（未安装时使用标准库）
+app.after_request(compress_response)  # 按 Accept-Encoding 压缩较大的 JSON 响应
 CORS(app)
 
 # 注册蓝图
@@ -21,8 +30,11 @@ app.register_blueprint(fa_bp)
 app.register_blueprint(ll1_bp)
 app.register_blueprint(lr0_bp)
 app.register_blueprint(slr1_bp)
+app.register_blueprint(lr1_bp)
 app.register_blueprint(stats_bp)
 app.register_blueprint(ai_proxy_bp)
+app.register_blueprint(jobs_bp)
+app.register_blueprint(grammar_bp)
 
 # ================= 反爬核心配置 =================
 def get_real_ip():
@@ -59,6 +71,30 @@ def ratelimit_handler(e):
         "msg": "请求过于频繁，请稍后再试"
     }), 429
 
+@app.errorhandler(ExecutorBusy)
+def executor_busy_handler(e):
+    """计算任务排队已满（背压）"""
+    return jsonify({
+        "code": 503,
+        "msg": "服务繁忙，请稍后再试"
+    }), 503, {"Retry-After": "1"}
+
+@app.errorhandler(ExecutorTimeout)
+def executor_timeout_handler(e):
+    """计算任务超过截止时间"""
+    return jsonify({
+        "code": 504,
+        "msg": f"分析超时：{e}，请简化文法或输入后重试"
+    }), 504
+
+@app.errorhandler(InvalidProductions)
+def invalid_productions_handler(e):
+    """产生式含控制字符等"""
+    return jsonify({
+        "code": 1,
+        "message": str(e)
+    }), 200
+
 @app.errorhandler(500)
 def server_error(error):
     return '服务异常'
@@ -0,0 +1,145 @@
+"""
+文法分析结果 -> 接口返回数据
+同步接口与异步任务共用，保证两者返回的 data 格式一致
+"""
+from typing import Any, Dict
+
+from utils.Class_LR1_GrammarAnalysis import DEFAULT_MAX_STATES
+
+MAX_STATES_LIMIT = 20000  # 前端可设置的LR(1)状态预算上限
+
+
+def table_keys_to_str(table: Dict[Any, Any]) -> Dict[str, Any]:
+    """dist<tuple , str>， 其中key为tuple类型，不好转换json，将其转为str类型（使用 | 作为分隔符）"""
+    return {f"{x}|{y}": value for (x, y), value in table.items()}
+
+
+def sets_to_lists(sets: Dict[str, Any]) -> Dict[str, list]:
+    """dist<str , set>，将set类型转换为list类型以便JSON序列化（分析器可能被缓存复用，不能原地修改）"""
+    return {key: list(value) for key, value in sets.items()}
+
+
+def prune_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """请求参数 prune 为真时，构造分析器前删除无用符号（不删除时不加参数，缓存键与原来一致）"""
+    return {"prune": True} if data.get('prune') else {}
+
+
+def check_lr1_params(data: Dict[str, Any]) -> str:
+    """校验LR1分析器的请求参数，合法时返回空串，否则返回错误信息"""
+    max_states = data.get('maxStates', DEFAULT_MAX_STATES)
+    try:
+        valid = not isinstance(max_states, bool) and int(max_states) >= 1
+    except (TypeError, ValueError):
+        valid = False
+    return "" if valid else f"maxStates 必须是正整数（超过 {MAX_STATES_LIMIT} 时按 {MAX_STATES_LIMIT} 计）"
+
+
+def check_analyzer_params(kind: str, data: Dict[str, Any]) -> str:
+    """校验分析器的请求参数，合法时返回空串，否则返回错误信息"""
+    return check_lr1_params(data) if kind == 'lr1' else ""
+
+
+def lr1_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    """根据请求参数生成LR1分析器的构造参数（参数需先经 check_lr1_params 校验）"""
+    return {
+        "max_states": min(int(data.get('maxStates', DEFAULT_MAX_STATES)), MAX_STATES_LIMIT),
+        "merge_on_budget": bool(data.get('mergeOnBudget', True)),
+        "lalr": bool(data.get('lalr', False)),
+        **prune_options(data)
+    }
+
+
+def analyzer_options(kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """根据请求参数生成分析器的构造参数"""
+    return lr1_options(data) if kind == 'lr1' else prune_options(data)
+
+
+def with_removed(analyzer, data: Dict[str, Any]) -> Dict[str, Any]:
+    """删除了无用符号时，附上删除情况"""
+    if analyzer.prune:
+        data["removed"] = analyzer.removed
+    return data
+
+
+def ll1_data(ll1) -> Dict[str, Any]:
+    """LL1 文法分析结果"""
+    return with_removed(ll1, {
+        "S": ll1.S,
+        "Vn": ll1.Vn,
+        "Vt": ll1.Vt,
+        "formulas_dict": sets_to_lists(ll1.formulas_dict),
+        "first": sets_to_lists(ll1.first),
+        "follow": sets_to_lists(ll1.follow),
+        "table": table_keys_to_str(ll1.table),
+        "isLL1": ll1.isLL1,
+        "conflicts": ll1.conflicts  # 所有冲突及其反例
+    })
+
+
+def lr0_data(lr0) -> Dict[str, Any]:
+    """LR0 文法分析结果"""
+    return with_removed(lr0, {
+        "S": lr0.S,
+        "Vn": lr0.Vn,
+        "Vt": lr0.Vt,
+        "formulas_list": lr0.formulas_list,
+        "dot_items": lr0.dot_items,
+        "all_dfa": [dfa.to_dict() for dfa in lr0.all_DFA],
+        "actions": table_keys_to_str(lr0.actions),
+        "gotos": table_keys_to_str(lr0.gotos),
+        "isLR0": lr0.isLR0,
+        "conflicts": lr0.conflicts,  # 所有冲突及其反例
+        "LR0_dot_str": lr0.dot
+    })
+
+
+def slr1_data(slr1) -> Dict[str, Any]:
+    """SLR1 文法分析结果"""
+    return with_removed(slr1, {
+        "S": slr1.S,
+        "Vn": slr1.Vn,
+        "Vt": slr1.Vt,
+        "formulas_list": slr1.formulas_list,
+        "first": sets_to_lists(slr1.first),
+        "follow": sets_to_lists(slr1.follow),
+        "dot_items": slr1.dot_items,
+        "all_dfa": [dfa.to_dict() for dfa in slr1.all_DFA],
+        "actions": table_keys_to_str(slr1.actions),
+        "gotos": table_keys_to_str(slr1.gotos),
+        "isSLR1": slr1.isSLR1,
+        "conflicts": slr1.conflicts,  # 所有冲突及其反例
+        "SLR1_dot_str": slr1.dot
+    })
+
+
+def lr1_data(lr1) -> Dict[str, Any]:
+    """LR1 文法分析结果"""
+    return with_removed(lr1, {
+        "S": lr1.S,
+        "Vn": lr1.Vn,
+        "Vt": lr1.Vt,
+        "formulas_list": lr1.formulas_list,
+        "first": sets_to_lists(lr1.first),
+        "follow": sets_to_lists(lr1.follow),
+        "dot_items": lr1.dot_items,
+        "all_dfa": [dfa.to_dict() for dfa in lr1.all_DFA],
+        "actions": table_keys_to_str(lr1.actions),
+        "gotos": table_keys_to_str(lr1.gotos),
+        "isLR1": lr1.isLR1,
+        "conflicts": lr1.conflicts,  # 所有冲突及其反例
+        "isLALR1": lr1.merged,  # 是否已按核心合并（LALR(1)）
+        "LR1_dot_str": lr1.dot
+    })
+
+
+def lr1_over_budget_message(lr1) -> str:
+    return f"LR(1)项目集数量超过状态上限{lr1.max_states}，请开启LALR(1)合并或简化文法！"
+
+
+# 分析器类型 -> 结果数据
+ANALYSIS_DATA = {
+    'll1': ll1_data,
+    'lr0': lr0_data,
+    'slr1': slr1_data,
+    'lr1': lr1_data,
+}
@@ -0,0 +1,127 @@
+"""
+批量输入串分析服务
+同一文法只构造一次分析器，对 N 个输入串逐一分析；
+分析在计算子进程中执行（services/executor.py，不阻塞 gevent 事件循环），输入串较多时分块并行，
+共用同一个截止时间
+"""
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from services.codegen_service import compiled_parser
+from services.executor import CPU_POOL_WORKERS, CPU_TASK_TIMEOUT, run_cpu
+from services.grammar_cache import get_analyzer
+from services.parse_service import general_parser, solve_input
+
+# 单次请求最多的输入串个数
+BATCH_MAX_INPUTS = int(os.environ.get('BATCH_MAX_INPUTS', 1000))
+
+# 每块至少的输入串个数（块太小时传输分析器的开销大于并行的收益）
+BATCH_PARALLEL_THRESHOLD = int(os.environ.get('BATCH_PARALLEL_THRESHOLD', 64))
+
+# 单个批量请求最多同时占用的计算子进程数
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', max(CPU_POOL_WORKERS, 1)))
+
+
+def check_batch_inputs(inputs: Any) -> str:
+    """校验批量输入串参数，合法时返回空串，否则返回错误信息"""
+    if not isinstance(inputs, list) or not all(isinstance(x, str) for x in inputs):
+        return "inpStrs 必须是字符串列表"
+    if len(inputs) > BATCH_MAX_INPUTS:
+        return f"输入串个数超过上限{BATCH_MAX_INPUTS}"
+    return ""
+
+
+def parse_inputs(analyzer, inputs: List[str], trace: str,
+                 tree_format: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    用同一个分析器依次分析多个输入串，返回每个输入串的结论和（可选的）分析过程、语法树
+    只要结论时（不记录分析过程、不建树）使用生成的专用分析程序，结论与 solve() 一致；
+    文法不符合分析方法时改用通用分析程序（services/parse_service.py）
+    """
+    general = general_parser(analyzer)
+    parse = compiled_parser(analyzer) if general is None and trace == 'none' and tree_format is None else None
+    results = []
+    for inp_str in inputs:
+        info = None
+        if parse is not None:
+            try:
+                info = {"info_res": parse(inp_str)}
+            except RecursionError:  # 递归下降嵌套过深，改用分析总控程序
+                pass
+        if info is None:
+            info = solve_input(analyzer, inp_str, trace, tree_format, general)
+        result = {"inpStr": inp_str, "accepted": info["info_res"] == "Success!"}
+        result.update(info)
+        results.append(result)
+    return results
+
+
+def split_chunks(items: List[Any], n_chunks: int) -> List[List[Any]]:
+    """按顺序均分为不超过 n_chunks 块"""
+    size = max(1, math.ceil(len(items) / n_chunks))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def parse_batch(analyzer, inputs: List[str], trace: str = 'none',
+                tree_format: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    批量分析输入串（在计算子进程中执行）
+
+    Args:
+        analyzer: 已 init() 的分析器
+        inputs: 输入串列表
+        trace: 分析过程记录模式（none/summary/full/delta）
+        tree_format: 语法树输出格式（arrays/dot），None 时不建树
+
+    Returns:
+        与 inputs 顺序一致的分析结果列表
+
+    Raises:
+        ExecutorBusy / ExecutorTimeout: 同 run_cpu，所有块共用 CPU_TASK_TIMEOUT 秒的截止时间
+    """
+    if not inputs:
+        return []
+    deadline = time.monotonic() + CPU_TASK_TIMEOUT
+    chunks = split_chunks(inputs, min(BATCH_MAX_WORKERS, math.ceil(len(inputs) / BATCH_PARALLEL_THRESHOLD)))
+
+    def parse_chunk(chunk):
+        return run_cpu(parse_inputs, analyzer, chunk, trace, tree_format,
+                       timeout=max(0.0, deadline - time.monotonic()))
+
+    if len(chunks) == 1:
+        return parse_chunk(chunks[0])
+    # 各块由不同的计算子进程并行分析（gevent 下线程即 greenlet，只在管道上等待）
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        return [result for chunk_results in pool.map(parse_chunk, chunks) for result in chunk_results]
+
+
+def batch_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """批量分析结果 -> 接口返回的 data"""
+    return {
+        "total": len(results),
+        "accepted": sum(1 for result in results if result["accepted"]),
+        "results": results
+    }
+
+
+def analyse_batch(kind: str, text_list: List[str], inputs: List[str], trace: str = 'none',
+                  tree_format: Optional[str] = None, **options) -> Dict[str, Any]:
+    """
+    构造（或从缓存获取）分析器后批量分析输入串
+
+    Args:
+        kind: 分析器类型 (ll1, lr0, slr1, lr1)
+        text_list: 产生式列表
+        inputs: 输入串列表
+        trace: 分析过程记录模式
+        tree_format: 语法树输出格式
+        options: 分析器构造参数
+
+    Returns:
+        {"total": 输入串个数, "accepted": 接受的个数, "results": [...]}
+    """
+    analyzer = get_analyzer(kind, text_list, **options)
+    return batch_summary(parse_batch(analyzer, inputs, trace, tree_format))
@@ -0,0 +1,159 @@
+"""
+教材文法、正则表达式目录（catalog/textbook.json，课程实际使用的例子）
+启动时（gunicorn master 预热，或 python start_server.py catalog）把目录中每一项的完整结果（接口返回的 data）
+计算好并保存到持久化存储，各分析接口先查目录，命中时直接返回预先计算的结果
+目录文件的 version 变化后，旧版本的预计算结果不再使用
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database.table_store import load_compiled, save_compiled
+from services.analysis_data import ANALYSIS_DATA, analyzer_options
+from services.fa_service import cache_result, regex_to_dfam
+from services.grammar_cache import (ANALYZER_FORMAT_VERSION, GRAMMAR_TABLE_STORE, algorithm_name, analyzer_key,
+                                    compile_analyzer, grammar_cache, grammar_hash, normalize_productions)
+
+# 目录文件路径
+CATALOG_PATH = Path(os.environ.get('GRAMMAR_CATALOG', Path(__file__).parent.parent / "catalog" / "textbook.json"))
+
+# 是否启用目录
+CATALOG_ENABLED = os.environ.get('CATALOG_ENABLED', '1') != '0'
+
+_lock = threading.Lock()
+_entries = None  # 查找键 -> 目录项 {"kind", "productions", "options", "hash", "algorithm"} 或 {"regex", ...}
+_version = 0
+_data = {}  # 查找键 -> 预先计算的 data（调用方只读）
+
+
+def regex_key(regex: str) -> str:
+    return f"regex:{regex}"
+
+
+def load_catalog() -> Dict[str, Any]:
+    """读取目录文件，未启用或读取失败时返回空目录"""
+    if not CATALOG_ENABLED:
+        return {"version": 0, "grammars": [], "regexes": []}
+    try:
+        with open(CATALOG_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Catalog] 目录文件读取失败: {e}")
+        return {"version": 0, "grammars": [], "regexes": []}
+
+
+def catalog_entries() -> Dict[str, Dict[str, Any]]:
+    """目录中的所有项（首次调用时读取目录文件）"""
+    global _entries, _version
+    with _lock:
+        if _entries is not None:
+            return _entries
+        catalog = load_catalog()
+        version = catalog.get("version", 0)
+        entries = {}
+        for grammar in catalog.get("grammars", []):
+            productions = normalize_productions(grammar["productions"])
+            for kind in grammar["algorithms"]:
+                options = analyzer_options(kind, {})  # 与不带参数的请求一致
+                entries[analyzer_key(kind, productions, options)] = {
+                    "name": grammar.get("name", ""),
+                    "kind": kind,
+                    "productions": productions,
+                    "options": options,
+                    "hash": grammar_hash(productions),
+                    "algorithm": f"catalog-v{version}:{algorithm_name(kind, options)}"
+                }
+        for item in catalog.get("regexes", []):
+            entries[regex_key(item["regex"])] = {
+                "name": item.get("name", ""),
+                "regex": item["regex"],
+                "hash": hashlib.sha256(item["regex"].encode('utf-8')).hexdigest(),
+                "algorithm": f"catalog-v{version}:regex"
+            }
+        _entries, _version = entries, version
+        return entries
+
+
+def _lookup(key: str) -> Optional[Dict[str, Any]]:
+    """按查找键取预先计算的 data：先查进程内，再查持久化存储（未预热的 worker），都没有时返回 None"""
+    data = _data.get(key)
+    if data is not None:
+        return data
+    entry = catalog_entries().get(key)
+    if entry is None or not GRAMMAR_TABLE_STORE:
+        return None
+    data = load_compiled(entry["hash"], entry["algorithm"], ANALYZER_FORMAT_VERSION)
+    if data is not None:
+        _data[key] = data
+    return data
+
+
+def catalog_data(kind: str, text_list: List[str], options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """目录中文法的分析结果（与 ANALYSIS_DATA[kind] 相同），不在目录中时返回 None"""
+    if not CATALOG_ENABLED or not isinstance(text_list, list):
+        return None
+    return _lookup(analyzer_key(kind, normalize_productions(text_list), options))
+
+
+def catalog_regex(regex: Any) -> Optional[Dict[str, Any]]:
+    """目录中正则表达式的转换结果（与 regex_to_dfam 相同），不在目录中时返回 None"""
+    if not CATALOG_ENABLED or not isinstance(regex, str):
+        return None
+    return _lookup(regex_key(regex))
+
+
+def compile_catalog(force: bool = False) -> Dict[str, Any]:
+    """
+    在当前进程中计算目录中每一项的结果并保存到持久化存储（已保存的直接读取），
+    同时放入进程内缓存：分析器放入文法分析器缓存，输入串分析也可直接命中
+    构造过程的打印输出不写入日志
+
+    Args:
+        force: 忽略已保存的结果，重新计算
+
+    Returns:
+        {"version": 目录版本, "entries": 项数, "computed": 本次计算的项数, "failed": 出错的项数, "ms": 耗时}
+    """
+    start = time.perf_counter()
+    entries = catalog_entries()
+    computed = failed = 0
+    for key, entry in entries.items():
+        data = None if force else _lookup(key)
+        stored = data is not None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if "regex" in entry:
+                    if data is None:
+                        data = regex_to_dfam(entry["regex"])
+                        computed += 1
+                    if data is not None:
+                        cache_result(entry["regex"], data)
+                else:
+                    analyzer = compile_analyzer(entry["kind"], entry["productions"], **entry["options"])
+                    grammar_cache.put(key, analyzer)
+                    if data is None:
+                        data = ANALYSIS_DATA[entry["kind"]](analyzer)
+                        computed += 1
+        except Exception as e:
+            print(f"[Catalog] {entry['name']} 计算失败: {type(e).__name__}: {e}")
+            failed += 1
+            continue
+        if data is None:
+            failed += 1
+            continue
+        _data[key] = data
+        if GRAMMAR_TABLE_STORE and not stored:
+            save_compiled(entry["hash"], entry["algorithm"], ANALYZER_FORMAT_VERSION, data)
+    return {
+        "version": _version,
+        "entries": len(entries),
+        "computed": computed,
+        "failed": failed,
+        "ms": round((time.perf_counter() - start) * 1000)
+    }
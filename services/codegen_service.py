@@ -0,0 +1,77 @@
+"""
+分析程序生成服务
+由已 init() 的分析器生成专用的 Python 分析程序（utils/Parser_Codegen.py），
+compile()/exec() 加载后按 (分析器类型, 参数, 文法哈希) 缓存，批量分析输入串时直接调用，跳过通用分析总控程序
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from services.grammar_cache import ANALYZERS, analyzer_key, normalize_productions
+from utils.Parser_Codegen import ll1_parser_source, lr_parser_source
+
+# 进程内缓存的已加载分析程序个数
+CODEGEN_CACHE_SIZE = int(os.environ.get('CODEGEN_CACHE_SIZE', 128))
+
+_parsers = OrderedDict()  # 缓存键 -> parse 函数（文法不符合时为 None）
+_lock = threading.Lock()
+
+
+def analyzer_kind(analyzer) -> str:
+    """分析器 -> 分析器类型 (ll1, lr0, slr1, lr1)"""
+    for kind, cls in ANALYZERS.items():
+        if type(analyzer) is cls:
+            return kind
+    raise ValueError(f"不支持的分析器: {type(analyzer).__name__}")
+
+
+def analyzer_build_options(kind: str, analyzer) -> Dict[str, Any]:
+    """分析器的构造参数（与 services/analysis_data.py 生成的参数一致）"""
+    options = {"prune": True} if analyzer.prune else {}
+    if kind == 'lr1':
+        options.update(max_states=analyzer.max_states, merge_on_budget=analyzer.merge_on_budget,
+                       lalr=analyzer.lalr)
+    return options
+
+
+def parser_title(kind: str, analyzer) -> str:
+    if kind == 'lr1':
+        return "LALR(1)" if analyzer.merged else "LR(1)"
+    return {'ll1': "LL(1)", 'lr0': "LR(0)", 'slr1': "SLR(1)"}[kind]
+
+
+def parser_source(kind: str, analyzer) -> Optional[str]:
+    """生成分析程序的源码，文法不符合该分析方法时为None"""
+    if kind == 'll1':
+        return ll1_parser_source(analyzer)
+    return lr_parser_source(analyzer, parser_title(kind, analyzer))
+
+
+def load_parser(source: str, kind: str) -> Callable[[str], str]:
+    """编译并执行生成的源码，返回其中的 parse 函数"""
+    namespace = {"__name__": f"{kind}_parser"}
+    exec(compile(source, f"<{kind}_parser>", "exec"), namespace)
+    return namespace["parse"]
+
+
+def compiled_parser(analyzer) -> Optional[Callable[[str], str]]:
+    """
+    获取分析器对应的已加载分析程序，同一文法只生成、编译一次
+
+    Returns:
+        parse(text) -> "Success!" 或出错信息；文法不符合该分析方法时为None
+    """
+    kind = analyzer_kind(analyzer)
+    key = analyzer_key(kind, normalize_productions(analyzer.grammar_list), analyzer_build_options(kind, analyzer))
+    with _lock:
+        if key in _parsers:
+            _parsers.move_to_end(key)
+            return _parsers[key]
+    source = parser_source(kind, analyzer)
+    parse = load_parser(source, kind) if source is not None else None
+    with _lock:
+        _parsers[key] = parse
+        while len(_parsers) > CODEGEN_CACHE_SIZE:
+            _parsers.popitem(last=False)
+    return parse
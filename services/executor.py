@@ -0,0 +1,236 @@
+"""
+CPU 计算执行层
+文法分析器构造、NFA/DFA 转换等纯CPU计算不会让出 gevent 事件循环，
+这里把它们交给独立的计算子进程执行，Web worker 只在管道上协作式等待结果：
+    - 每个 Web worker 进程内维护一组常驻计算子进程（首次使用时才启动）
+    - 每个任务有截止时间，超时后直接结束对应的子进程并重新启动
+    - 等待中的任务数超过上限时立即拒绝（背压），由接口返回 503
+CPU_POOL_WORKERS=0 时在当前进程内直接执行（开发调试用）
+"""
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from typing import Any, Callable, List, Optional
+
+# 每个 Web worker 的计算子进程数
+CPU_POOL_WORKERS = int(os.environ.get('CPU_POOL_WORKERS', 2))
+
+# 每个 Web worker 中等待空闲计算子进程的任务数上限
+CPU_QUEUE_LIMIT = int(os.environ.get('CPU_QUEUE_LIMIT', 32))
+
+# 任务默认截止时间（秒，包含排队时间），应小于 gunicorn 的 timeout
+CPU_TASK_TIMEOUT = float(os.environ.get('CPU_TASK_TIMEOUT', 30))
+
+# 子进程启动方式：forkserver 启动的子进程不继承 gevent 的 monkey patch 和 Web worker 的连接
+CPU_POOL_START_METHOD = os.environ.get(
+    'CPU_POOL_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class ExecutorBusy(Exception):
+    """等待的任务过多，拒绝新任务"""
+
+
+class ExecutorTimeout(Exception):
+    """任务超过截止时间"""
+
+
+class TaskError(Exception):
+    """任务在子进程中抛出异常（message 为子进程中的 traceback）"""
+
+
+def _gevent_patched() -> bool:
+    """当前进程是否运行在 gevent monkey patch 之下"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _worker_main(recv_conn, send_conn):
+    """计算子进程主循环：接收 (fn, args)，返回 (ok, result)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 由 Web worker 处理，子进程随之被结束
+    while True:
+        try:
+            fn, args = recv_conn.recv()
+        except (EOFError, OSError):  # 父进程已退出
+            return
+        try:
+            send_conn.send((True, fn(*args)))
+        except Exception:
+            send_conn.send((False, traceback.format_exc()))
+
+
+class _Worker:
+    """一个计算子进程及其管道"""
+
+    def __init__(self, ctx):
+        # 使用两条单向管道（os.pipe）：gevent 下双向管道基于 socketpair，会被设为非阻塞，读取大结果时出错
+        self.conn, child_send = ctx.Pipe(duplex=False)
+        child_recv, self.send_conn = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker_main, args=(child_recv, child_send), daemon=True)
+        self.process.start()
+        child_recv.close()
+        child_send.close()
+
+    def wait_readable(self, timeout: float) -> bool:
+        """等待结果，gevent 下只挂起当前 greenlet"""
+        if _gevent_patched():
+            from gevent.socket import wait_read
+            try:
+                wait_read(self.conn.fileno(), timeout=timeout, timeout_exc=ExecutorTimeout)
+            except ExecutorTimeout:
+                return False
+            return True
+        return self.conn.poll(timeout)
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        finally:
+            self.conn.close()
+            self.send_conn.close()
+
+
+class CPUExecutor:
+    """常驻计算子进程池"""
+
+    def __init__(self, workers: int, queue_limit: int, start_method: str):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.start_method = start_method
+        self._ctx = None
+        self._idle: List[_Worker] = []
+        self._slots = threading.BoundedSemaphore(max(workers, 1))
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.waiting = 0
+        self.running = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _check_fork(self):
+        """Web worker 由 master fork 出来时，丢弃从 master 继承的子进程句柄"""
+        if self._pid != os.getpid():
+            self._idle = []
+            self._slots = threading.BoundedSemaphore(max(self.workers, 1))
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+            self.waiting = self.running = 0
+
+    def _take_worker(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+                worker.kill()
+            if self._ctx is None:
+                self._ctx = multiprocessing.get_context(self.start_method)
+        return _Worker(self._ctx)
+
+    def _release_worker(self, worker: Optional[_Worker]):
+        if worker is not None:
+            with self._lock:
+                self._idle.append(worker)
+        self._slots.release()
+
+    def submit(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        在计算子进程中执行 fn(*args) 并等待结果
+
+        Args:
+            fn: 模块级函数（需要可序列化）
+            args: 参数（需要可序列化）
+            timeout: 截止时间（秒），默认 CPU_TASK_TIMEOUT
+
+        Raises:
+            ExecutorBusy: 等待的任务数超过上限
+            ExecutorTimeout: 超过截止时间
+            TaskError: 任务执行出错
+        """
+        if self.workers <= 0:  # 不使用子进程
+            return fn(*args)
+        self._check_fork()
+        timeout = CPU_TASK_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            if self.waiting >= self.queue_limit:
+                self.rejected += 1
+                raise ExecutorBusy(f"计算任务排队数已达上限{self.queue_limit}")
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.timeouts += 1
+            raise ExecutorTimeout("等待计算资源超时")
+
+        worker = None
+        with self._lock:
+            self.running += 1
+        try:
+            worker = self._take_worker()
+            worker.send_conn.send((fn, args))
+            if not worker.wait_readable(max(0.0, deadline - time.monotonic())):
+                worker.kill()  # 结束仍在计算的子进程，下次使用时重新启动
+                worker = None
+                with self._lock:
+                    self.timeouts += 1
+                raise ExecutorTimeout(f"计算超过{timeout:g}秒")
+            try:
+                ok, result = worker.conn.recv()
+            except (EOFError, OSError):  # 子进程异常退出
+                worker.kill()
+                worker = None
+                raise TaskError("计算子进程异常退出")
+        except BaseException:
+            if worker is not None:  # 中途出错（如请求被取消）时管道里可能残留结果，不再复用该子进程
+                worker.kill()
+                worker = None
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._release_worker(worker)
+        if not ok:
+            raise TaskError(result)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._idle:
+                worker.kill()
+            self._idle = []
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "idle": len(self._idle),
+                "running": self.running,
+                "waiting": self.waiting,
+                "queue_limit": self.queue_limit,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts
+            }
+
+
+cpu_executor = CPUExecutor(CPU_POOL_WORKERS, CPU_QUEUE_LIMIT, CPU_POOL_START_METHOD)
+
+
+def run_cpu(fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+    """在计算子进程中执行 fn(*args)，见 CPUExecutor.submit"""
+    return cpu_executor.submit(fn, *args, timeout=timeout)
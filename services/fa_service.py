@@ -0,0 +1,64 @@
+"""
+有限自动机服务
+正则表达式 -> NFA -> DFA -> 最小化DFA 的完整计算，供计算子进程执行；
+Web worker 进程内按正则表达式缓存计算结果
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import utils.Regex_to_DFAM as RF
+
+# 进程内缓存的正则表达式个数
+REGEX_CACHE_SIZE = int(os.environ.get('REGEX_CACHE_SIZE', 256))
+
+_results = OrderedDict()  # 正则表达式 -> 接口返回的 data
+_lock = threading.Lock()
+
+
+def cached_result(regex: str) -> Optional[Dict[str, Any]]:
+    """已缓存的计算结果（调用方只读），未缓存时返回 None"""
+    with _lock:
+        result = _results.get(regex)
+        if result is not None:
+            _results.move_to_end(regex)
+        return result
+
+
+def cache_result(regex: str, result: Dict[str, Any]) -> None:
+    with _lock:
+        _results[regex] = result
+        _results.move_to_end(regex)
+        while len(_results) > REGEX_CACHE_SIZE:
+            _results.popitem(last=False)
+
+
+def regex_to_dfam(regex: str) -> Optional[Dict[str, Any]]:
+    """
+    正则表达式转 NFA/DFA/最小化DFA
+
+    Returns:
+        接口返回的 data，正则表达式不合规时返回 None
+    """
+    if not RF.is_valid_regex(regex):
+        return None
+
+    RF.reset_state()  # Regex_to_DFAM 使用模块级全局状态，每次计算前重置
+
+    regex, cins = RF.insert_concatenation(regex)
+    profix = RF.shunt(regex)
+    nfa, NFA_dot_str = RF.Regex_to_NFA(profix)
+    table, table_to_num, initial_states, termination_states, transition_map, DFA_dot_str = RF.NFA_to_DFA(nfa, cins)
+    P, P_change, table_to_num_min, Min_DFA_dot_str = RF.Min_DFA(table_to_num, initial_states, termination_states, transition_map, cins)
+
+    return {
+        'table': table,  # NFA->DFA 的 转换表（子集法）
+        'table_to_num': table_to_num,  # NFA->DFA 的 状态转换表
+        'table_to_num_min': table_to_num_min,  # 最小化DFA 的 状态转换表
+        'P': P,  # 最小化DFA 的 结果
+        'P_change': P_change,  # 最小化DFA的结果 的 迭代过程
+        'NFA_dot_str': NFA_dot_str,  # 绘制NFA的dot
+        'DFA_dot_str': DFA_dot_str,  # 绘制DFA的dot
+        'Min_DFA_dot_str': Min_DFA_dot_str,  # 绘制最小化DFA的dot
+    }
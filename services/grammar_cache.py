@@ -0,0 +1,259 @@
+"""
+文法分析器缓存
+按 (分析器类型, 参数, 规范化产生式哈希) 缓存已经 init() 过的分析器，
+同一文法反复分析不同输入串时跳过 First/Follow、项目集族、DOT、分析表的构造，只执行 solve()
+进程内 LRU 未命中时再查 database/tables.db 持久化存储，所有 worker 共享
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from database.table_store import load_compiled, save_compiled
+from services.executor import run_cpu
+from utils.Class_LL1_GrammarAnalysis import LL1
+from utils.Class_LR0_GrammarAnalysis import LR0
+from utils.Class_SLR1_GrammarAnalysis import SLR1
+from utils.Class_LR1_GrammarAnalysis import LR1
+
+# 分析器类型
+ANALYZERS = {
+    'll1': LL1,
+    'lr0': LR0,
+    'slr1': SLR1,
+    'lr1': LR1,
+}
+
+# 缓存内存上限（字节），可通过环境变量调整
+GRAMMAR_CACHE_MAX_BYTES = int(os.environ.get('GRAMMAR_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# 是否启用持久化存储
+GRAMMAR_TABLE_STORE = os.environ.get('GRAMMAR_TABLE_STORE', '1') != '0'
+
+# 分析器序列化格式版本：分析器类的属性结构变化时需要加1，使旧的持久化记录失效
+ANALYZER_FORMAT_VERSION = 9
+
+
+# 产生式中不允许出现的控制字符、行分隔符（换行等会改变生成的分析程序源码等的结构）
+CONTROL_CHARS = re.compile('[\x00-\x1f\x7f-\x9f\u2028\u2029]')
+
+
+class InvalidProductions(ValueError):
+    """产生式不合法（含控制字符），由 server.py 的错误处理返回 {"code": 1, "message": ...}"""
+
+
+def normalize_productions(text_list: List[str]) -> List[str]:
+    """
+    规范化产生式：去掉首尾空白和空行（前端已去除产生式内部空白）
+
+    Raises:
+        InvalidProductions: 产生式内部含控制字符（如换行、回车）
+    """
+    productions = [line.strip() for line in text_list or [] if line and line.strip()]
+    for line in productions:
+        if CONTROL_CHARS.search(line):
+            raise InvalidProductions(f"产生式不能包含换行等控制字符: {line!r}")
+    return productions
+
+
+def grammar_hash(productions: List[str]) -> str:
+    """规范化产生式的哈希"""
+    return hashlib.sha256("\n".join(productions).encode('utf-8')).hexdigest()
+
+
+def algorithm_name(kind: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """算法标识：分析器类型 + 构造参数"""
+    return f"{kind}:{json.dumps(options or {}, sort_keys=True)}"
+
+
+def analyzer_key(kind: str, productions: List[str], options: Optional[Dict[str, Any]] = None) -> str:
+    """缓存键：分析器类型 + 构造参数 + 文法哈希"""
+    return f"{algorithm_name(kind, options)}:{grammar_hash(productions)}"
+
+
+def estimate_size(obj: Any) -> int:
+    """估算对象占用的内存（以序列化后的字节数近似），只在没有持久化存储给出的字节数时使用"""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class GrammarCache:
+    """按内存占用做 LRU 淘汰的分析器缓存"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (analyzer, size)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, analyzer: Any, size: Optional[int] = None) -> None:
+        """
+        :param size: 分析器序列化后的字节数（读写持久化存储时已得到），为None时另行序列化估算
+        """
+        if size is None:
+            size = estimate_size(analyzer)
+        if size > self.max_bytes:  # 单个分析器超过上限，不缓存
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[key] = (analyzer, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:  # 淘汰最久未使用的
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+grammar_cache = GrammarCache(GRAMMAR_CACHE_MAX_BYTES)
+
+
+def _reporting_step(step, name, on_progress):
+    def wrapper(*args, **kwargs):
+        on_progress(name)
+        return step(*args, **kwargs)
+    return wrapper
+
+
+def build_analyzer(kind: str, productions: List[str], options: Dict[str, Any],
+                   on_progress: Optional[Callable] = None) -> Any:
+    """
+    构造分析器并执行 init()（纯CPU计算，由计算子进程执行）
+
+    Args:
+        on_progress: 进度回调 on_progress(阶段, **进度)，每个 stepN_* 开始时回调一次；
+                     分析器支持 on_progress 属性时（如LR1），构造过程中也会回调
+    """
+    analyzer = ANALYZERS[kind](list(productions), **options)
+    if on_progress is None:
+        analyzer.init()
+        return analyzer
+
+    steps = [name for name in dir(type(analyzer)) if name.startswith('step')]
+    for name in steps:  # 实例属性覆盖类方法，init() 调用 self.stepN_* 时先回调
+        setattr(analyzer, name, _reporting_step(getattr(analyzer, name), name, on_progress))
+    if hasattr(analyzer, 'on_progress'):
+        analyzer.on_progress = on_progress
+    try:
+        analyzer.init()
+    finally:  # 去掉回调，分析器需要可序列化
+        for name in steps:
+            delattr(analyzer, name)
+        if hasattr(analyzer, 'on_progress'):
+            analyzer.on_progress = None
+    return analyzer
+
+
+def compile_analyzer(kind: str, text_list: List[str], on_progress: Optional[Callable] = None,
+                     **options) -> Any:
+    """
+    在当前进程中获取已 init() 的分析器：先查持久化存储，未命中时构造并保存（异步任务使用，不经过进程内缓存）
+    """
+    productions = normalize_productions(text_list)
+    g_hash = grammar_hash(productions)
+    algorithm = algorithm_name(kind, options)
+    analyzer = None
+    if GRAMMAR_TABLE_STORE:
+        analyzer = load_compiled(g_hash, algorithm, ANALYZER_FORMAT_VERSION)
+    if analyzer is None:
+        analyzer = build_analyzer(kind, productions, options, on_progress)
+        if GRAMMAR_TABLE_STORE:
+            save_compiled(g_hash, algorithm, ANALYZER_FORMAT_VERSION, analyzer)
+    return analyzer
+
+
+def get_analyzer(kind: str, text_list: List[str], **options) -> Any:
+    """
+    获取已 init() 的分析器，命中缓存时直接复用
+
+    Args:
+        kind: 分析器类型 (ll1, lr0, slr1, lr1)
+        text_list: 产生式列表
+        options: 分析器构造参数（如 LR1 的 max_states）
+
+    Returns:
+        分析器对象（调用方只读，不要原地修改其属性）
+    """
+    productions = normalize_productions(text_list)
+    key = analyzer_key(kind, productions, options)
+    analyzer = grammar_cache.get(key)
+    if analyzer is not None:
+        return analyzer
+
+    g_hash = grammar_hash(productions)
+    algorithm = algorithm_name(kind, options)
+    size = None  # 序列化后的字节数，读写持久化存储时顺便得到，不再单独序列化估算
+    if GRAMMAR_TABLE_STORE:  # 其他 worker 可能已经构造过
+        analyzer, size = load_compiled(g_hash, algorithm, ANALYZER_FORMAT_VERSION, with_size=True)
+    if analyzer is None:
+        analyzer = run_cpu(build_analyzer, kind, productions, options)  # 在计算子进程中构造
+        if GRAMMAR_TABLE_STORE:
+            size = save_compiled(g_hash, algorithm, ANALYZER_FORMAT_VERSION, analyzer)
+    grammar_cache.put(key, analyzer, size or None)
+    return analyzer
+
+
+def find_analyzer(kind: str, g_hash: str, **options) -> Any:
+    """按文法哈希查找已构造的分析器（进程内缓存或持久化存储），找不到时返回 None"""
+    algorithm = algorithm_name(kind, options)
+    key = f"{algorithm}:{g_hash}"
+    analyzer = grammar_cache.get(key)
+    if analyzer is None and GRAMMAR_TABLE_STORE:
+        analyzer, size = load_compiled(g_hash, algorithm, ANALYZER_FORMAT_VERSION, with_size=True)
+        if analyzer is not None:
+            grammar_cache.put(key, analyzer, size)
+    return analyzer
+
+
+def cache_analyzer(kind: str, productions: List[str], analyzer: Any, background: bool = False,
+                   **options) -> None:
+    """
+    保存在当前进程中构造的分析器（如增量分析的结果），之后可按文法获取
+
+    Args:
+        background: 在后台线程中写入持久化存储和进程内缓存，不阻塞当前请求
+    """
+    key = analyzer_key(kind, productions, options)
+    if not GRAMMAR_TABLE_STORE:
+        grammar_cache.put(key, analyzer)
+        return
+
+    def store():  # 写入持久化存储时已序列化，用其字节数作为缓存大小
+        size = save_compiled(grammar_hash(productions), algorithm_name(kind, options), ANALYZER_FORMAT_VERSION,
+                             analyzer)
+        grammar_cache.put(key, analyzer, size or None)
+
+    if background:
+        threading.Thread(target=store, daemon=True).start()
+    else:
+        store()
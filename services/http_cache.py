@@ -0,0 +1,194 @@
+"""
+分析接口的响应压缩与 ETag 协商缓存
+    - 压缩：JSON 响应超过 COMPRESS_MIN_BYTES 时按 Accept-Encoding 使用 brotli（已安装时）或 gzip 压缩
+    - ETag：由分析器类型、构造参数、规范化产生式（或正则表达式）和结果格式版本计算，与结果内容一一对应，
+      不需要先计算结果；请求带 If-None-Match 且一致时直接返回 304
+    - 进程内按 (ETag, 编码) 缓存序列化、压缩后的响应体，相同的请求不再重复分析、序列化和压缩
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, request
+
+from services.grammar_cache import ANALYZER_FORMAT_VERSION, algorithm_name, normalize_productions
+from services.json_response import dumps_bytes
+
+try:
+    import brotli
+except ImportError:  # 未安装时只使用 gzip
+    brotli = None
+
+# 响应体不小于该字节数时才压缩
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+
+# gzip 压缩级别（1-9）、brotli 压缩质量（0-11）
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+# 进程内响应体缓存的内存上限（字节）
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+# 结果格式版本：接口返回的 data 结构变化时需要加1，使客户端缓存的旧结果失效
+RESPONSE_FORMAT_VERSION = 1
+
+COMPRESSIBLE_MIMETYPES = {'application/json'}
+
+
+class ResponseCache:
+    """按内存占用做 LRU 淘汰的响应体缓存：(ETag, 编码) -> 字节串"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            self._entries[key] = body
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "total_bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+
+def request_params() -> Dict[str, Any]:
+    """
+    请求参数：POST 为 JSON 请求体；GET 为查询参数，inpProductions 可重复或用换行分隔，
+    prune 等布尔参数写作 1/true
+    """
+    if request.method != 'GET':
+        return request.get_json() or {}
+    params = {}
+    for key in request.args:
+        values = request.args.getlist(key)
+        if key == 'inpProductions':
+            params[key] = [line for value in values for line in value.split('\n')]
+        elif key == 'prune':
+            params[key] = values[-1].lower() in ('1', 'true', 'yes')
+        else:
+            params[key] = values[-1]
+    return params
+
+
+def content_etag(*parts: str) -> str:
+    """由内容计算 ETag 的值"""
+    text = "\0".join((str(RESPONSE_FORMAT_VERSION), str(ANALYZER_FORMAT_VERSION)) + parts)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def grammar_etag(kind: str, text_list: Any, options: Dict[str, Any]) -> Optional[str]:
+    """文法分析结果的 ETag，参数不合法时返回 None（不做协商缓存）"""
+    if not isinstance(text_list, list) or not all(isinstance(x, str) for x in text_list):
+        return None
+    return content_etag(algorithm_name(kind, options), *normalize_productions(text_list))
+
+
+def regex_etag(regex: Any) -> Optional[str]:
+    """正则表达式转换结果的 ETag"""
+    if not isinstance(regex, str):
+        return None
+    return content_etag("regex", json.dumps(regex, ensure_ascii=False))
+
+
+def choose_encoding() -> Optional[str]:
+    """按 Accept-Encoding 选择压缩方式，客户端不接受压缩时返回 None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _finish(response, encoding: Optional[str]):
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def compress_response(response):
+    """after_request：压缩较大的 JSON 响应（流式响应、已压缩的响应不处理）"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = choose_encoding()
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+    return _finish(response, encoding)
+
+
+def etag_response(etag: Optional[str], build: Callable[[], Dict[str, Any]]):
+    """
+    带 ETag 的 JSON 响应
+
+    Args:
+        etag: 由请求内容计算的 ETag（grammar_etag、regex_etag），为 None 时不做协商缓存
+        build: 计算接口返回的 {"code": ..., ...}，只有 code 为0的结果带 ETag、被缓存
+
+    Returns:
+        If-None-Match 一致时为 304；进程内缓存了响应体时直接使用；否则调用 build() 后序列化、压缩
+    """
+    if etag is None:
+        return current_app.json.response(build())
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    encoding = choose_encoding()
+    body = response_cache.get((etag, encoding))
+    if body is None:
+        identity = response_cache.get((etag, None))
+        if identity is None:
+            payload = build()
+            identity = dumps_bytes(payload) + b"\n"
+            if payload.get("code") != 0:
+                return current_app.response_class(identity, mimetype='application/json')
+            response_cache.put((etag, None), identity)
+        body = identity
+        if len(identity) < COMPRESS_MIN_BYTES:
+            encoding = None
+        elif encoding is not None:
+            body = compress(identity, encoding)
+            response_cache.put((etag, encoding), body)
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'  # 客户端可以缓存，使用前用 If-None-Match 验证
+    return _finish(response, encoding)
@@ -0,0 +1,53 @@
+"""
+外部 HTTP 客户端（requests 会话、OpenAI 客户端）
+每个进程首次使用时才创建，之后复用其中的连接池；
+连接池中的 socket 不能跨 fork 共用，gunicorn 预加载应用时 master 中不创建客户端，
+worker fork 后由 post_fork 调用 reset_clients()（进程号变化时也会自动丢弃继承来的客户端）
+"""
+import os
+import threading
+from typing import Any
+
+_lock = threading.Lock()
+_pid = os.getpid()
+_session = None
+_openai_clients = {}  # (base_url, api_key) -> OpenAI
+
+
+def reset_clients():
+    """丢弃当前进程中的客户端（fork 后调用）"""
+    global _lock, _pid, _session, _openai_clients
+    _lock = threading.Lock()
+    _pid = os.getpid()
+    _session = None
+    _openai_clients = {}
+
+
+def _check_fork():
+    if _pid != os.getpid():
+        reset_clients()
+
+
+def get_http_session() -> Any:
+    """当前进程共用的 requests.Session"""
+    global _session
+    _check_fork()
+    with _lock:
+        if _session is None:
+            import requests
+            _session = requests.Session()
+        return _session
+
+
+def get_openai_client(api_key: str, base_url: str) -> Any:
+    """按 (base_url, api_key) 复用的 OpenAI 客户端，密钥更换后丢弃同一 base_url 的旧客户端"""
+    _check_fork()
+    key = (base_url, api_key)
+    with _lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            from openai import OpenAI  # 导入较慢（约1秒），首次调用AI接口时才导入
+            for old in [k for k in _openai_clients if k[0] == base_url]:
+                del _openai_clients[old]
+            client = _openai_clients[key] = OpenAI(api_key=api_key, base_url=base_url)
+        return client
@@ -0,0 +1,131 @@
+"""
+增量文法分析服务
+前端逐条编辑产生式时，只提交修改前文法的哈希和本次修改（diff），服务端在修改前的分析器上增量分析：
+First/Follow 只重算受影响的强连通分量，沿用核心项目未受影响的闭包、DOT语句和分析表行（见 SLR1.init(base)）
+增量分析与完整分析一样在计算子进程中执行（有截止时间），修改前的分析器随任务传给子进程；
+修改较大、算法不支持增量分析时退回完整分析
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.executor import TaskError, run_cpu
+from services.grammar_cache import (ANALYZERS, analyzer_key, cache_analyzer, find_analyzer, get_analyzer,
+                                    grammar_cache, grammar_hash, normalize_productions)
+
+# 支持增量分析的分析器类型（LL1 的 First/Follow 需要先消除左递归，LR1 的项目带展望符，都做完整分析）
+INCREMENTAL_KINDS = ('lr0', 'slr1')
+
+# 修改的产生式条数超过原文法条数的该比例时，直接完整分析
+INCREMENTAL_MAX_RATIO = float(os.environ.get('INCREMENTAL_MAX_RATIO', 0.5))
+
+# 分析方式
+MODE_CACHED = 'cached'  # 修改后的文法已分析过（如撤销修改）
+MODE_INCREMENTAL = 'incremental'
+MODE_FULL = 'full'
+
+
+class DiffError(ValueError):
+    """修改内容不合法"""
+
+
+class BaseNotFound(Exception):
+    """找不到修改前文法的分析器（已被淘汰或从未分析过）"""
+
+
+def apply_diff(productions: List[str], diff: Any) -> List[str]:
+    """
+    按顺序对产生式列表应用修改，每条修改的 index 以上一条修改后的列表为准
+
+    Args:
+        productions: 修改前的产生式列表
+        diff: [{"op": "replace", "index": 1, "production": "A->b"},
+               {"op": "insert", "index": 2, "production": "B->c"},
+               {"op": "delete", "index": 0}]
+
+    Raises:
+        DiffError: 修改内容不合法
+    """
+    if not isinstance(diff, list):
+        raise DiffError("diff 必须是修改列表")
+    result = list(productions)
+    for change in diff:
+        if not isinstance(change, dict):
+            raise DiffError("diff 中的每一项必须是对象")
+        op = change.get('op')
+        index = change.get('index')
+        production = change.get('production')
+        upper = len(result) if op == 'insert' else len(result) - 1
+        if not isinstance(index, int) or not 0 <= index <= upper:
+            raise DiffError(f"修改的位置 {index} 超出范围")
+        if op in ('replace', 'insert') and not isinstance(production, str):
+            raise DiffError(f"{op} 缺少 production")
+        if op == 'replace':
+            result[index] = production
+        elif op == 'insert':
+            result.insert(index, production)
+        elif op == 'delete':
+            del result[index]
+        else:
+            raise DiffError(f"不支持的修改类型: {op}，可选 replace, insert, delete")
+    return result
+
+
+def build_incremental(kind: str, productions: List[str], base: Any, options: Dict[str, Any]) -> Any:
+    """在修改前的分析器上增量构造（纯CPU计算，由计算子进程执行）"""
+    analyzer = ANALYZERS[kind](list(productions), **options)
+    analyzer.init(base)
+    return analyzer
+
+
+def reanalyse(kind: str, base_hash: Optional[str], diff: Any, text_list: Optional[List[str]] = None,
+              **options) -> Tuple[Any, List[str], str]:
+    """
+    分析修改后的文法
+
+    Args:
+        kind: 分析器类型 (ll1, lr0, slr1, lr1)
+        base_hash: 修改前文法的哈希（规范化产生式的 sha256）
+        diff: 本次修改，见 apply_diff
+        text_list: 修改后的完整产生式，找不到修改前的分析器时使用（可选）
+        options: 分析器构造参数
+
+    Returns:
+        (分析器, 修改后的规范化产生式, 分析方式)
+
+    Raises:
+        DiffError: 修改内容不合法
+        BaseNotFound: 找不到修改前的分析器，且没有提交完整产生式
+    """
+    base = find_analyzer(kind, base_hash, **options) if base_hash else None
+    if base is None:
+        if text_list is None:
+            raise BaseNotFound(base_hash)
+        productions = normalize_productions(text_list)
+        return get_analyzer(kind, productions, **options), productions, MODE_FULL
+
+    productions = normalize_productions(apply_diff(base.grammar_list, diff))
+    if not productions:
+        raise DiffError("修改后的文法为空")
+    analyzer = grammar_cache.get(analyzer_key(kind, productions, options))  # 只查进程内缓存，不为每次按键查库
+    if analyzer is not None:
+        return analyzer, productions, MODE_CACHED
+    if kind not in INCREMENTAL_KINDS or len(diff) > INCREMENTAL_MAX_RATIO * len(base.grammar_list):
+        return get_analyzer(kind, productions, **options), productions, MODE_FULL
+
+    try:
+        analyzer = run_cpu(build_incremental, kind, productions, base, options)
+    except TaskError as e:  # 文法不合法等，交给完整分析按原有方式处理（超时、繁忙照常返回 504/503）
+        print(f"[Incremental] 增量分析失败，改为完整分析: {str(e).strip().splitlines()[-1]}")
+        return get_analyzer(kind, productions, **options), productions, MODE_FULL
+    cache_analyzer(kind, productions, analyzer, background=True, **options)  # 其他 worker 之后也能以它为基础
+    return analyzer, productions, MODE_INCREMENTAL
+
+
+def reanalyse_info(analyzer: Any, productions: List[str], mode: str) -> Dict[str, Any]:
+    """增量分析接口返回的附加信息"""
+    return {
+        "grammarHash": grammar_hash(productions),
+        "inpProductions": productions,
+        "mode": mode,
+        "reuse": analyzer.reuse_info if mode == MODE_INCREMENTAL else {}
+    }
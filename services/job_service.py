@@ -0,0 +1,152 @@
+"""
+异步分析任务服务
+耗时较长的分析（大型LR(1)项目集族、复杂正则表达式的DFA、大批量输入串分析）提交为任务后立即返回任务ID，
+任务在独立的计算子进程中执行，进度和结果写入 jobs.db，客户端轮询或通过 SSE 获取
+"""
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from database.job_store import create_job, fail_job, finish_job, update_job_progress
+from services.analysis_data import ANALYSIS_DATA, analyzer_options, check_analyzer_params, lr1_over_budget_message
+from services.batch_service import batch_summary, check_batch_inputs, parse_inputs
+from services.executor import (CPU_POOL_START_METHOD, CPUExecutor, ExecutorBusy, ExecutorTimeout,
+                               TaskError)
+from services.fa_service import regex_to_dfam
+from services.grammar_cache import InvalidProductions, compile_analyzer, normalize_productions
+from utils.Parse_Trace import parse_trace_mode
+from utils.Parse_Tree import parse_tree_format
+
+# 任务类型：四种文法分析、正则表达式转DFA、批量输入串分析
+JOB_TYPES = ('ll1', 'lr0', 'slr1', 'lr1', 'fa', 'batch')
+
+# 任务执行时限（秒）
+JOB_TIMEOUT = float(os.environ.get('JOB_TIMEOUT', 600))
+
+# 任务完成后结果的保留时间（秒）
+JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 3600))
+
+# 每个 Web worker 执行任务的计算子进程数（与同步接口的计算子进程分开，长任务不影响同步接口）
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+
+# 每个 Web worker 排队等待执行的任务数上限
+JOB_QUEUE_LIMIT = int(os.environ.get('JOB_QUEUE_LIMIT', 16))
+
+# 进度写入的最小间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
+# 批量分析时每分析多少个输入串汇报一次进度
+BATCH_PROGRESS_EVERY = 50
+
+job_executor = CPUExecutor(JOB_WORKERS, JOB_QUEUE_LIMIT, CPU_POOL_START_METHOD)
+
+
+class ProgressReporter:
+    """计算子进程中的进度回调：阶段变化时立即写入，同一阶段内按时间间隔节流"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.stage = None
+        self.last_time = 0.0
+
+    def __call__(self, stage: str, **progress):
+        now = time.monotonic()
+        if stage == self.stage and now - self.last_time < PROGRESS_INTERVAL:
+            return
+        self.stage = stage
+        self.last_time = now
+        update_job_progress(self.job_id, stage, progress)
+
+
+def check_job_params(job_type: str, params: Any) -> str:
+    """校验任务参数，合法时返回空串，否则返回错误信息"""
+    if job_type not in JOB_TYPES:
+        return f"不支持的任务类型: {job_type}，可选 {', '.join(JOB_TYPES)}"
+    if not isinstance(params, dict):
+        return "params 必须是对象"
+    if job_type == 'fa':
+        return "" if isinstance(params.get('inpRegex'), str) else "缺少 inpRegex"
+    productions = params.get('inpProductions')
+    if not isinstance(productions, list):
+        return "缺少 inpProductions"
+    if not all(isinstance(x, str) for x in productions):
+        return "inpProductions 必须是字符串列表"
+    try:
+        normalize_productions(productions)
+    except InvalidProductions as e:
+        return str(e)
+    if job_type == 'batch':
+        if params.get('algorithm') not in ANALYSIS_DATA:
+            return f"algorithm 必须是 {', '.join(ANALYSIS_DATA)} 之一"
+        return check_batch_inputs(params.get('inpStrs')) or check_analyzer_params(params['algorithm'], params)
+    return check_analyzer_params(job_type, params)
+
+
+def _run_analysis(kind: str, params: Dict[str, Any], report: ProgressReporter) -> Dict[str, Any]:
+    analyzer = compile_analyzer(kind, params['inpProductions'], report, **analyzer_options(kind, params))
+    if kind == 'lr1' and analyzer.over_budget:
+        return {"code": 1, "message": lr1_over_budget_message(analyzer)}
+    return {"code": 0, "data": ANALYSIS_DATA[kind](analyzer)}
+
+
+def _run_batch(params: Dict[str, Any], report: ProgressReporter) -> Dict[str, Any]:
+    kind = params['algorithm']
+    analyzer = compile_analyzer(kind, params['inpProductions'], report, **analyzer_options(kind, params))
+    if kind == 'lr1' and analyzer.over_budget:
+        return {"code": 1, "message": lr1_over_budget_message(analyzer)}
+    inputs = params['inpStrs']
+    trace = parse_trace_mode(params.get('trace', 'none'))
+    tree_format = parse_tree_format(params.get('tree'))
+    results = []
+    for start in range(0, len(inputs), BATCH_PROGRESS_EVERY):
+        report('parse', done=start, total=len(inputs))
+        results.extend(parse_inputs(analyzer, inputs[start:start + BATCH_PROGRESS_EVERY], trace, tree_format))
+    return {"code": 0, "data": batch_summary(results)}
+
+
+def run_job(job_id: str, job_type: str, params: Dict[str, Any]) -> None:
+    """执行任务（在计算子进程中），结果直接写入任务存储"""
+    report = ProgressReporter(job_id)
+    report('start')
+    if job_type == 'fa':
+        report('regex_to_dfam')
+        data = regex_to_dfam(params['inpRegex'])
+        result = {"code": 0, "data": data} if data is not None else \
+            {"code": 1, "message": "不合规的正则表达式，请重新输入！"}
+    elif job_type == 'batch':
+        result = _run_batch(params, report)
+    else:
+        result = _run_analysis(job_type, params, report)
+    finish_job(job_id, result, JOB_RESULT_TTL)
+
+
+def _execute_job(job_id: str, job_type: str, params: Dict[str, Any]) -> None:
+    """后台线程（gevent 下为 greenlet）：等待计算子进程执行任务，处理失败"""
+    try:
+        job_executor.submit(run_job, job_id, job_type, params, timeout=JOB_TIMEOUT)
+    except ExecutorTimeout:
+        fail_job(job_id, f"任务超过{JOB_TIMEOUT:g}秒未完成", JOB_RESULT_TTL)
+    except ExecutorBusy:
+        fail_job(job_id, "服务繁忙，请稍后再试", JOB_RESULT_TTL)
+    except TaskError as e:
+        fail_job(job_id, str(e).strip().splitlines()[-1], JOB_RESULT_TTL)
+    except Exception as e:
+        fail_job(job_id, f"任务执行失败: {e}", JOB_RESULT_TTL)
+
+
+def submit_job(job_type: str, params: Dict[str, Any]) -> str:
+    """
+    提交任务
+
+    Returns:
+        任务ID
+
+    Raises:
+        ExecutorBusy: 当前 worker 排队的任务已满
+    """
+    if job_executor.stats()["waiting"] >= JOB_QUEUE_LIMIT:
+        raise ExecutorBusy(f"任务排队数已达上限{JOB_QUEUE_LIMIT}")
+    job_id = create_job(job_type, JOB_TIMEOUT, JOB_RESULT_TTL)
+    threading.Thread(target=_execute_job, args=(job_id, job_type, params), daemon=True).start()
+    return job_id
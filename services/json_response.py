@@ -0,0 +1,85 @@
+"""
+接口响应的 JSON 序列化
+安装了 orjson 时使用 orjson（直接生成 UTF-8 字节串，比标准库快数倍），否则使用标准库 json；
+两种方式都支持 set/frozenset（转为列表）和元组键（按 "x|y" 连接，与 analysis_data.table_keys_to_str 一致），
+键按字典序排列、非 ASCII 字符不转义，两种方式的输出相同
+server.py 中设置 app.json = FastJSONProvider(app) 后，所有 jsonify 都使用这里的序列化
+"""
+import json
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider, _default as flask_default
+
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库
+    orjson = None
+
+if orjson is not None:
+    # datetime 交给 default 处理，与 Flask 一致（HTTP 日期格式）
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def default(o: Any) -> Any:
+    """标准库 json、orjson 不能直接序列化的对象"""
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    return flask_default(o)
+
+
+def _key(key: Any) -> Any:
+    if isinstance(key, tuple):
+        return "|".join(str(x) for x in key)
+    return key
+
+
+def jsonable(obj: Any) -> Any:
+    """把元组键转为 "x|y" 字符串（只在直接序列化失败时调用，常见的响应不需要复制）"""
+    if isinstance(obj, dict):
+        return {_key(k): jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [jsonable(v) for v in obj]
+    return obj
+
+
+def _std_dumps(obj: Any, indent: bool) -> str:
+    kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+    try:
+        return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=True, **kwargs)
+    except TypeError:  # 元组键
+        return json.dumps(jsonable(obj), default=default, ensure_ascii=False, sort_keys=True, **kwargs)
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """序列化为 UTF-8 字节串"""
+    if orjson is None:
+        return _std_dumps(obj, indent).encode('utf-8')
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    try:
+        return orjson.dumps(obj, default=default, option=option)
+    except TypeError:  # 元组键（orjson.JSONEncodeError 是 TypeError 的子类）
+        return orjson.dumps(jsonable(obj), default=default, option=option)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """序列化为字符串"""
+    if orjson is None:
+        return _std_dumps(obj, indent)
+    return dumps_bytes(obj, indent).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON 提供者：jsonify 直接由字节串构造响应，不经过中间的字符串"""
+
+    default = staticmethod(default)
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:  # 指定了参数时使用标准库
+            return super().dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,49 @@
+"""
+输入串分析服务
+文法符合分析器对应的分析方法时用分析器的分析总控程序（solve），
+不符合时（表中有冲突）改用 Earley 通用分析程序给出结论和一棵语法树，结果中 info_parser 为 "earley"；
+Earley 分析在二义性文法上为立方时间，单个输入串的分析在计算子进程中执行（有截止时间）
+"""
+from typing import Any, Dict, List, Optional
+
+from services.codegen_service import analyzer_kind
+from services.executor import run_cpu
+from utils.Earley_Parser import EarleyParser
+
+# 分析器类型 -> 文法是否符合该分析方法的属性
+CONFORM_FLAGS = {'ll1': 'isLL1', 'lr0': 'isLR0', 'slr1': 'isSLR1', 'lr1': 'isLR1'}
+
+
+def table_usable(analyzer) -> bool:
+    """文法是否符合分析器对应的分析方法（分析表无冲突）"""
+    return bool(getattr(analyzer, CONFORM_FLAGS[analyzer_kind(analyzer)]))
+
+
+def general_parser(analyzer) -> Optional[EarleyParser]:
+    """文法不符合分析方法时的通用分析程序，符合时为None"""
+    return None if table_usable(analyzer) else EarleyParser(analyzer.grammar_list)
+
+
+def general_solve(grammar_list: List[str], inp_str: str, tree_format: Optional[str] = None) -> Dict[str, Any]:
+    """用通用分析程序分析一个输入串（纯CPU计算，由计算子进程执行）"""
+    return EarleyParser(grammar_list).solve(inp_str, tree_format)
+
+
+def solve_input(analyzer, inp_str: str, trace: str, tree_format: Optional[str] = None,
+                general: Optional[EarleyParser] = None) -> Dict[str, Any]:
+    """
+    分析一个输入串
+
+    Args:
+        general: 已构造的通用分析程序（批量分析时在计算子进程中只构造一次）；
+                 为None且文法不符合分析方法时，在计算子进程中用通用分析程序分析
+
+    Returns:
+        分析器 solve() 的结果；改用通用分析程序时只有结论（info_res）、语法树（info_tree），
+        以及 info_parser、info_items（项目总数），没有分析过程
+    """
+    if general is not None:
+        return general.solve(inp_str, tree_format)
+    if table_usable(analyzer):
+        return analyzer.solve(inp_str, trace, tree_format)
+    return run_cpu(general_solve, analyzer.grammar_list, inp_str, tree_format)
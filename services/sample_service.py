@@ -0,0 +1,77 @@
+"""
+随机句子生成服务
+按目标长度生成文法的随机句子及近似句子（单个终结符替换/插入/删除），用于出练习题、测试和压测分析程序
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from services.analysis_data import lr1_options
+from services.codegen_service import compiled_parser
+from services.executor import run_cpu
+from services.grammar_cache import get_analyzer, grammar_hash, normalize_productions
+from utils.Grammar_Sampler import SentenceSampler
+
+# 句子的最大长度
+SAMPLE_MAX_LENGTH = int(os.environ.get('SAMPLE_MAX_LENGTH', 2000))
+
+# 单次请求最多生成的句子（近似句子）个数
+SAMPLE_MAX_COUNT = int(os.environ.get('SAMPLE_MAX_COUNT', 1000))
+
+
+def check_sample_params(length: Any, count: Any, near_misses: Any) -> str:
+    """校验生成参数，合法时返回空串，否则返回错误信息"""
+    if not isinstance(length, int) or not 0 <= length <= SAMPLE_MAX_LENGTH:
+        return f"length 必须是 0 到 {SAMPLE_MAX_LENGTH} 之间的整数"
+    for name, value in (("count", count), ("nearMisses", near_misses)):
+        if not isinstance(value, int) or not 0 <= value <= SAMPLE_MAX_COUNT:
+            return f"{name} 必须是 0 到 {SAMPLE_MAX_COUNT} 之间的整数"
+    return ""
+
+
+def run_sample(productions: List[str], length: int, count: int, near_misses: int,
+               seed: Optional[int], lr1=None) -> Dict[str, Any]:
+    """
+    生成句子（纯CPU计算，由计算子进程执行）
+
+    Args:
+        lr1: 文法是LR(1)文法时的分析器，用它生成的分析程序去掉仍然合法的近似句子
+    """
+    max_length = min(max(2 * length, length + 8), SAMPLE_MAX_LENGTH)  # 留出余量，推不出目标长度时找最接近的长度
+    sampler = SentenceSampler(productions, max_length, seed)
+    actual = sampler.nearest_length(length)
+    sentences = sampler.sentences(actual, count) if actual is not None else []
+    parse = compiled_parser(lr1) if lr1 is not None else None
+    accepts = (lambda s: parse(s) == "Success!") if parse is not None else None
+    return {
+        "minLength": sampler.min_lengths,
+        "length": actual,
+        "sentences": sentences,
+        "nearMisses": sampler.near_misses(sentences, near_misses, accepts),
+        "verified": accepts is not None
+    }
+
+
+def sample_grammar(text_list: List[str], length: int, count: int = 10, near_misses: int = 0,
+                   seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    生成文法的随机句子
+
+    Args:
+        length: 目标长度，推不出该长度的句子时使用最接近的长度
+        count: 句子个数
+        near_misses: 近似句子个数
+        seed: 随机数种子
+
+    Returns:
+        {"grammarHash", "minLength": 各非终结符的最短推导长度, "length": 实际长度（语言为空时为None）,
+         "sentences": [...], "nearMisses": [...], "verified": 近似句子是否都已确认不是句子}
+    """
+    productions = normalize_productions(text_list)
+    lr1 = None
+    if near_misses:
+        analyzer = get_analyzer('lr1', productions, **lr1_options({}))
+        if analyzer.isLR1:
+            lr1 = analyzer
+    result = run_cpu(run_sample, productions, length, count, near_misses, seed, lr1)
+    result["grammarHash"] = grammar_hash(productions)
+    return result
@@ -0,0 +1,145 @@
+"""
+按单词书写的文法的分析服务
+文法编码为单字符产生式（utils/Grammar_Tokens.py）后由各分析器分析，与其他分析接口共用分析器缓存；
+输入串经词法分析（utils/Token_Lexer.py）得到单词序列，编码为字符串后分析，结果中的编码字符再还原为名字
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.analysis_data import ANALYSIS_DATA, lr1_over_budget_message
+from services.batch_service import batch_summary, check_batch_inputs, parse_batch
+from services.executor import run_cpu
+from services.grammar_cache import get_analyzer
+from services.parse_service import table_usable
+from utils.Grammar_Tokens import TokenGrammar, TokenGrammarError
+from utils.Token_Lexer import LexError, Lexer, expand_classes
+import utils.Regex_to_DFAM as RF
+
+# 单词类别定义的最大个数
+TOKEN_MAX_DEFINITIONS = int(os.environ.get('TOKEN_MAX_DEFINITIONS', 64))
+
+# 计算子进程内缓存的词法分析器个数
+LEXER_CACHE_SIZE = 16
+
+_lexers = OrderedDict()  # (单词类别定义, 字面终结符) -> Lexer
+_lock = threading.Lock()
+
+
+def parse_definitions(value: Any) -> Tuple[List[Tuple[str, str]], str]:
+    """
+    单词类别定义参数（{名字: 正则表达式} 或 [[名字, 正则表达式], ...]）-> ([(名字, 正则表达式), ...], 错误信息)
+    """
+    pairs = list(value.items()) if isinstance(value, dict) else value
+    if pairs is None:
+        return [], ""
+    if not isinstance(pairs, list) or not all(isinstance(p, (list, tuple)) and len(p) == 2
+                                              and all(isinstance(x, str) and x for x in p) for p in pairs):
+        return [], "tokens 必须是 {名字: 正则表达式} 或 [[名字, 正则表达式], ...]"
+    if len(pairs) > TOKEN_MAX_DEFINITIONS:
+        return [], f"单词类别个数超过上限{TOKEN_MAX_DEFINITIONS}"
+    for name, regex in pairs:
+        expanded = expand_classes(regex)
+        if expanded is None or not RF.is_valid_regex(expanded):
+            return [], f"单词类别 {name} 的正则表达式不合规：{regex}"
+    return [(name, regex) for name, regex in pairs], ""
+
+
+def get_lexer(definitions: List[Tuple[str, str]], literals: List[str]) -> Lexer:
+    key = (tuple(definitions), tuple(literals))
+    with _lock:
+        if key in _lexers:
+            _lexers.move_to_end(key)
+            return _lexers[key]
+    lexer = Lexer(definitions, literals)
+    with _lock:
+        _lexers[key] = lexer
+        while len(_lexers) > LEXER_CACHE_SIZE:
+            _lexers.popitem(last=False)
+    return lexer
+
+
+def tokenize_inputs(definitions: List[Tuple[str, str]], literals: List[str],
+                    texts: List[str]) -> List[Dict[str, Any]]:
+    """词法分析（纯CPU计算，由计算子进程执行）：每个输入串 -> {"tokens": [...]} 或 {"error": 出错信息}"""
+    lexer = get_lexer(definitions, literals)
+    results = []
+    for text in texts:
+        try:
+            results.append({"tokens": lexer.tokenize(text)})
+        except LexError as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def analyse_tokens(kind: str, lines: List[str], definitions: List[Tuple[str, str]], texts: List[str],
+                   trace: str = 'none', tree_format: Optional[str] = None, **options) -> Dict[str, Any]:
+    """
+    分析按单词书写的文法，并对输入串做词法分析和语法分析
+
+    Args:
+        kind: 分析器类型 (ll1, lr0, slr1, lr1)
+        lines: 按单词书写的产生式
+        definitions: 单词类别 [(名字, 正则表达式), ...]
+        texts: 输入串
+        options: 分析器构造参数
+
+    Returns:
+        {"productions": 规范化的产生式, "encoded": 编码后的单字符产生式（可直接用于其他分析接口）,
+         "symbols": 符号表, "conforms": 文法是否符合该分析方法, "analysis": 分析结果（已还原为名字）,
+         "total", "accepted", "results": 每个输入串的单词序列 tokens 和分析结果}
+        LR(1) 状态数超过预算时 analysis 为None，message 为出错信息
+    Raises:
+        TokenGrammarError: 文法写法有误或用到了未定义的单词类别
+    """
+    grammar = TokenGrammar(lines)
+    table = grammar.table
+    defined = {name for name, _ in definitions}
+    for name in table.token_names:
+        if name not in defined:
+            raise TokenGrammarError(f"单词类别 {name} 没有定义正则表达式（tokens）")
+    productions = grammar.productions()
+    analyzer = get_analyzer(kind, productions, **options)
+    data = {
+        "productions": grammar.display(),
+        "encoded": productions,
+        "symbols": table.to_dict(),
+        "analysis": None
+    }
+    if kind == 'lr1' and analyzer.over_budget:
+        data["message"] = lr1_over_budget_message(analyzer)
+        return data
+    data["conforms"] = table_usable(analyzer)
+    data["analysis"] = table.decode(ANALYSIS_DATA[kind](analyzer))
+
+    lexed = run_cpu(tokenize_inputs, definitions, table.literals, texts) if texts else []
+    encoded, positions = [], []
+    results = []
+    for text, lex in zip(texts, lexed):
+        result = {"inpStr": text, "accepted": False}
+        if "error" in lex:
+            result["info_res"] = lex["error"]
+        else:
+            result["tokens"] = [list(token) for token in lex["tokens"]]
+            unknown = [name for name, _, _ in lex["tokens"] if name not in table.terminals]
+            if unknown:
+                result["info_res"] = f"词法错误：单词类别 {unknown[0]} 不是文法的终结符"
+            else:
+                encoded.append("".join(table.terminals[name] for name, _, _ in lex["tokens"]))
+                positions.append(len(results))
+        results.append(result)
+    for k, info in zip(positions, parse_batch(analyzer, encoded, trace, tree_format)):
+        info = table.decode(info)
+        info.pop("inpStr", None)
+        results[k].update(info)
+    data.update(batch_summary(results))
+    return data
+
+
+def check_token_params(data: Dict[str, Any]) -> str:
+    """校验请求参数，合法时返回空串，否则返回错误信息"""
+    lines = data.get('inpProductions')
+    if not isinstance(lines, list) or not all(isinstance(x, str) for x in lines):
+        return "inpProductions 必须是字符串列表"
+    return check_batch_inputs(data.get('inpStrs', []))
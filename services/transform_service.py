@@ -0,0 +1,48 @@
+"""
+文法变换服务
+消除左递归、提取左公因子，返回变换后的产生式和变换过程（大文法上代入可能较多，在计算子进程中执行）
+"""
+from typing import Any, Dict, List
+
+from services.executor import run_cpu
+from services.grammar_cache import normalize_productions
+from utils.Grammar_Transform import NAMING_PRIME, NAMINGS, OPERATIONS, GrammarTransformer, TransformError
+
+
+def check_transform_params(operations: Any, naming: Any) -> str:
+    """校验变换参数，合法时返回空串，否则返回错误信息"""
+    if not isinstance(operations, list) or not operations:
+        return "operations 必须是非空列表"
+    for operation in operations:
+        if operation not in OPERATIONS:
+            return f"不支持的变换: {operation}，可选 {', '.join(OPERATIONS)}"
+    if naming not in NAMINGS:
+        return f"naming 必须是 {', '.join(NAMINGS)} 之一"
+    return ""
+
+
+def run_transform(productions: List[str], operations: List[str], naming: str) -> Dict[str, Any]:
+    transformer = GrammarTransformer(productions, naming)
+    try:
+        transformer.transform(operations)
+    except TransformError as e:  # 在计算子进程中执行，出错信息随结果返回
+        return {"error": str(e)}
+    return transformer.result()
+
+
+def transform_grammar(text_list: List[str], operations: List[str] = OPERATIONS,
+                      naming: str = NAMING_PRIME) -> Dict[str, Any]:
+    """
+    变换文法
+
+    Returns:
+        {"productions": 变换后的产生式, "newSymbols": 新增的非终结符,
+         "steps": 变换过程, "singleChar": 是否都是单字符符号（可直接交给各分析器）}
+
+    Raises:
+        TransformError: 无法变换（如消除左递归时代入次数超过上限）
+    """
+    result = run_cpu(run_transform, normalize_productions(text_list), list(operations), naming)
+    if "error" in result:
+        raise TransformError(result["error"])
+    return result
@@ -0,0 +1,126 @@
+"""
+多算法统一分析服务
+一次请求分析同一文法的多种算法时，预处理、First/Follow、LR(0)项目集规范族及其DFA图只计算一次（SLR1.prepare()），
+LL1、LR0、SLR1、LALR(1)、LR(1) 都由这些共享结果导出（LL1 只用其中的First/Follow集，增广文法上的结果去掉 S' 即可）
+"""
+from typing import Any, Dict, List, Tuple
+
+from services.analysis_data import ANALYSIS_DATA, lr1_options, lr1_over_budget_message, prune_options
+from services.catalog_service import catalog_data
+from services.executor import run_cpu
+from services.grammar_cache import ANALYZERS, cache_analyzer, find_analyzer, grammar_hash, normalize_productions
+from utils.Class_SLR1_GrammarAnalysis import SLR1
+
+# 算法名 -> (分析器类型, 构造参数)，构造参数与单独分析的接口一致，结果可以互相命中缓存
+ALGORITHMS = {
+    'll1': ('ll1', {}),
+    'lr0': ('lr0', {}),
+    'slr1': ('slr1', {}),
+    'lalr1': ('lr1', lr1_options({'lalr': True})),
+    'lr1': ('lr1', lr1_options({})),
+}
+
+
+def parse_algorithms(value: Any) -> List[str]:
+    """
+    解析要分析的算法，支持 "ll1,lr0" 或 ["ll1", "lr0"]，去重并保持顺序
+
+    Raises:
+        ValueError: 为空或含不支持的算法
+    """
+    names = value.split(',') if isinstance(value, str) else value
+    if not isinstance(names, list):
+        raise ValueError("algorithms 必须是逗号分隔的字符串或列表")
+    algorithms = []
+    for name in names:
+        name = str(name).strip().lower()
+        if not name:
+            continue
+        if name not in ALGORITHMS:
+            raise ValueError(f"不支持的算法: {name}，可选 {', '.join(ALGORITHMS)}")
+        if name not in algorithms:
+            algorithms.append(name)
+    if not algorithms:
+        raise ValueError("algorithms 不能为空")
+    return algorithms
+
+
+def algorithm_options(name: str, prune: bool = False) -> Tuple[str, Dict[str, Any]]:
+    """算法名 -> (分析器类型, 构造参数)"""
+    kind, options = ALGORITHMS[name]
+    return kind, {**options, **prune_options({"prune": prune})}
+
+
+def build_analyzers(productions: List[str], algorithms: List[str],
+                    prune: bool = False) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    构造多个分析器，都共用同一个 prepare() 过的SLR1分析器（由计算子进程执行）；
+    只分析LL1时不需要项目集规范族，LL1 自行计算First/Follow集
+
+    Returns:
+        ({算法名: 分析器}, {算法名: 出错信息})，某个算法出错不影响其他算法
+    """
+    shared = None
+    analyzers = {}
+    errors = {}
+    for name in algorithms:
+        kind, options = algorithm_options(name, prune)
+        try:
+            if shared is None and algorithms != ['ll1']:
+                shared = SLR1(list(productions), prune)
+                shared.prepare()
+            analyzer = ANALYZERS[kind](list(productions), **options)
+            analyzer.init(shared=shared)
+            analyzers[name] = analyzer
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return analyzers, errors
+
+
+def analyse_all(text_list: List[str], algorithms: List[str], prune: bool = False) -> Dict[str, Any]:
+    """
+    分析同一文法的多种算法：已构造过的分析器直接复用，其余在计算子进程中作为一个任务构造
+
+    Args:
+        prune: 构造前删除无用符号
+
+    Returns:
+        {"grammarHash": 文法哈希,
+         "results": {算法名: {"code": 0, "data": 与单独分析接口相同的 data} 或 {"code": 1, "message": 出错信息}}}
+    """
+    productions = normalize_productions(text_list)
+    g_hash = grammar_hash(productions)
+    analyzers = {}
+    errors = {}
+    precomputed = {}
+    for name in algorithms:
+        kind, options = algorithm_options(name, prune)
+        data = catalog_data(kind, productions, options)  # 教材文法直接使用预先计算的结果
+        if data is not None:
+            precomputed[name] = data
+            continue
+        analyzer = find_analyzer(kind, g_hash, **options)
+        if analyzer is not None:
+            analyzers[name] = analyzer
+    missing = [name for name in algorithms if name not in analyzers and name not in precomputed]
+    if missing:
+        built, errors = run_cpu(build_analyzers, productions, missing, prune)
+        for name, analyzer in built.items():
+            kind, options = algorithm_options(name, prune)
+            cache_analyzer(kind, productions, analyzer, **options)  # 之后单独分析、输入串分析可直接命中
+        analyzers.update(built)
+
+    results = {}
+    for name in algorithms:
+        if name in precomputed:
+            results[name] = {"code": 0, "data": precomputed[name]}
+        elif name in errors:
+            results[name] = {"code": 1, "message": f"分析失败，请检查文法: {errors[name]}"}
+        elif ALGORITHMS[name][0] == 'lr1' and analyzers[name].over_budget:
+            results[name] = {"code": 1, "message": lr1_over_budget_message(analyzers[name])}
+        else:
+            results[name] = {"code": 0, "data": ANALYSIS_DATA[ALGORITHMS[name][0]](analyzers[name])}
+    return {
+        "grammarHash": g_hash,
+        "results": results
+    }
@@ -0,0 +1,24 @@
+"""
+缓存预热
+gunicorn 预加载应用（preload_app）时，master 在 fork worker 之前计算教材文法、正则表达式目录
+（services/catalog_service.py）中各项的结果并放入进程内缓存，worker 以写时复制方式共享这部分内存，
+启动后的首批请求直接命中缓存
+"""
+import os
+from typing import Any, Dict
+
+from services.catalog_service import compile_catalog
+
+# 是否预热
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', '1') != '0'
+
+
+def warm_caches() -> Dict[str, Any]:
+    """
+    在当前进程中预热缓存（不经过计算子进程：master 中不能启动计算子进程）
+    已保存到持久化存储的结果直接读取，没有时计算并保存
+
+    Returns:
+        见 compile_catalog
+    """
+    return compile_catalog()
@@ -84,15 +84,77 @@ def start_prod_simple():
     subprocess.run(cmd)
 
 
+def parse_importtime(lines):
+    """
+    解析 -X importtime 的输出
+    每行 "import time: self [us] | cumulative | imported package"，包名前的缩进表示嵌套层次
+
+    Returns:
+        [(模块名, 自身耗时us, 累计耗时us, 嵌套层次), ...]
+    """
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile_imports(module='server', top=20):
+    """导入耗时分析：在子进程中用 -X importtime 导入模块，汇总累计耗时和自身耗时最大的模块"""
+    print("=" * 60)
+    print(f"导入耗时分析: import {module}")
+    print("=" * 60)
+    env = dict(os.environ, CPU_POOL_WORKERS=os.environ.get('CPU_POOL_WORKERS', '0'))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+    rows = parse_importtime(result.stderr.splitlines())
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    print(f"共导入 {len(rows)} 个模块，总耗时 {total / 1000:.1f} ms")
+
+    # 被测模块自身为第0层时，它直接导入的模块在第1层
+    direct = [r for r in rows if r[3] == 1] or [r for r in rows if r[3] == 0]
+    print(f"\n直接依赖的累计耗时（含其导入的模块），前 {top} 个:")
+    for name, _, cumulative, _ in sorted(direct, key=lambda r: -r[2])[:top]:
+        print(f"  {cumulative / 1000:>9.1f} ms  {name}")
+
+    print(f"\n自身耗时最大的 {top} 个模块:")
+    for name, self_us, _, _ in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f"  {self_us / 1000:>9.1f} ms  {name}")
+
+
+def build_catalog(force=False):
+    """预先计算教材文法、正则表达式目录中各项的结果并保存到持久化存储（部署时执行，服务启动时直接读取）"""
+    print("=" * 60)
+    print("预先计算教材文法、正则表达式目录")
+    print("=" * 60)
+    os.environ.setdefault('CPU_POOL_WORKERS', '0')
+    from services.catalog_service import CATALOG_PATH, compile_catalog
+    print(f"目录文件: {CATALOG_PATH}")
+    stats = compile_catalog(force)
+    print(f"版本 {stats['version']}：共 {stats['entries']} 项，本次计算 {stats['computed']} 项，"
+          f"失败 {stats['failed']} 项，耗时 {stats['ms']} ms")
+    if stats['failed']:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description='编译原理教学平台后端服务器')
     parser.add_argument(
         'mode',
-        choices=['dev', 'prod', 'prod-simple'],
+        choices=['dev', 'prod', 'prod-simple', 'importtime', 'catalog'],
         default='dev',
         nargs='?',
-        help='运行模式: dev=开发, prod=生产(推荐), prod-simple=生产(简化)'
+        help='运行模式: dev=开发, prod=生产(推荐), prod-simple=生产(简化), importtime=导入耗时分析, catalog=预先计算教材目录'
     )
+    parser.add_argument('--module', default='server', help='importtime: 要分析的模块（默认 server）')
+    parser.add_argument('--top', type=int, default=20, help='importtime: 列出的模块个数')
+    parser.add_argument('--force', action='store_true', help='catalog: 忽略已保存的结果，重新计算')
     
     args = parser.parse_args()
     
@@ -102,6 +164,10 @@ def main():
         start_prod()
     elif args.mode == 'prod-simple':
         start_prod_simple()
+    elif args.mode == 'importtime':
+        profile_imports(args.module, args.top)
+    elif args.mode == 'catalog':
+        build_catalog(args.force)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,54 @@
+"""
+生成的分析程序：文法中的字符串不能改变生成源码的结构（源码会被 exec() 执行）
+"""
+import contextlib
+import io
+
+import pytest
+
+from services.codegen_service import load_parser, parser_source
+from services.grammar_cache import ANALYZERS
+
+
+def generated_parser(kind, productions):
+    analyzer = ANALYZERS[kind](list(productions))
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.init()
+    source = parser_source(kind, analyzer)
+    return source, load_parser(source, kind) if source is not None else None
+
+
+@pytest.mark.parametrize("kind", ["ll1", "lr0", "slr1", "lr1"])
+@pytest.mark.parametrize("separator", ["\n", "\r", "\r\n", " "])
+def test_productions_are_not_executed(tmp_path, kind, separator):
+    marker = tmp_path / "pwned"
+    source, parse = generated_parser(kind, [f"S->a{separator}open({str(marker)!r},'w')"])
+    assert not marker.exists()
+    if parse is not None:
+        parse("a")
+    assert not marker.exists()
+
+
+@pytest.mark.parametrize("kind", ["ll1", "lr0", "slr1", "lr1"])
+def test_generated_parser_matches_solve(kind):
+    _, parse = generated_parser(kind, ["S->aA", "A->bA|c"])
+    assert parse("ac") == "Success!"
+    assert parse("abbc") == "Success!"
+    assert parse("ab") != "Success!"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from server import app
+    return app.test_client()
+
+
+@pytest.mark.parametrize("url", ["/api/LL1AnalyseBatch", "/api/LR0AnalyseBatch", "/api/SLR1AnalyseBatch",
+                                 "/api/LR1AnalyseBatch"])
+def test_control_characters_are_rejected(tmp_path, client, url):
+    marker = tmp_path / "pwned"
+    response = client.post(url, json={"inpProductions": [f"S->a\nopen({str(marker)!r},'w')"], "inpStrs": ["a"]})
+    assert response.status_code == 200
+    assert response.get_json()["code"] == 1
+    assert not marker.exists()
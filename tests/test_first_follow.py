@@ -0,0 +1,50 @@
+"""
+FIRST/FOLLOW 集（按强连通分量计算）与 SLR(1) 判定
+"""
+import contextlib
+import io
+
+from utils.Class_SLR1_GrammarAnalysis import SLR1
+
+
+def slr1(productions):
+    analyzer = SLR1(list(productions))
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.init()
+    return analyzer
+
+
+def test_follow_of_adjacent_occurrences():
+    # S->BB：第一个 B 后面是 B，第二个 B 在末尾，Follow(B) 同时包含 First(B) 和 Follow(S)
+    analyzer = slr1(["S->BB", "B->aB|b"])
+    assert analyzer.follow['B'] == {'a', 'b', '#'}
+    assert analyzer.isSLR1
+    assert analyzer.solve("bab", "none")["info_res"] == "Success!"
+
+
+def test_follow_after_trailing_nullable():
+    # A->aBC 中 C 可推空，Follow(B) 为 First(C)-{ε} ∪ Follow(A)，不含 #
+    analyzer = slr1(["S->Ad", "A->aBC", "B->b", "C->c|ε"])
+    assert analyzer.follow['A'] == {'d'}
+    assert analyzer.follow['B'] == {'c', 'd'}
+    assert analyzer.follow['C'] == {'d'}
+
+
+def test_first_sets():
+    analyzer = slr1(["S->Ad", "A->aBC", "B->b", "C->c|ε"])
+    assert analyzer.first['S'] == {'a'}
+    assert analyzer.first['C'] == {'c', 'ε'}
+
+
+def test_follow_of_start_symbol():
+    analyzer = slr1(["S->L=R|R", "L->*R|i", "R->L"])
+    assert analyzer.follow['S'] == {'#'}
+    assert analyzer.follow['L'] == {'=', '#'}
+    assert analyzer.follow['R'] == {'=', '#'}
+
+
+def test_not_slr1_grammar():
+    # 教材中的 S->L=R：状态 {S->L.=R, R->L.} 上 = 既可移进也可按 R->L 归约（Follow(R) 含 =）
+    analyzer = slr1(["S->L=R|R", "L->*R|i", "R->L"])
+    assert not analyzer.isSLR1
+    assert analyzer.conflicts
@@ -0,0 +1,49 @@
+"""
+进程内分析器缓存：读写持久化存储时已序列化，缓存大小直接用其字节数
+"""
+import contextlib
+import io
+
+import pytest
+
+from services import grammar_cache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = grammar_cache.GrammarCache(1 << 30)
+    monkeypatch.setattr(grammar_cache, "grammar_cache", cache)
+    monkeypatch.setattr(grammar_cache, "GRAMMAR_TABLE_STORE", True)
+    monkeypatch.setattr(grammar_cache, "run_cpu", lambda fn, *args, **kwargs: fn(*args))
+
+    def no_pickle(obj):
+        raise AssertionError("不应再序列化估算大小")
+
+    monkeypatch.setattr(grammar_cache, "estimate_size", no_pickle)
+    return cache
+
+
+def test_miss_uses_saved_size(cache, monkeypatch):
+    saved = []
+    monkeypatch.setattr(grammar_cache, "load_compiled", lambda *args, **kwargs: (None, 0))
+    monkeypatch.setattr(grammar_cache, "save_compiled", lambda *args: saved.append(args) or 1234)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = grammar_cache.get_analyzer("slr1", ["S->aS|b"])
+    assert analyzer.isSLR1
+    assert len(saved) == 1
+    assert cache.stats()["total_bytes"] == 1234
+    assert grammar_cache.get_analyzer("slr1", ["S->aS|b"]) is analyzer
+
+
+def test_store_hit_uses_stored_size(cache, monkeypatch):
+    with contextlib.redirect_stdout(io.StringIO()):
+        built = grammar_cache.build_analyzer("lr0", ["S->aS|b"], {})
+    monkeypatch.setattr(grammar_cache, "load_compiled", lambda *args, **kwargs: (built, 999))
+    assert grammar_cache.find_analyzer("lr0", grammar_cache.grammar_hash(["S->aS|b"])) is built
+    assert cache.stats()["total_bytes"] == 999
+
+
+def test_estimate_without_size():
+    cache = grammar_cache.GrammarCache(1 << 30)
+    cache.put("key", {"a": 1})
+    assert cache.stats()["total_bytes"] == grammar_cache.estimate_size({"a": 1})
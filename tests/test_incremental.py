@@ -0,0 +1,98 @@
+"""
+增量分析（SLR1.init(base)、LR0.init(base)）与完整分析的结果一致
+"""
+import contextlib
+import io
+import json
+import random
+
+import pytest
+
+from services.analysis_data import ANALYSIS_DATA
+from services.grammar_cache import ANALYZERS
+
+NONTERMINALS = "SABC"
+TERMINALS = "abc"
+
+
+def canonical(data):
+    """集合转成的列表顺序不固定，比较时把所有列表排序"""
+    if isinstance(data, dict):
+        return {key: canonical(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return sorted((canonical(x) for x in data), key=lambda x: json.dumps(x, sort_keys=True))
+    return data
+
+
+def random_production(rng, left=None):
+    left = left or rng.choice(NONTERMINALS)
+    candidates = ["".join(rng.choice(NONTERMINALS + TERMINALS) for _ in range(rng.randint(0, 3))) or "ε"
+                  for _ in range(rng.randint(1, 3))]
+    return f"{left}->{'|'.join(candidates)}"
+
+
+def random_edit(rng, productions):
+    """对产生式列表做一次替换、插入或删除"""
+    productions = list(productions)
+    op = rng.choice(("replace", "insert", "delete") if len(productions) > 1 else ("replace", "insert"))
+    index = rng.randrange(len(productions))
+    if op == "replace":
+        productions[index] = random_production(rng, productions[index][0] if rng.random() < 0.5 else None)
+    elif op == "insert":
+        productions.insert(index + 1, random_production(rng))
+    else:
+        del productions[index]
+    return productions
+
+
+def analyse(kind, productions, base=None):
+    analyzer = ANALYZERS[kind](list(productions))
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.init(base)
+    return analyzer
+
+
+@pytest.mark.parametrize("kind", ["lr0", "slr1"])
+def test_incremental_matches_full_rebuild(kind):
+    rng = random.Random(20261019)
+    checked = 0
+    for _ in range(30):
+        productions = ["S->" + "".join(rng.choice(NONTERMINALS + TERMINALS) for _ in range(2))] + \
+                      [random_production(rng, left) for left in NONTERMINALS[1:]]
+        try:
+            base = analyse(kind, productions)
+        except Exception:  # 随机文法可能不合法
+            continue
+        for _ in range(8):
+            edited = random_edit(rng, productions)
+            try:
+                full = analyse(kind, edited)
+            except Exception:
+                continue
+            incremental = analyse(kind, edited, base)
+            assert canonical(ANALYSIS_DATA[kind](incremental)) == canonical(ANALYSIS_DATA[kind](full)), edited
+            productions, base = edited, incremental
+            checked += 1
+    assert checked > 80
+
+
+def test_reanalyse_runs_in_compute_process(monkeypatch):
+    # 增量构造与完整分析一样交给计算子进程（run_cpu），出错时改为完整分析
+    from services import incremental_service
+    base = analyse("slr1", ["S->aSb|A", "A->cB", "B->d"])
+    calls = []
+
+    def fake_run_cpu(fn, *args, **kwargs):
+        calls.append(fn)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args)
+
+    monkeypatch.setattr(incremental_service, "run_cpu", fake_run_cpu)
+    monkeypatch.setattr(incremental_service, "find_analyzer", lambda *args, **kwargs: base)
+    monkeypatch.setattr(incremental_service, "cache_analyzer", lambda *args, **kwargs: None)
+    analyzer, productions, mode = incremental_service.reanalyse(
+        "slr1", "base", [{"op": "replace", "index": 2, "production": "B->e"}])
+    assert calls == [incremental_service.build_incremental]
+    assert mode == incremental_service.MODE_INCREMENTAL
+    assert productions == ["S->aSb|A", "A->cB", "B->e"]
+    assert analyzer.isSLR1
@@ -0,0 +1,46 @@
+"""
+LR(1) 状态预算：合并后改指首个同核心状态，原先新建的目标状态不可达，应删去并重新编号
+"""
+import contextlib
+import io
+
+from utils.Class_LR1_GrammarAnalysis import LR1
+
+GRAMMAR = ["S->BB", "A->cSS|S|ε", "B->bAd"]
+
+
+def build(max_states):
+    analyzer = LR1(GRAMMAR, max_states=max_states)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.init()
+    return analyzer
+
+
+def reachable(all_DFA):
+    seen = {0}
+    stack = [0]
+    while stack:
+        for tid in all_DFA[stack.pop()].next_ids_.values():
+            if tid not in seen:
+                seen.add(tid)
+                stack.append(tid)
+    return seen
+
+
+def test_merge_on_budget_drops_unreachable():
+    analyzer = build(6)
+    assert analyzer.merged and analyzer.isLR1
+    assert [dfa.id_ for dfa in analyzer.all_DFA] == list(range(len(analyzer.all_DFA)))
+    assert reachable(analyzer.all_DFA) == set(range(len(analyzer.all_DFA)))
+    assert len(analyzer.all_DFA) == 11
+    assert analyzer.table.n_states == len(analyzer.all_DFA)
+    assert analyzer.dot.count('label="I') == len(analyzer.all_DFA)
+    for inp in ["bdbd", "bbdbddbd", "bcbdbdbdbddbd"]:
+        assert analyzer.solve(inp)["info_res"] == "Success!"
+    assert analyzer.solve("bdb")["info_res"].startswith("error")
+
+
+def test_without_budget_unchanged():
+    analyzer = build(2000)
+    assert not analyzer.merged
+    assert reachable(analyzer.all_DFA) == set(range(len(analyzer.all_DFA)))
@@ -0,0 +1,39 @@
+"""
+按单词书写的文法：字面终结符编码后不与分析器中的特殊字符冲突
+"""
+import contextlib
+import io
+
+import pytest
+
+from utils.Grammar_Tokens import RESERVED, TokenGrammar
+
+
+@pytest.fixture(scope="module")
+def client():
+    with contextlib.redirect_stdout(io.StringIO()):
+        from server import app
+    return app.test_client()
+
+
+def test_reserved_literals_are_encoded():
+    # "." 是 LR 项目中的点，必须编码为私用区字符
+    table = TokenGrammar(['L -> L "." id | id']).table
+    assert '.' in RESERVED
+    assert table.terminals['.'] != '.'
+
+
+@pytest.mark.parametrize("kind", ["lr0", "slr1", "lr1"])
+def test_dot_literal(client, kind):
+    response = client.post("/api/grammar/tokens", json={
+        "algorithm": kind,
+        "inpProductions": ['S -> L ";"', 'L -> L "." id | id'],
+        "tokens": {"id": "[a-z][a-z0-9]*"},
+        "inpStrs": ["a.bc.d;", "a..b;"]
+    })
+    body = response.get_json()
+    assert body["code"] == 0
+    assert body["data"]["conforms"]
+    first, second = body["data"]["results"]
+    assert first["accepted"]
+    assert not second["accepted"]
@@ -0,0 +1,42 @@
+"""
+文法变换：消除左递归
+"""
+import pytest
+
+from utils.Grammar_Transform import GrammarTransformer, TransformError
+
+
+def transform(productions):
+    transformer = GrammarTransformer(productions)
+    transformer.transform()
+    return transformer.result()
+
+
+def test_eliminate_left_recursion():
+    result = transform(['E->E+T|T', 'T->T*F|F', 'F->(E)|i'])
+    assert result["productions"] == ["E->TE'", "T->FT'", 'F->(E)|i', "T'->*FT'|ε", "E'->+TE'|ε"]
+
+
+def test_nullable_left_corner_is_bounded():
+    # A 可推出ε，代入 S->ASB 得到 SB、ASBB……不终止，应报错而不是一直展开
+    with pytest.raises(TransformError):
+        transform(['S->ASB|B', 'A->ε|BA', 'B->S'])
+
+
+def test_start_symbol_with_only_self_loop_is_kept():
+    # 只有 S->S 时语言为空，不能删去 S 而让下一个非终结符成为开始符号
+    assert transform(['S->S', 'A->b', 'B->a'])["productions"][0] == 'S->S'
+
+
+@pytest.mark.parametrize("productions", [['S->ASb|c', 'A->ε'], ['S->ASb|c', 'A->a|ε'], ['S->ABSb|c', 'A->ε', 'B->a|ε']])
+def test_left_recursion_behind_nullable_prefix(productions):
+    # S->ASb 中 A 能推出ε，S 是左递归的，只代入首符号消除不了，不能原样返回
+    with pytest.raises(TransformError):
+        transform(productions)
+
+
+def test_nullable_prefix_without_left_recursion():
+    # A 不能推出ε，或能推出ε但后面没有回到 S，都不是左递归，文法不变
+    assert transform(['S->ASb|c', 'A->a'])["productions"] == ['S->ASb|c', 'A->a']
+    result = transform(['S->AB', 'A->ε|a', 'B->b'])
+    assert result["productions"] == ['S->AB', 'A->ε|a', 'B->b']
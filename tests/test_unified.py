@@ -0,0 +1,47 @@
+"""
+多算法统一分析：LL1 与 LR 类共用同一份 First/Follow 集，LR(1) 超出状态预算时报错
+"""
+import contextlib
+import io
+
+import pytest
+
+from services import unified_service
+from services.analysis_data import lr1_options
+
+
+@pytest.fixture(autouse=True)
+def inline_cpu(monkeypatch):
+    # 在当前进程中构造，便于替换算法参数
+    monkeypatch.setattr(unified_service, "run_cpu", lambda fn, *args, **kwargs: fn(*args))
+
+
+def analyse(productions, algorithms):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return unified_service.analyse_all(productions, algorithms)["results"]
+
+
+def test_ll1_uses_shared_first_follow():
+    # S->BB：LL1 与 SLR1 的 Follow 集一致（都含第二个 B 的 First 集）
+    results = analyse(["S->BB", "B->aB|b"], ["ll1", "slr1"])
+    ll1, slr1 = results["ll1"]["data"], results["slr1"]["data"]
+    assert set(ll1["follow"]["B"]) == set(slr1["follow"]["B"]) == {"a", "b", "#"}
+    assert set(ll1["first"]["S"]) == set(slr1["first"]["S"])
+    assert "S'" not in ll1["first"] and "S'" not in ll1["follow"]
+    assert ll1["isLL1"]
+
+
+def test_ll1_left_recursion():
+    results = analyse(["E->E+T|T", "T->i"], ["ll1", "lr0"])
+    assert results["ll1"]["code"] == 0
+    assert not results["ll1"]["data"]["isLL1"]
+    assert set(results["ll1"]["data"]["follow"]["E"]) == {"+", "#"}
+
+
+def test_lr1_over_budget(monkeypatch):
+    options = lr1_options({"maxStates": 2, "mergeOnBudget": False})
+    monkeypatch.setitem(unified_service.ALGORITHMS, "lr1", ("lr1", options))
+    results = analyse(["S->aSb|c"], ["lr1", "slr1"])
+    assert results["lr1"]["code"] == 1
+    assert "状态上限2" in results["lr1"]["message"]
+    assert results["slr1"]["code"] == 0
@@ -1,11 +1,17 @@
 import copy
 from collections import defaultdict
-import pandas as pd
+
+from utils.Class_SLR1_GrammarAnalysis import FirstAndFollow
+from utils.Grammar_Conflicts import CONFLICT_NAMES, FIRST_FIRST, FIRST_FOLLOW, explain_ll1_conflicts
+from utils.Grammar_IR import remove_useless
+from utils.Parse_Trace import DEFAULT_TRACE_MODE, TraceRecorder
+from utils.Parse_Tree import ParseTree
 
 
 class LL1:
-    def __init__(self, input_str_list):
+    def __init__(self, input_str_list, prune=False):
         self.input_str_list = input_str_list
+        self.grammar_list = list(input_str_list)  # 输入的产生式，用于增量分析时应用修改
         self.formulas_dict = {}  # 存储产生式 ---dict<set> 形式
         self.S = ""  # 开始符
         self.Vt = []  # 终结符
@@ -15,6 +21,9 @@ class LL1:
         self.table = {}  # 预测分析表
         self.info = {}
         self.isLL1 = False
+        self.conflicts = []  # 所有冲突及其反例（见 utils/Grammar_Conflicts.py）
+        self.prune = prune  # 构造前是否删除无用符号
+        self.removed = None  # 删除的无用符号和产生式（prune=True 时）
 
     # 消除直接左递归
     def eliminate_direct_left_recursion(self, grammar, non_terminal):
@@ -215,180 +224,83 @@ class LL1:
 
         return formulas_dict, Vn, Vt, S
 
-    def cal_symbol_first(self, symbol):
-        # 如果是终结符，直接加入到First集合
-        if not symbol.isupper():
-            self.first[symbol].add(symbol)
+    # =============2.计算First、Follow集合=============
+    def step2_first_follow(self, shared=None):
+        """
+        First/Follow 集与 LR 类分析器相同（FirstAndFollow，按强连通分量计算，左递归不会爆栈）
+        :param shared: 同一文法已 prepare() 的SLR1分析器，给出时直接沿用它的结果（增广文法上的结果去掉 S' 即可）
+        """
+        if shared is not None:
+            ff = shared.ff
         else:
-            for r_candidate in self.formulas_dict[symbol]:
-                i = 0
-                while i < len(r_candidate):
-                    next_symbol = r_candidate[i]
-                    # 如果是非终结符，递归计算其First集合
-                    if next_symbol.isupper():
-                        # if next_symbol == v: # -----若相同，则为直接左递归，直接跳出-----
-                        # break
-                        self.cal_symbol_first(next_symbol)
-                        self.first[symbol] = self.first[symbol].union(
-                            self.first[next_symbol] - {'ε'})  # 合并first(next_symbol)/{ε}
-                        if 'ε' not in self.first[next_symbol]:
-                            break
-                    # 如果是终结符，加入到First集合
-                    else:
-                        self.first[symbol].add(next_symbol)
-                        break
-                    i += 1
-                # 如果所有符号的First集合都包含ε，将ε加入到First集合
-                if i == len(r_candidate):
-                    self.first[symbol].add('ε')
-
-    # =============2.计算First集合=============
-    def step2_cal_first(self, formulas_dict):
-        # 计算所有非终结符的First集合
-        for vn in formulas_dict.keys():
-            self.cal_symbol_first(vn)
-        # 计算所有终结符的First集合
-        for vt in self.Vt:
-            self.cal_symbol_first(vt)
-        # 计算ε的First集
-        self.cal_symbol_first('ε')
-        # 打印First集合
-        # for key, value in self.first.items():
-        #     print(f"First({key}): {value}")
-
-    # 计算Follow集合1——考虑 添加first(Vn后一个非终结符)/{ε}， 而 不考虑 添加follow(left)
-    def cal_follow1(self, vn):
-        self.follow[vn] = set()
-        if vn == self.S:  # 若为开始符，加入#
-            self.follow[vn].add('#')
-        for left, right in self.formulas_dict.items():  # 遍历所有文法，取出左部单Vn、右部候选式集合
-            for r_candidate in right:  # 遍历当前 右部候选式集合
-                i = 0
-                while i <= len(r_candidate) - 1:  # 遍历当前 右部候选式
-                    if r_candidate[i] == vn:  # ch == Vn
-                        if i + 1 == len(r_candidate):  # 如果是最后一个字符  >>>>>  S->....V
-                            # self.follow[vn].add('#')
-                            break
-                        else:  # 后面还有字符  >>>>> S->...V..
-                            while i != len(r_candidate):
-                                i += 1
-                                if r_candidate[i] == vn:  # 又遇到Vn，回退 >>>>> S->...V..V..
-                                    i -= 1
-                                    break
-                                if r_candidate[i].isupper():  # 非终结符  >>>>> S->...VA..
-                                    self.follow[vn] = self.follow[vn].union(self.first[r_candidate[i]] - {'ε'})
-                                    if 'ε' in self.first[r_candidate[i]]:  # 能推空  >>>>> S->...VA..  A可推空
-                                        if i + 1 == len(r_candidate):  # 是最后一个字符  >>>>> S->...VA  A可推空 可等价为 S->...V
-                                            self.follow[vn].add('#')
-                                            break
-                                    else:  # 不能推空 >>>>> S->...VA..  A不可推空
-                                        break
-                                else:  # 终结符  >>>>> S->...Va..
-                                    self.follow[vn].add(r_candidate[i])
-                                    break
-                    else:
-                        i += 1
-
-    # 计算Follow集合2——考虑 添加follow(left)
-    def cal_follow2(self, vn):
-        for left, right in self.formulas_dict.items():  # 遍历所有文法，取出左部单Vn、右部候选式集合
-            for r_candidate in right:  # 遍历当前 右部候选式集合
-                i = 0
-                while i <= len(r_candidate) - 1:  # 遍历当前 右部候选式
-                    if r_candidate[i] == vn:  # 找到Vn
-                        if i == len(r_candidate) - 1:  # 如果当前是最后一个字符，添加 follow(left) >>>>>  S->..V
-                            self.follow[vn] = self.follow[vn].union(self.follow[left])
-                            break
-                        else:  # 看看后面的字符能否推空 >>>>>  S->..V..
-                            while i != len(r_candidate):
-                                i += 1
-                                if 'ε' in self.first[r_candidate[i]]:  # 能推空  >>>>> S->..VB..  B可推空
-                                    if i == len(r_candidate) - 1:  # 且是最后一个字符  >>>>> S->..VB  B可推空
-                                        self.follow[vn] = self.follow[vn].union(self.follow[left])
-                                        break
-                                    else:  # 不是最后一个字符，继续看  >>>>> S->..VBA..  B可推空
-                                        continue
-                                else:  # 不能推空  >>>>>  S->..VB..  B不可为空
-                                    break
-                    i += 1
-
-    # 计算所有Follow集合的总长度，用于判断是否还需要继续完善
-    def cal_follow_total_Len(self):
-        total_Len = 0
-        for vn, vn_follow in self.follow.items():
-            total_Len += len(vn_follow)
-        return total_Len
-
-    # =============3.计算follow集合=============
-    def step3_cal_follow(self, formulas_dict):
-        # 先用 cal_follow1 算
-        for vn in formulas_dict.keys():
-            self.cal_follow1(vn)
-        # 在循环用 cal_follow2 算， 直到所有follow集总长度不再变化，说明计算完毕
-        while True:
-            old_len = self.cal_follow_total_Len()
-            for vn in formulas_dict.keys():
-                self.cal_follow2(vn)
-            new_len = self.cal_follow_total_Len()
-
-            if old_len == new_len:
-                break
-        # 打印Follow集合
-        # for key, value in self.follow.items():
-        #     print(f"Follow({key}): {value}")
-
-    # =============4.检测是否符合LL(1)文法=============
-    def step4_check_LL1(self, formulas_dict, first, follow):
-        # 检查每个产生式右部，多个候选式中每个候选首字符的first集是否相交（回溯）
+            ff = FirstAndFollow(self.input_str_list)
+            ff.solve()
+        first = defaultdict(set, {v: set(f) for v, f in ff.first.items() if "'" not in v})
+        for vt in self.Vt:  # 终结符的first集为自身
+            first[vt] = {vt}
+        follow = defaultdict(set, {vn: set(f) for vn, f in ff.follow.items() if "'" not in vn})
+        return first, follow
+
+    def candidate_first(self, r_candidate, first):  # 候选式的first集（各符号都能推空时含ε）
+        cur_can_first = set()
+        for symbol in r_candidate:
+            cur_can_first |= first[symbol] - {'ε'}
+            if 'ε' not in first[symbol]:
+                return cur_can_first
+        cur_can_first.add('ε')
+        return cur_can_first
+
+    def predict_entries(self, formulas_dict, first, follow):
+        """预测分析表的所有填写：{(Vn, Vt): [(候选式, 是否因推空按follow集填入), ...]}，多于一个即为冲突"""
+        entries = defaultdict(list)
         for left, right in formulas_dict.items():
-            if len(right) >= 2:
-                #           print(f"{left}: {right}")
-                s = set()
-                for r_candidate in right:
-                    old_len = len(s)
-                    s = s.union(first[r_candidate[0]])
-                    new_len = len(s)
-                    if old_len == new_len:
-                        return False
-        # 每个产生式A，若 ε ∈ first(A)，则first(A) ∩ follow(A) = 空集
-        for left, right in formulas_dict.items():
-            if 'ε' in first[left]:
-                if first[left] & follow[left]:  # 有交集
-                    return False
-        return True
+            for r_candidate in right:
+                cur_can_first = self.candidate_first(r_candidate, first)
+                for fi in cur_can_first - {'ε'}:
+                    entries[(left, fi)].append((r_candidate, False))
+                if 'ε' in cur_can_first:
+                    for fo in follow[left]:
+                        entries[(left, fo)].append((r_candidate, True))
+        return entries
+
+    # =============4.检测是否符合LL(1)文法（列出所有冲突）=============
+    def step4_check_LL1(self, formulas_dict, first, follow):
+        # 同一非终结符的多个候选式在同一终结符上都要填表（FIRST集相交，或能推空的候选式与其他候选式的FIRST集和FOLLOW集相交）
+        entries = self.predict_entries(formulas_dict, first, follow)
+        self.conflicts = []
+        for left in formulas_dict:
+            groups = {}  # 涉及的候选式相同的冲突合并为一条
+            for vt in self.Vt + ['#']:
+                candidates = entries.get((left, vt), [])
+                if len(candidates) < 2:
+                    continue
+                kind = FIRST_FOLLOW if any(by_follow for _, by_follow in candidates) else FIRST_FIRST
+                items = tuple(left + "->" + r_candidate for r_candidate, _ in candidates)
+                conflict = groups.get((kind, items))
+                if conflict is None:
+                    conflict = groups[(kind, items)] = {
+                        "nonterminal": left,
+                        "type": kind,
+                        "lookaheads": [],
+                        "items": list(items)
+                    }
+                conflict["lookaheads"].append(vt)
+            for conflict in groups.values():
+                conflict["message"] = (f"{left} 的候选式 {' '.join(conflict['items'])} 在 "
+                                       f"{'、'.join(conflict['lookaheads'])} 上存在{CONFLICT_NAMES[conflict['type']]}")
+                self.conflicts.append(conflict)
+        explain_ll1_conflicts(self.conflicts, self.S, formulas_dict)  # 为冲突找反例
+        return not self.conflicts
 
     # =============5.建立LL(1)预测分析表=============
     def step5_create_table(self, formulas_dict, first, follow):
         tab_dict = {}
-        for left, right in formulas_dict.items():  # 对于每一个产生式，求出其每个候选式的first集
-            for r_candidate in right:
-                idx = 0
-                cur_can_first = set()
-                while True:
-                    if r_candidate[idx].isupper():
-                        cur_can_first = cur_can_first.union(first[r_candidate[idx]] - {'ε'})
-                    else:
-                        cur_can_first.add(r_candidate[idx])
-                    idx += 1
-                    if idx >= len(r_candidate) or ('ε' not in first[r_candidate[idx - 1]]):
-                        break
-
-                for fi in cur_can_first:
-                    if fi == 'ε':
-                        for fo in follow[left]:
-                            tab_dict[(left, fo)] = 'ε'
-                    else:
-                        tab_dict[(left, fi)] = r_candidate
-
-        df = pd.DataFrame(list(tab_dict.items()), columns=['Key', 'Value'])
-        df['Vn'] = [x[0] for x in df['Key']]
-        df['Vt'] = [x[1] for x in df['Key']]
-        tab_df = df.pivot(index='Vn', columns='Vt', values='Value')
-        # print(tab_df)
-        return tab_dict, tab_df
+        for (left, vt), candidates in self.predict_entries(formulas_dict, first, follow).items():
+            tab_dict[(left, vt)] = candidates[-1][0]
+        return tab_dict
 
     # =============6.LL1分析=============
-    def step6_LL1_analyse(self, s, S, Vn, Vt, table):
+    def step6_LL1_analyse(self, s, S, Vn, Vt, table, trace=DEFAULT_TRACE_MODE, tree_format=None):
         s = list(s)  # 将字符串转为list类型，方便增删
         s.append('#')  # 末尾加入#
         sp = 0  # 字符串指针
@@ -396,71 +308,86 @@ class LL1:
         stack.append('#')  # 进#
         stack.append(S)  # 进开始符
         msg = ""  # 分析情况
-        step = 0  # 步骤数
-        info_step, info_stack, info_str, info_msg, info_res = [], [], [], [], ""
+        info_res = ""
+        Vn, Vt = set(Vn), set(Vt)
+        # 只记录栈的增量，完整的栈字符串按需重放生成
+        rec = TraceRecorder(trace, ''.join(s), (stack,), ("info_stack",))
+        # 自顶向下建语法树：node_stack 与栈中开始符以上的符号一一对应
+        tree = ParseTree() if tree_format is not None else None
+        node_stack = [tree.add(S)] if tree is not None else None
 
         while sp != len(s):
             ch = s[sp]  # 获取当前输入字符
             top = stack[-1]  # 获取栈顶元素
-            step += 1
-            info_step.append(step)
-            info_stack.append(''.join(stack))
-            info_str.append(''.join(s[sp:]))
+            rec.step(sp)
 
             if top in Vt:  # 栈顶元素是  终结符
                 if top == ch:
                     top = stack.pop()  # 栈顶出栈
+                    rec.pop(0)
+                    if tree is not None:
+                        node_stack.pop()
                     sp += 1  # str指针后移一位
                     msg = f"'{ch}'匹配"
                 else:
                     info_res = f"error: 栈顶元素{top} 与 字符{ch} 不匹配!"
-                    msg = f"error: 栈顶元素{top} 与 字符{ch} 不匹配!"
-                    info_msg.append(msg)
+                    rec.msg(info_res)
                     break
             elif top in Vn:  # 栈顶元素是 非终结符
-                if (top, ch) in table.keys():  # table中含有该项
+                right = table.get((top, ch))
+                if right is not None:  # table中含有该项
                     top = stack.pop()  # 先出栈
-                    if table[(top, ch)] == 'ε':
+                    rec.pop(0)
+                    if tree is not None:  # 候选式的符号成为栈顶结点的子结点，ε入栈的只有结点，不入符号栈
+                        children = tree.expand(node_stack.pop(), right)
+                        if right != 'ε':
+                            node_stack.extend(reversed(children))
+                    if right == 'ε':
                         msg = f"{top}->ε 不入栈"
                     else:
-                        stack.extend(reversed(table[(top, ch)]))  # 逆序入栈
-                        msg = f"{top}->" + table[(top, ch)]
+                        symbols = list(reversed(right))
+                        stack.extend(symbols)  # 逆序入栈
+                        rec.push(0, symbols)
+                        msg = f"{top}->" + right
                 else:
                     info_res = f"error: table找不到匹配的({top},{ch})"
-                    msg = f"error: table找不到匹配的({top},{ch})"
-                    info_msg.append(msg)
+                    rec.msg(info_res)
                     break
             elif top == '#':  # 栈顶元素是 文法结束符
                 if ch == '#':
                     info_res = "Success!"
-                    msg = "Success!"
-                    info_msg.append(msg)
+                    rec.msg(info_res)
                     break
                 else:
                     info_res = f"error: 栈顶元素{top} 与 字符{ch} 不匹配!"
-                    msg = f"error: 栈顶元素{top} 与 字符{ch} 不匹配!"
-                    info_msg.append(msg)
+                    rec.msg(info_res)
                     break
             elif top == 'ε':  # 栈顶元素是 ε
                 top = stack.pop()  # 直接出栈ε
+                rec.pop(0)
+                if tree is not None:
+                    node_stack.pop()
                 msg = f"'ε'出栈"
                 continue
-            info_msg.append(msg)
-
-        info = {
-            "info_step": info_step,
-            "info_stack": info_stack,
-            "info_str": info_str,
-            "info_msg": info_msg,
-            "info_res": info_res
-        }
+            rec.msg(msg)
 
+        info = rec.to_info(info_res)
+        if tree is not None:
+            if info_res == "Success!":
+                tree.root = 0  # 开始符结点
+                info["info_tree"] = tree.export(tree_format)
+            else:
+                info["info_tree"] = None
         return info
 
-    def init(self):
+    def init(self, shared=None):
+        """
+        :param shared: 同一文法已 prepare() 的SLR1分析器（与 LR 类分析器的 init 相同），给出时沿用它的First/Follow集
+        """
+        if self.prune:  # 删除推不出终结符串、不可到达的非终结符
+            self.input_str_list, self.removed = remove_useless(self.input_str_list)
         self.formulas_dict, self.Vn, self.Vt, self.S = self.step1_pre_process(self.input_str_list)
-        self.step2_cal_first(self.formulas_dict)
-        self.step3_cal_follow(self.formulas_dict)
+        self.first, self.follow = self.step2_first_follow(shared)
 
         self.isLL1 = self.step4_check_LL1(self.formulas_dict, self.first, self.follow)
         # =========判断是否合法=========
@@ -470,10 +397,10 @@ class LL1:
             print("经过分析，该文法 不符合 LL(1)文法")
             return
         # print("=========预测分析表=========")
-        self.table, df_tab = self.step5_create_table(self.formulas_dict, self.first, self.follow)
+        self.table = self.step5_create_table(self.formulas_dict, self.first, self.follow)
 
-    def solve(self, s):
-        self.info = self.step6_LL1_analyse(s, self.S, self.Vn, self.Vt, self.table)
+    def solve(self, s, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        self.info = self.step6_LL1_analyse(s, self.S, self.Vn, self.Vt, self.table, trace, tree_format)
         # print("=========分析过程=========")
         # for i in range(len(self.info["info_step"])):
         #     print("{:<15}  {:<15}  {:<15}  {:<15}".format(str(self.info["info_step"][i]), self.info["info_stack"][i],
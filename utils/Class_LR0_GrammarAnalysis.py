@@ -1,7 +1,11 @@
-import copy
 from collections import defaultdict
 import graphviz
-import pandas as pd
+
+from utils.Grammar_Conflicts import dot_item_conflicts, explain_lr_conflicts
+from utils.Grammar_IR import remove_useless
+from utils.LR0_Items import SHARED_FIELDS, LR0Collection, changed_lefts, same_state, source_spans
+from utils.LR_Table import LRTable, Productions, lr_analyse
+from utils.Parse_Trace import DEFAULT_TRACE_MODE
 
 
 class DFA:
@@ -261,18 +265,33 @@ class FirstAndFollow:
 
 
 class LR0:
-    def __init__(self, formulas_list):
+    def __init__(self, formulas_list, prune=False):
         self.formulas_list = formulas_list
+        self.grammar_list = list(formulas_list)  # 输入的产生式（未拆分），用于增量分析时应用修改
         self.S = ""
         self.Vn = []
         self.Vt = []
         self.dot_items = []  # 所有可能的.项目集
         self.dot = ""
+        self.dot_spans = []  # 每个状态的DOT语句在 dot 中的字符区间
         self.all_DFA = []
-        self.actions = {}
-        self.gotos = {}
+        self.table = None  # 整数形式的ACTION/GOTO表（LRTable）
+        self.productions = None  # 产生式元数据（Productions）
+        self.collection = None  # LR(0)项目集规范族（LR0Collection），保存闭包缓存
         self.info = {}
+        self.reuse_info = {}  # 增量分析时各部分的复用情况
         self.isLR0 = False
+        self.conflicts = []  # 所有冲突及其反例（见 utils/Grammar_Conflicts.py）
+        self.prune = prune  # 构造前是否删除无用符号
+        self.removed = None  # 删除的无用符号和产生式（prune=True 时）
+
+    @property
+    def actions(self):  # 字典形式的ACTION表，仅用于JSON输出
+        return self.table.action_dict() if self.table is not None else {}
+
+    @property
+    def gotos(self):  # 字典形式的GOTO表，仅用于JSON输出
+        return self.table.goto_dict() if self.table is not None else {}
 
     def step1_pre_process(self, grammar_list):
         formulas_list = []
@@ -323,85 +342,14 @@ class LR0:
 
         return dot_items
 
-    def closure(self, item):  # 求item所有的产生式的闭包
-        c_item = item
-        old_c_item = []
-        while len(old_c_item) != len(c_item):
-            old_c_item = copy.deepcopy(c_item)
-            for pro in old_c_item:
-                if pro not in c_item:
-                    c_item.append(pro)
-                dot_left, dot_right = pro.split(".")
-                if dot_right == "":  # 当前产生式为最后一项为. .不能继续移动，跳过
-                    continue
-                if dot_right[0] in self.Vn:  # .后面为非终结符， 加入它的Vn->.xxxx
-                    for dot_p in self.dot_items:
-                        ind = dot_p.find("->")  # 返回-的下标
-                        if dot_p[0] == dot_right[0] \
-                                and dot_p[ind + 2] == "." \
-                                and dot_p[1] != "'" \
-                                and dot_p not in c_item:  # 首字符匹配 且不为增广符
-                            c_item.append(dot_p)
-
-        return c_item
-
-    def go(self, item, v):  # 生成item向v移动后的item_production
-        to_v_item = []
-        for pro in item:  # 1. 生成item能够用v跳转的新的产生式
-            dot_left, dot_right = pro.split(".")
-            if dot_right != "":  # 非归约/接受项目
-                if dot_right[0] == v:  # .右边是跳转符v
-                    to_v_item.append(dot_left + dot_right[0] + "." + dot_right[1:])  # 右移一位
-
-        new_item = None
-        if len(to_v_item) != 0:  # 2. 求新产生式的闭包
-            new_item = self.closure(to_v_item)
-
-        return new_item
-
-    def exist_idx(self, all_DFA, new_dfa):
-        if new_dfa.pros_ is None:
-            return -1
-        for i in range(len(all_DFA)):
-            if new_dfa == all_DFA[i]:
-                return i
-        return -1
-
-    def step3_construct_LR0_DFA(self, dot_items):
-        # 生成初始Item0
-        all_DFA = []
-        item0_pros = []
-        item0_pros.extend(self.closure([dot_items[0]]))
-        all_DFA.append(DFA(0, item0_pros, {}))
-
-        visited_dfa = []  # close表
-        old_visted_dfa = []  # 用于判断close表长度是否再变化
-
-        V = list(self.Vn) + list(self.Vt)  # 合并非终结符和终结符
-        while True:
-            old_visted_dfa = copy.deepcopy(visited_dfa)  # 副本
-
-            for dfa in all_DFA:
-                if dfa in visited_dfa:  # 已经访问过，则continue
-                    continue
-                visited_dfa.append(dfa)  # 加入close表
-                item = dfa.pros_
-                for v in V:
-                    new_item = self.go(item, v)
-                    if new_item is not None:
-                        new_dfa = DFA(-1, new_item, {})
-                        idx = self.exist_idx(all_DFA, new_dfa)
-                        if idx == -1:  # 不存在，添加新dfa
-                            new_dfa.id_ = len(all_DFA)
-                            dfa.next_ids_[v] = new_dfa.id_
-                            all_DFA.append(new_dfa)
-                        else:  # 存在，指向原有dfa
-                            dfa.next_ids_[v] = idx
-
-            if len(old_visted_dfa) == len(visited_dfa):  # close表长度不变，退出循环
-                break
-
-        return all_DFA
+    def step3_construct_LR0_DFA(self, dot_items, base=None):
+        # 生成项目集规范族（按核心项目缓存闭包），给出修改前的分析器时沿用其中未受影响的闭包
+        if base is not None:
+            changed = changed_lefts(base.formulas_list, self.formulas_list)
+            self.collection = LR0Collection(dot_items, self.Vn, self.Vt, base.collection, changed)
+        else:
+            self.collection = LR0Collection(dot_items, self.Vn, self.Vt)
+        return self.collection.build(DFA)
 
     def print_DFA(self, all_DFA):
         for dfa in all_DFA:
@@ -410,10 +358,16 @@ class LR0:
             print(f"item={dfa.pros_}")
             print(f"next={dfa.next_ids_} \n")
 
-    def step4_draw_DFA(self, all_DFA):
+    def step4_draw_DFA(self, all_DFA, base=None):
         # 创建Digraph对象
         dot = graphviz.Digraph(comment='LR0_DFA', graph_attr={'rankdir': 'LR'})
+        body_spans = []  # 每个状态的语句在 dot.body 中的下标区间
         for dfa in all_DFA:
+            start = len(dot.body)
+            if base is not None and same_state(base.all_DFA, dfa):  # 与修改前相同的状态，直接复制原来的DOT语句
+                dot.body.append(base.dot[slice(*base.dot_spans[dfa.id_])])
+                body_spans.append((start, len(dot.body)))
+                continue
             label = f"I{dfa.id_}\n"
             node_color = "lightblue"
             if dfa.id_ == 0:
@@ -427,167 +381,101 @@ class LR0:
             if len(dfa.next_ids_) != 0:
                 for v, to_id in dfa.next_ids_.items():
                     dot.edge(str(dfa.id_), str(to_id), label=v, fontcolor='red')
+            body_spans.append((start, len(dot.body)))
         # 显示图形
         # dot.view()
         # print(dot.source)
         # print(type(dot.source))
+        self.dot_spans = source_spans(dot.source, dot.body, body_spans)
         return dot.source
 
-    def step5_check_LR0(self, all_DFA):  # 判断是否为LR0文法
-        flag = True
-        for dfa in all_DFA:
-            item = dfa.pros_
-            shift_num = 0  # 移进数目
-            protocol_num = 0  # 归约数目
-            for pro in item:
-                dot_left, dot_right = pro.split(".")
-                if dot_right == "":  # .在最后，为归约项目
-                    # if dot_left[:2] == self.S + "'":  # 接受项目，不考虑为归约项目
-                    #     continue
-                    protocol_num += 1
-                elif dot_right[0] in self.Vt:  # .后面为终结符，为移进项目
-                    shift_num += 1
-            if (protocol_num >= 1 and shift_num >= 1) or protocol_num >= 2:
-                conflict = "归约-归约冲突" if protocol_num >= 2 else "移进-归约冲突"
-                print(f"I{dfa.id_}存在{conflict}")
-                flag = False
-
-        return flag
-
-    def step6_construct_LR0_table(self, all_DFA, formulas_list):
-        actions = {}
-        gotos = {}
+    def step5_check_LR0(self, all_DFA):  # 判断是否为LR0文法，列出所有冲突
+        symbols = self.Vt + ['#']
+        Vt = set(self.Vt)
+        self.conflicts = []
+        for dfa in all_DFA:  # LR0 的归约项目（含接受项目）不看向前看符号
+            self.conflicts.extend(dot_item_conflicts(dfa, Vt, symbols, lambda pro: symbols))
+        explain_lr_conflicts(self.conflicts, self.formulas_list, all_DFA)  # 为冲突找反例
+        return not self.conflicts
+
+    def step6_construct_LR0_table(self, all_DFA, formulas_list, base=None):
+        table = LRTable(len(all_DFA), self.Vt, self.Vn)
+        # 给出修改前的分析器时，项目集、转移和归约的产生式都没变的状态直接复制原来的行
+        reused_rows = self.collection.reusable_rows(all_DFA, self.productions, base) if base is not None else {}
+        self.reuse_info["rows"] = len(reused_rows)
         for dfa in all_DFA:
             id_ = dfa.id_
+            if id_ in reused_rows:
+                table.copy_row(id_, base.table, reused_rows[id_])
+                continue
             next_ids = dfa.next_ids_
             if len(next_ids) == 0:  # 无下一个状态，必定为归约项目或接受项目，且只有一个
                 pro = dfa.pros_[0].replace(".", "")  # 去除.
                 if pro == formulas_list[0]:  # 如果这一个为接受项目：S'->S
-                    actions[(id_, "#")] = "acc"
+                    table.set_accept(id_)
                 else:  # 其他的指定产生式
                     # ===========LR0===========
                     for vt in self.Vt:
-                        actions[(id_, vt)] = "r" + str(formulas_list.index(pro))
-                    actions[(id_, "#")] = "r" + str(formulas_list.index(pro))
+                        table.set_reduce(id_, vt, self.productions.index[pro])
+                    table.set_reduce(id_, "#", self.productions.index[pro])
 
                     # ===========SLR1===========
                     # pro_left, pro_right = pro.split("->")
                     # for ch in self.follow[pro_left]:
-                    #     actions[(id_, ch)] = "r" + str(formulas_list.index(pro))
-                    # actions[(id_, "#")] = "r" + str(formulas_list.index(pro))
+                    #     table.set_reduce(id_, ch, self.productions.index[pro])
+                    # table.set_reduce(id_, "#", self.productions.index[pro])
             else:  # 有指向下一个项目，同时当前项目可能存在接受项目
                 for item in dfa.pros_:
                     pro_left, pro_right = item.split(".")
                     if pro_right == "":  # .在最后 为归约项目
                         pro = item.replace(".", "")
                         if pro == formulas_list[0]:  # 为接受项目
-                            actions[(id_, "#")] = "acc"
+                            table.set_accept(id_)
                             break
 
                 for v, to_dfa_id in next_ids.items():
                     if v in self.Vt:
-                        actions[(id_, v)] = "s" + str(to_dfa_id)
+                        table.set_shift(id_, v, to_dfa_id)
                     elif v in self.Vn:
-                        gotos[(id_, v)] = to_dfa_id
-
-        # 转成df对象
-        merged_dict = {key: value for d in (actions, gotos) for key, value in d.items()}
-        sorted_keys = sorted(merged_dict.keys(), key=lambda x:
-        (x[1].isupper(), x[1] == "#", x[1]))
-        sort_dict = {key: merged_dict[key] for key in sorted_keys}
-        columns = []
-        for k in sort_dict.keys():
-            if k[1] not in columns:
-                columns.append(k[1])
-        rows = set(key[0] for key in sort_dict.keys())
-        # df = pd.DataFrame(index=rows, columns=columns)
-        # for key, value in sort_dict.items():
-        #     df.loc[key[0], key[1]] = value
-        #
-        # print(df)
-        return actions, gotos
-
-    def step7_LR0_analyse(self, actions, gotos, formulas_list, input_str):
-        s = list(input_str)
-        s.append("#")
-        sp = 0  # 字符串指针
-
-        state_stack = []
-        symbol_stack = []
-        state_stack.append(0)
-        symbol_stack.append("#")
-
-        step = 0
-        msg = ""
-        info_step, info_state_stack, info_symbol_stack, info_str, info_msg, info_res = [], [], [], [], [], ""
-        # 分析
-        while sp != len(s):
-            step += 1
-            ch = s[sp]
-            top_state = state_stack[-1]
-            top_symbol = symbol_stack[-1]
-            info_step.append(step)
-            info_state_stack.append("".join([str(x) for x in state_stack]))
-            info_symbol_stack.append("".join(symbol_stack))
-            info_str.append("".join(s[sp:]))
-            if (top_state, ch) not in actions.keys():
-                info_res = f"error：分析失败，找不到Action({(top_state, ch)})"
-                info_msg.append("error")
-                break
-            find_action = actions[(top_state, ch)]
-
-            if find_action[0] == "s":  # 移进操作
-                state_stack.append(int(find_action[1:]))
-                symbol_stack.append(ch)
-                sp += 1
-                msg = f"Action[{top_state},{ch}]={find_action}: 状态{find_action[1:]}入栈"
-            elif find_action[0] == 'r':  # 归约操作
-                pro = formulas_list[int(find_action[1:])]  # 获取第r行的产生式
-                pro_left, pro_right = pro.split("->")
-                pro_right_num = len(pro_right) if pro_right != 'ε' else 0
-                for i in range(pro_right_num):
-                    state_stack.pop()
-                    symbol_stack.pop()
-                symbol_stack.append(pro_left)
-                goto_key = (state_stack[-1], symbol_stack[-1])
-                if goto_key in gotos.keys():
-                    msg = f"Action[{top_state},{ch}]={find_action}: 用{pro}归约，Goto[{state_stack[-1]},{symbol_stack[-1]}]={gotos[goto_key]}入栈"
-                    state_stack.append(gotos[goto_key])
-                else:
-                    info_res = f"error：分析失败，找不到GOTO({state_stack[-1]},{symbol_stack[-1]})"
-            elif find_action == "acc":
-                msg = "acc: 分析成功！"
-                info_msg.append(msg)
-                info_res = "Success!"
-                break
-            info_msg.append(msg)
-
-        # print
-        # for i in range(len(info_step)):
-        #     print(f"{info_step[i]}\t{info_state_stack[i]}\t{info_symbol_stack[i]}\t{info_str[i]}\t{info_msg[i]}\n")
-
-        info = {
-            "info_step": info_step,
-            "info_state_stack": info_state_stack,
-            "info_symbol_stack": info_symbol_stack,
-            "info_str": info_str,
-            "info_msg": info_msg,
-            "info_res": info_res
-        }
-        return info
-
-    def init(self):
-        self.S, self.Vn, self.Vt, self.formulas_list = self.step1_pre_process(self.formulas_list)
-        self.dot_items = self.step2_all_dot_pros(self.formulas_list)  # 计算所有项目（带点）
-        self.all_DFA = self.step3_construct_LR0_DFA(self.dot_items)  # 计算项目集的DFA转换关系
+                        table.set_goto(id_, v, to_dfa_id)
+
+        table.maybe_compress()  # 大表做行位移压缩
+        return table
+
+    def step7_LR0_analyse(self, table, productions, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        return lr_analyse(table, productions, input_str, trace, tree_format)
+
+    def init(self, base=None, shared=None):
+        """
+        :param base: 修改前文法的LR0分析器（已 init()），给出时增量分析：沿用未受影响的闭包和分析表行
+        :param shared: 同一文法已 prepare() 的SLR1分析器，给出时沿用其预处理结果和项目集规范族，DFA图复制其DOT语句
+        """
+        if shared is not None:
+            for name in SHARED_FIELDS:
+                setattr(self, name, getattr(shared, name))
+            self.all_DFA = [DFA(dfa.id_, dfa.pros_, dfa.next_ids_) for dfa in shared.all_DFA]
+            self.removed = shared.removed
+        else:
+            if self.prune:  # 删除推不出终结符串、不可到达的非终结符
+                self.formulas_list, self.removed = remove_useless(self.formulas_list)
+            self.S, self.Vn, self.Vt, self.formulas_list = self.step1_pre_process(self.formulas_list)
+            self.productions = Productions(self.formulas_list, self.Vn)  # 产生式元数据，只计算一次
+            self.dot_items = self.step2_all_dot_pros(self.formulas_list)  # 计算所有项目（带点）
+            self.all_DFA = self.step3_construct_LR0_DFA(self.dot_items, base)  # 计算项目集的DFA转换关系
         self.print_DFA(self.all_DFA)
-        self.dot = self.step4_draw_DFA(self.all_DFA) # 画项目集的DFA转换图
+        # 画项目集的DFA转换图（给出 shared 时所有状态都与它相同，DOT语句全部复制）
+        self.dot = self.step4_draw_DFA(self.all_DFA, shared if shared is not None else base)
         self.isLR0 = self.step5_check_LR0(self.all_DFA)
         if self.isLR0:  # 检测是否符合SLR1文法
-            self.actions, self.gotos = self.step6_construct_LR0_table(self.all_DFA, self.formulas_list)  # 画表
-
-    def solve(self, input_str):
-        self.info = self.step7_LR0_analyse(self.actions, self.gotos, self.formulas_list, input_str)
+            self.table = self.step6_construct_LR0_table(self.all_DFA, self.formulas_list, base)  # 画表
+        self.reuse_info.update({
+            "closures": self.collection.reused,  # 沿用的闭包数
+            "states": len(self.all_DFA)
+        })
+
+    def solve(self, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        self.info = self.step7_LR0_analyse(self.table, self.productions, input_str, trace, tree_format)
+        return self.info
 
 
 if __name__ == "__main__":
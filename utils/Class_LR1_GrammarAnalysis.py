@@ -0,0 +1,419 @@
+from collections import defaultdict, deque
+import graphviz
+
+from utils.Class_SLR1_GrammarAnalysis import DFA, FirstAndFollow
+from utils.Grammar_Conflicts import explain_lr_conflicts, lr_state_conflicts
+from utils.Grammar_IR import remove_useless
+from utils.LR_Table import LRTable, Productions, lr_analyse
+from utils.Parse_Trace import DEFAULT_TRACE_MODE
+
+DEFAULT_MAX_STATES = 2000  # 默认状态预算
+PROGRESS_EVERY = 256  # 每新建多少个状态回调一次进度
+
+
+class LR1:
+    """
+    规范LR(1)分析
+    项目为 (产生式序号, 点的位置)，向前看符号集合用整数位集表示（第i位对应 Vt+['#'] 的第i个符号）。
+    状态按 (核心, 向前看) 做哈希去重；状态数达到预算 max_states 时：
+        merge_on_budget=True  -> 之后同核心的状态合并向前看集合（即LALR(1)），继续构造
+        merge_on_budget=False -> 停止构造，over_budget=True
+    lalr=True 时从一开始就按核心合并，直接得到LALR(1)自动机。
+    """
+
+    def __init__(self, formulas_list, max_states=DEFAULT_MAX_STATES, merge_on_budget=True, lalr=False, prune=False):
+        self.formulas_list = formulas_list  # 存储产生式  ---list形式
+        self.grammar_list = list(formulas_list)  # 输入的产生式（未拆分），用于增量分析时应用修改
+        self.S = ""
+        self.Vn = []
+        self.Vt = []
+        self.first = defaultdict(set)
+        self.follow = defaultdict(set)
+        self.dot_items = []  # 所有可能的.项目集（LR(0)项目，用于展示）
+        self.dot = ""
+        self.all_DFA = []
+        self.table = None  # 整数形式的ACTION/GOTO表（LRTable）
+        self.productions = None  # 产生式元数据（Productions）
+        self.info = {}
+        self.max_states = max_states
+        self.merge_on_budget = merge_on_budget
+        self.lalr = lalr
+        self.merged = lalr  # 是否按核心合并了状态（LALR(1)）
+        self.over_budget = False  # 是否超出状态预算而中止构造
+        self.isLR1 = False
+        self.conflicts = []  # 所有冲突及其反例（见 utils/Grammar_Conflicts.py）
+        self.prune = prune  # 构造前是否删除无用符号
+        self.removed = None  # 删除的无用符号和产生式（prune=True 时）
+        self.on_progress = None  # 进度回调 on_progress(阶段, **进度)，异步任务使用，构造完成后置空
+
+        self.prods = []  # [(left, (right_symbol, ...)), ...]， ε产生式右部为空元组
+        self.prods_of = {}  # { Vn: [产生式序号, ...] }
+        self.la_symbols = []  # 位集各位对应的向前看符号 Vt + ['#']
+        self.suffix_first = []  # suffix_first[p][k] = (first(右部[k:])的位集, 右部[k:]能否推空)
+        self.states = []  # 各状态的闭包 { (p, dot): 向前看位集 }
+
+    @property
+    def actions(self):  # 字典形式的ACTION表，仅用于JSON输出
+        return self.table.action_dict() if self.table is not None else {}
+
+    @property
+    def gotos(self):  # 字典形式的GOTO表，仅用于JSON输出
+        return self.table.goto_dict() if self.table is not None else {}
+
+    def step1_pre_process(self, grammar_list):
+        formulas_list = []
+        S = grammar_list[0][0]  # 开始符
+        Vt = []  # 终结符
+        Vn = []  # 非终结符
+        # 处理产生式
+        for pro in grammar_list:
+            pro_left, pro_right = pro.split("->")
+            if "|" in pro_right:
+                r_list = pro_right.split("|")
+                for r in r_list:
+                    formulas_list.append(pro_left + "->" + r)
+            else:
+                formulas_list.append(pro)
+
+        # 增广文法
+        formulas_list.insert(0, S + "'->" + S)
+
+        # 处理Vn和Vt
+        for pro in formulas_list:
+            pro_left, pro_right = pro.split("->")
+            if pro_left not in Vn:
+                Vn.append(pro_left)
+            for symbol in pro_right:
+                if not symbol.isupper() and symbol != 'ε':
+                    if symbol not in Vt:
+                        Vt.append(symbol)
+
+        ff = FirstAndFollow(formulas_list)
+        first, follow = ff.solve()
+        return S, Vn, Vt, formulas_list, first, follow
+
+    def step2_build_items(self, formulas_list):
+        """产生式编号、终结符位集、各产生式后缀的first位集，只在这里计算一次"""
+        self.la_symbols = list(self.Vt) + ['#']
+        bit = {t: 1 << i for i, t in enumerate(self.la_symbols)}
+
+        self.prods = []
+        self.prods_of = {}
+        for idx, pro in enumerate(formulas_list):
+            pro_left, pro_right = pro.split("->")
+            right = () if pro_right == 'ε' else tuple(pro_right)
+            self.prods.append((pro_left, right))
+            self.prods_of.setdefault(pro_left, []).append(idx)
+
+        # 非终结符的first位集与可空性，复用FirstAndFollow求得的first集
+        first_mask = {}
+        nullable = set()
+        for vn in self.Vn:
+            mask = 0
+            for ch in self.first[vn]:
+                if ch == 'ε':
+                    nullable.add(vn)
+                elif ch in bit:
+                    mask |= bit[ch]
+            first_mask[vn] = mask
+
+        # 从右往左求每个后缀的 (first位集, 可空)
+        self.suffix_first = []
+        for pro_left, right in self.prods:
+            suffix = [(0, True)] * (len(right) + 1)
+            for k in range(len(right) - 1, -1, -1):
+                symbol = right[k]
+                if symbol in self.prods_of:
+                    rest_mask, rest_null = suffix[k + 1]
+                    if symbol in nullable:
+                        suffix[k] = (first_mask[symbol] | rest_mask, rest_null)
+                    else:
+                        suffix[k] = (first_mask[symbol], False)
+                else:
+                    suffix[k] = (bit.get(symbol, 0), False)
+            self.suffix_first.append(suffix)
+
+        # 所有LR(0)项目（带点），与LR0/SLR1的展示保持一致
+        dot_items = []
+        for pro_left, right in self.prods:
+            for k in range(len(right) + 1):
+                dot_items.append(pro_left + "->" + "".join(right[:k]) + "." + "".join(right[k:]))
+        return dot_items
+
+    def closure(self, kernel):  # 求核心项目的闭包，返回 { (p, dot): 向前看位集 }
+        items = dict(kernel)
+        work = list(kernel)
+        while work:
+            p, d = work.pop()
+            right = self.prods[p][1]
+            if d >= len(right) or right[d] not in self.prods_of:  # 归约项目 或 .后面不是非终结符
+                continue
+            first_mask, first_null = self.suffix_first[p][d + 1]
+            la = first_mask | items[(p, d)] if first_null else first_mask
+            for q in self.prods_of[right[d]]:
+                key = (q, 0)
+                old = items.get(key)
+                if old is None:
+                    items[key] = la
+                    work.append(key)
+                elif la & ~old:  # 向前看集合有扩充，需要继续传播
+                    items[key] = old | la
+                    work.append(key)
+        return items
+
+    def go(self, items):  # 按跳转符分组，生成各个后继状态的核心项目
+        moves = {}
+        for (p, d), la in items.items():
+            right = self.prods[p][1]
+            if d < len(right):
+                moves.setdefault(right[d], {})[(p, d + 1)] = la
+        return moves
+
+    def item_str(self, p, d, la):  # 项目展示形式： A->α.β,a/b
+        pro_left, right = self.prods[p]
+        return (pro_left + "->" + "".join(right[:d]) + "." + "".join(right[d:]) + ","
+                + "/".join(self.mask_symbols(la)))
+
+    def mask_symbols(self, mask):
+        return [t for i, t in enumerate(self.la_symbols) if mask >> i & 1]
+
+    def step3_construct_LR1_DFA(self):
+        V = list(self.Vn) + list(self.Vt)  # 跳转符顺序，与LR0一致
+        order = {v: i for i, v in enumerate(V)}
+
+        kernels = [{(0, 0): 1 << (len(self.la_symbols) - 1)}]  # I0: S'->.S,#
+        states = [None]
+        next_ids = [{}]
+        index = {frozenset(kernels[0].items()): 0}  # (核心,向前看) -> 状态号
+        core_index = {frozenset(kernels[0]): 0}  # 核心 -> 首个该核心的状态号
+        queue = deque([0])
+        in_queue = {0}
+
+        while queue:
+            sid = queue.popleft()
+            in_queue.discard(sid)
+            states[sid] = self.closure(kernels[sid])
+            moves = self.go(states[sid])
+            for v in sorted(moves, key=lambda x: order.get(x, len(order))):
+                if v not in order:  # 未定义的符号，无法跳转
+                    continue
+                kernel = moves[v]
+                key = frozenset(kernel.items())
+                tid = index.get(key)
+                if tid is None:
+                    core = frozenset(kernel)
+                    if not self.merged and len(kernels) >= self.max_states:
+                        if not self.merge_on_budget:
+                            self.over_budget = True
+                            return self.build_DFA(kernels, states, next_ids)
+                        self.merged = True  # 预算用尽，此后按核心合并为LALR(1)
+                    if self.merged and core in core_index:
+                        tid = core_index[core]
+                        target = kernels[tid]
+                        grown = False
+                        for item, la in kernel.items():
+                            if la & ~target[item]:
+                                target[item] |= la
+                                grown = True
+                        if grown and tid not in in_queue:  # 向前看扩充，重新求闭包并传播给后继
+                            queue.append(tid)
+                            in_queue.add(tid)
+                    else:
+                        tid = len(kernels)
+                        kernels.append(dict(kernel))
+                        states.append(None)
+                        next_ids.append({})
+                        core_index.setdefault(core, tid)
+                        queue.append(tid)
+                        in_queue.add(tid)
+                        if self.on_progress is not None and tid % PROGRESS_EVERY == 0:
+                            self.on_progress('step3_construct_LR1_DFA', states=tid + 1, pending=len(queue),
+                                             merged=self.merged)
+                    index[key] = tid
+                next_ids[sid][v] = tid
+
+        if self.merged:  # 合并后转移改指首个同核心状态，原先新建的目标可能已不可达
+            kernels, states, next_ids = self.drop_unreachable(kernels, states, next_ids)
+        return self.build_DFA(kernels, states, next_ids)
+
+    def drop_unreachable(self, kernels, states, next_ids):  # 删去从I0不可达的状态，保持原有相对顺序重新编号
+        reached = {0}
+        stack = [0]
+        while stack:
+            for tid in next_ids[stack.pop()].values():
+                if tid not in reached:
+                    reached.add(tid)
+                    stack.append(tid)
+        if len(reached) == len(kernels):
+            return kernels, states, next_ids
+        keep = sorted(reached)
+        new_id = {old: i for i, old in enumerate(keep)}
+        return ([kernels[i] for i in keep], [states[i] for i in keep],
+                [{v: new_id[t] for v, t in next_ids[i].items()} for i in keep])
+
+    def construct_LALR1_DFA(self, skeleton):
+        """
+        按同一文法的LR(0)项目集族构造LALR(1)自动机：按核心合并时状态与LR(0)状态一一对应、编号相同，
+        直接沿用其转移找后继状态（不再按核心查找），只传播向前看符号
+        :param skeleton: LR(0)项目集族（状态列表）
+        """
+        kernels = [None] * len(skeleton)
+        kernels[0] = {(0, 0): 1 << (len(self.la_symbols) - 1)}  # I0: S'->.S,#
+        states = [None] * len(skeleton)
+        next_ids = [{} for _ in skeleton]
+        queue = deque([0])
+        in_queue = {0}
+
+        while queue:
+            sid = queue.popleft()
+            in_queue.discard(sid)
+            states[sid] = self.closure(kernels[sid])
+            moves = self.go(states[sid])
+            for v, tid in skeleton[sid].next_ids_.items():  # 与LR(0)相同，已按 Vn + Vt 的顺序
+                kernel = moves[v]
+                target = kernels[tid]
+                grown = False
+                if target is None:  # 首次到达，核心项目顺序与逐个新建状态时一致
+                    kernels[tid] = dict(kernel)
+                    grown = True
+                else:
+                    for item, la in kernel.items():
+                        if la & ~target[item]:
+                            target[item] |= la
+                            grown = True
+                if grown and tid not in in_queue:  # 向前看扩充，重新求闭包并传播给后继
+                    queue.append(tid)
+                    in_queue.add(tid)
+                next_ids[sid][v] = tid
+
+        return self.build_DFA(kernels, states, next_ids)
+
+    def build_DFA(self, kernels, states, next_ids):  # 转为DFA对象，复用其to_dict输出格式
+        all_DFA = []
+        for sid, kernel in enumerate(kernels):
+            items = states[sid] if states[sid] is not None else self.closure(kernel)
+            states[sid] = items
+            pros = [self.item_str(p, d, la) for (p, d), la in items.items()]
+            all_DFA.append(DFA(sid, pros, next_ids[sid]))
+        self.states = states
+        return all_DFA
+
+    def step4_draw_DFA(self, all_DFA):
+        # 创建Digraph对象
+        dot = graphviz.Digraph(comment='LR1_DFA', graph_attr={'rankdir': 'LR'})
+        for dfa in all_DFA:
+            label = f"I{dfa.id_}\n"
+            node_color = "lightblue"
+            if dfa.id_ == 0:
+                node_color = "lightpink"
+            for pro in dfa.pros_:
+                label += pro + "\n"
+            dot.node(str(dfa.id_), label=label,
+                     style='filled', fillcolor=node_color,
+                     shape='rectangle', fontname='Verdana')
+
+            if len(dfa.next_ids_) != 0:
+                for v, to_id in dfa.next_ids_.items():
+                    dot.edge(str(dfa.id_), str(to_id), label=v, fontcolor='red')
+        return dot.source
+
+    def step5_check_LR1(self, all_DFA):  # 判断是否为LR1文法，列出所有冲突
+        self.conflicts = []
+        for dfa in all_DFA:
+            shifts = {}
+            reduces = []
+            for (p, d), la in self.states[dfa.id_].items():
+                right = self.prods[p][1]
+                if d == len(right):  # 归约项目（含接受项目 S'->S.,#）
+                    reduces.append((self.item_str(p, d, la), self.mask_symbols(la)))
+                elif right[d] not in self.prods_of and right[d] in dfa.next_ids_:  # 移进项目
+                    shifts.setdefault(right[d], []).append(self.item_str(p, d, la))
+            self.conflicts.extend(lr_state_conflicts(dfa.id_, shifts, reduces, self.la_symbols))
+        explain_lr_conflicts(self.conflicts, self.formulas_list, all_DFA)  # 为冲突找反例
+        return not self.conflicts
+
+    def step6_construct_LR1_table(self, all_DFA, formulas_list):
+        table = LRTable(len(all_DFA), self.Vt, self.Vn)
+        for dfa in all_DFA:
+            id_ = dfa.id_
+            for (p, d), la in self.states[id_].items():
+                if d != len(self.prods[p][1]):
+                    continue
+                if p == 0:  # 接受项目：S'->S.,#
+                    table.set_accept(id_)
+                    continue
+                for ch in self.mask_symbols(la):
+                    table.set_reduce(id_, ch, p)
+            for v, to_dfa_id in dfa.next_ids_.items():
+                if v in self.prods_of:
+                    table.set_goto(id_, v, to_dfa_id)
+                else:
+                    table.set_shift(id_, v, to_dfa_id)
+        table.maybe_compress()  # 大表做行位移压缩
+        return table
+
+    def step7_LR1_analyse(self, table, productions, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        return lr_analyse(table, productions, input_str, trace, tree_format)
+
+    def init(self, shared=None):
+        """
+        :param shared: 同一文法已 prepare() 的SLR1分析器，给出时沿用其预处理结果和First/Follow集；
+                       lalr=True 时还按其LR(0)项目集族的转移构造LALR(1)自动机
+        """
+        if shared is not None:
+            self.S, self.Vn, self.Vt = shared.S, shared.Vn, shared.Vt
+            self.formulas_list, self.first, self.follow = shared.formulas_list, shared.first, shared.follow
+            self.productions = shared.productions
+            self.removed = shared.removed
+        else:
+            if self.prune:  # 删除推不出终结符串、不可到达的非终结符
+                self.formulas_list, self.removed = remove_useless(self.formulas_list)
+            self.S, self.Vn, self.Vt, self.formulas_list, self.first, self.follow = self.step1_pre_process(
+                self.formulas_list)
+            self.productions = Productions(self.formulas_list, self.Vn)  # 产生式元数据，只计算一次
+        self.dot_items = self.step2_build_items(self.formulas_list)  # 产生式编号、first位集，以及所有项目（带点）
+        if shared is not None and self.lalr:
+            self.all_DFA = self.construct_LALR1_DFA(shared.all_DFA)
+        else:
+            self.all_DFA = self.step3_construct_LR1_DFA()  # 计算LR(1)项目集族及其转换关系
+        if self.over_budget:  # 超出状态预算，不再画图和建表
+            return
+        self.dot = self.step4_draw_DFA(self.all_DFA)  # 画项目集的DFA转换图
+        self.isLR1 = self.step5_check_LR1(self.all_DFA)
+        if self.isLR1:  # 检测是否符合LR1文法
+            self.table = self.step6_construct_LR1_table(self.all_DFA, self.formulas_list)  # 画表
+
+    def solve(self, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        self.info = self.step7_LR1_analyse(self.table, self.productions, input_str, trace, tree_format)
+        return self.info
+
+
+if __name__ == "__main__":
+    # 注意使用无空格的测试用例（前端处理空白）
+    grammar1 = [  # 经典LR(1)但非SLR(1)/LALR(1)可区分的例子
+        "S->L=R|R",
+        "L->*R|i",
+        "R->L"
+    ]
+    grammar2 = [  # + * 直接左递归
+        "E->E+T",
+        "E->T",
+        "T->T*F",
+        "T->F",
+        "F->(E)",
+        "F->i"
+    ]
+    grammar3 = [  # 含ε
+        'T->EbH',
+        'E->d',
+        'E->ε',
+        'H->i',
+        'H->Hbi',
+        'H->ε'
+    ]
+
+    lr1 = LR1(grammar1)
+    lr1.init()
+    print(len(lr1.all_DFA), lr1.isLR1)
+    lr1.solve("*i=i")
+    print(lr1.info["info_res"])
@@ -1,8 +1,12 @@
-import copy
 from collections import defaultdict
 # import graphviz
 import graphviz
-import pandas as pd
+
+from utils.Grammar_Conflicts import dot_item_conflicts, explain_lr_conflicts
+from utils.Grammar_IR import remove_useless
+from utils.LR0_Items import SHARED_FIELDS, LR0Collection, changed_lefts, same_state, source_spans
+from utils.LR_Table import LRTable, Productions, lr_analyse
+from utils.Parse_Trace import DEFAULT_TRACE_MODE
 
 
 class DFA:
@@ -22,7 +26,63 @@ class DFA:
         return set(self.pros_) == set(other.pros_)
 
 
+def scc_order(nodes, deps):
+    """
+    求强连通分量（Tarjan，非递归，长依赖链不会爆栈）
+    :param nodes: 结点列表
+    :param deps: 结点 -> 它依赖的结点（只考虑 nodes 中的结点）
+    :return: 强连通分量列表，被依赖的分量排在前面
+    """
+    node_set = set(nodes)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    order = []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(deps.get(root, ())))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if w not in node_set:
+                    continue
+                if w not in index:  # 先访问w
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(deps.get(w, ()))))
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:  # v 的依赖都已访问
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:  # v 为分量的根
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        comp.append(w)
+                        if w == v:
+                            break
+                    order.append(comp)
+    return order
+
+
 class FirstAndFollow:
+    """
+    First/Follow 集
+    非终结符之间的依赖按强连通分量分解：被依赖的分量先算完，分量内部迭代至不动点；
+    文法修改后 update() 只重算受修改影响的非终结符，其余沿用修改前的结果
+    """
+
     def __init__(self, formulas_list):
         self.formulas_list = formulas_list
         self.formulas_dict = defaultdict(set)
@@ -32,6 +92,7 @@ class FirstAndFollow:
         self.Vn = set()
         self.Vt = set()
         self.info = {}
+        self.recomputed = (0, 0)  # 重新计算了first集、follow集的非终结符个数
 
     def process(self, formulas_list):
         formulas_dict = defaultdict(set)  # 存储产生式 ---dict<set> 形式
@@ -61,7 +122,11 @@ class FirstAndFollow:
         # print(Vt)
         return formulas_dict, S, Vn, Vt
 
-    def cal_v_first(self, v):  # 计算符号v的first集
+    def right_vns(self, vn):  # vn 的候选式中出现的所有非终结符
+        return {symbol for r_candidate in self.formulas_dict.get(vn, ()) for symbol in r_candidate
+                if symbol.isupper()}
+
+    def cal_v_first(self, v):  # 用当前已求得的first集，对符号v的first集做一轮扩充
         # 如果是终结符或ε，直接加入到First集合
         if not v.isupper():
             self.first[v].add(v)
@@ -71,12 +136,9 @@ class FirstAndFollow:
 
                 while i < len(r_candidate):
                     next_symbol = r_candidate[i]
-                    # 如果是非终结符，递归计算其First集合
+                    # 如果是非终结符，合并其当前的First集合（不递归，由cal_first迭代至不动点，左递归不会爆栈）
                     if next_symbol.isupper():
-                        if next_symbol == v:  # -----若相同，则为直接左递归，直接跳出-----
-                            break
-                        self.cal_v_first(next_symbol)  # -----遇到间接左递归，容易递归爆栈-----
-                        self.first[v] = self.first[v].union(self.first[next_symbol] - {'ε'})  # 合并first(next_symbol)/{ε}
+                        self.first[v] |= self.first[next_symbol] - {'ε'}  # 合并first(next_symbol)/{ε}
                         if 'ε' not in self.first[next_symbol]:
                             break
                     # 如果是终结符，加入到First集合
@@ -88,118 +150,167 @@ class FirstAndFollow:
                 if i == len(r_candidate):
                     self.first[v].add('ε')
 
-    def cal_all_first(self):  # ！！！！！！！！！只计算非终结符的first集！！！！！！！！
-        for vn in self.formulas_dict.keys():
-            self.cal_v_first(vn)
-        # for vt in self.Vt:
-        #     self.cal_v_first(vt)
-        self.cal_v_first('ε')
-
-    # def: 计算Follow集合1——考虑 添加first(Vn后一个非终结符)/{ε}， 而 不考虑 添加follow(left)
-    def cal_follow1(self, vn):
-        self.follow[vn] = set()
-        if vn == self.S:  # 若为开始符，加入#
-            self.follow[vn].add('#')
-        for left, right in self.formulas_dict.items():  # 遍历所有文法，取出左部单Vn、右部候选式集合
-            for r_candidate in right:  # 遍历当前 右部候选式集合
-                i = 0
-                while i <= len(r_candidate) - 1:  # 遍历当前 右部候选式
-                    if r_candidate[i] == vn:  # ch == Vn
-                        if i + 1 == len(r_candidate):  # 如果是最后一个字符  >>>>>  S->....V
-                            # self.follow[vn].add('#')
-                            break
-                        else:  # 后面还有字符  >>>>> S->...V..
-                            while i != len(r_candidate):
-                                i += 1
-                                # if r_candidate[i] == vn:  # 又遇到Vn，回退 >>>>> S->...V..V..
-                                #     break
-                                if r_candidate[i].isupper():  # 非终结符  >>>>> S->...VA..
-                                    self.follow[vn] = self.follow[vn].union(self.first[r_candidate[i]] - {'ε'})
-                                    if 'ε' in self.first[r_candidate[i]]:  # 能推空  >>>>> S->...VA..  A可推空
-                                        if i + 1 == len(r_candidate):  # 是最后一个字符  >>>>> S->...VA  A可推空 可等价为 S->...V
-                                            self.follow[vn].add('#')
-                                            break
-                                    else:  # 不能推空 >>>>> S->...VA..  A不可推空
-                                        break
-                                else:  # 终结符  >>>>> S->...Va..
-                                    self.follow[vn].add(r_candidate[i])
-                                    break
-                    else:
-                        i += 1
-
-    # def: 计算Follow集合2——考虑 添加follow(left)
-    def cal_follow2(self, vn):
-        for left, right in self.formulas_dict.items():  # 遍历所有文法，取出左部单Vn、右部候选式集合
-            for r_candidate in right:  # 遍历当前 右部候选式集合
-                i = 0
-                while i <= len(r_candidate) - 1:  # 遍历当前 右部候选式
-                    if r_candidate[i] == vn:  # 找到Vn
-                        if i == len(r_candidate) - 1:  # 如果当前是最后一个字符，添加 follow(left) >>>>>  S->..V
-                            self.follow[vn] = self.follow[vn].union(self.follow[left])
+    def cal_first(self, vns):  # ！！！！！！！！！只计算非终结符的first集，vns之外的非终结符已算好！！！！！！！！
+        deps = {vn: self.right_vns(vn) for vn in vns}
+        for comp in scc_order(vns, deps):
+            if len(comp) == 1 and comp[0] not in deps[comp[0]]:  # 不含（间接）左递归，算一轮即可
+                self.cal_v_first(comp[0])
+                continue
+            while True:  # 迭代计算，直到分量内first集总长度不再变化（不动点）
+                old_len = sum(len(self.first[vn]) for vn in comp)
+                for vn in comp:
+                    self.cal_v_first(vn)
+                if old_len == sum(len(self.first[vn]) for vn in comp):
+                    break
+
+    def follow_sources(self, vns):
+        """
+        扫描所有候选式中 vns 的出现位置 A->αBβ：
+            direct[B]: first(β)/{ε} 以及开始符的 #
+            deps[B]:   β 可推空（含β为空）时 follow(A) ⊆ follow(B)，记录A
+        """
+        direct = defaultdict(set)
+        deps = defaultdict(set)
+        if self.S in vns:  # 若为开始符，加入#
+            direct[self.S].add('#')
+        for left, right in self.formulas_dict.items():
+            for r_candidate in right:
+                for i, symbol in enumerate(r_candidate):
+                    if symbol not in vns:
+                        continue
+                    for next_symbol in r_candidate[i + 1:]:
+                        if next_symbol.isupper():  # 非终结符  >>>>> S->...VA..
+                            direct[symbol] |= self.first[next_symbol] - {'ε'}
+                            if 'ε' not in self.first[next_symbol]:  # 不能推空 >>>>> S->...VA..  A不可推空
+                                break
+                        elif next_symbol != 'ε':  # 终结符  >>>>> S->...Va..
+                            direct[symbol].add(next_symbol)
                             break
-                        else:  # 看看后面的字符能否推空 >>>>>  S->..V..
-                            while i != len(r_candidate):
-                                i += 1
-                                if 'ε' in self.first[r_candidate[i]]:  # 能推空  >>>>> S->..VB..  B可推空
-                                    if i == len(r_candidate) - 1:  # 且是最后一个字符  >>>>> S->..VB  B可推空
-                                        self.follow[vn] = self.follow[vn].union(self.follow[left])
-                                        break
-                                    else:  # 不是最后一个字符，继续看  >>>>> S->..VBA..  B可推空
-                                        continue
-                                else:  # 不能推空  >>>>>  S->..VB..  B不可为空
-                                    break
-                    i += 1
-
-    # def: 计算所有Follow集合的总长度，用于判断是否还需要继续完善
-    def cal_follow_total_Len(self):
-        total_Len = 0
-        for vn, vn_follow in self.follow.items():
-            total_Len += len(vn_follow)
-        return total_Len
-
-    def cal_all_follow(self):
-        # 先用 cal_follow1 算
-        for vn in self.formulas_dict.keys():
-            self.cal_follow1(vn)
-
-        # 在循环用 cal_follow2 算， 直到所有follow集总长度不再变化，说明计算完毕
-        while True:
-            old_len = self.cal_follow_total_Len()
-            for vn in self.formulas_dict.keys():
-                self.cal_follow2(vn)
-            new_len = self.cal_follow_total_Len()
-            if old_len == new_len:
-                break
+                    else:  # 后面的符号都能推空  >>>>> S->...VA  A可推空 可等价为 S->...V
+                        deps[symbol].add(left)
+        return direct, deps
+
+    def cal_follow(self, vns):  # 计算vns中非终结符的follow集，vns之外的非终结符已算好
+        vn_set = set(vns)
+        direct, deps = self.follow_sources(vn_set)
+        for comp in scc_order(vns, deps):  # 同一分量中的follow集互相包含，必然相等
+            comp_follow = set()
+            for vn in comp:
+                comp_follow |= direct[vn]
+                for left in deps[vn]:
+                    comp_follow |= self.follow[left]
+            for vn in comp:
+                self.follow[vn] = set(comp_follow)
+
+    def touch_first(self):  # first集包含所有非终结符（含未定义的）和ε，两种计算方式的键一致
+        for vn in list(self.formulas_dict.keys()):
+            for symbol in self.right_vns(vn):
+                self.first[symbol]
+        self.cal_v_first('ε')
 
     def solve(self):
         # print("\n=============FirstFollow=============")
         self.formulas_dict, self.S, self.Vn, self.Vt = self.process(self.formulas_list)
-        self.cal_all_first()
-        self.cal_all_follow()
+        vns = list(self.formulas_dict.keys())
+        self.cal_first(vns)
+        self.touch_first()
+        self.cal_follow(vns)
+        self.recomputed = (len(vns), len(vns))
         # print(f"first: {self.first}")
         # print(f"follow: {self.follow}")
         # print("=============FirstFollow=============\n")
 
         return self.first, self.follow
 
+    def update(self, formulas_list):
+        """
+        文法修改后的First/Follow集：只重算受修改影响的非终结符
+            first：产生式有变化的非终结符，以及（间接）依赖它们的非终结符
+            follow：出现在变化的产生式中、或出现在first集有变化的符号之前的非终结符，以及follow集（间接）包含它们的非终结符
+        :return: 新的 FirstAndFollow（本对象可能仍被缓存复用，不做修改）
+        """
+        ff = FirstAndFollow(formulas_list)
+        ff.formulas_dict, ff.S, ff.Vn, ff.Vt = ff.process(formulas_list)
+        if ff.S != self.S:  # 开始符变化，全部重算
+            ff.solve()
+            return ff
+        vns = list(ff.formulas_dict.keys())
+        changed = {vn for vn in set(vns) | set(self.formulas_dict)
+                   if ff.formulas_dict.get(vn) != self.formulas_dict.get(vn)}
+
+        users = defaultdict(set)  # 非终结符 -> 候选式中含有它的左部
+        for vn in vns:
+            for symbol in ff.right_vns(vn):
+                users[symbol].add(vn)
+
+        first_dirty = set(changed)
+        queue = list(changed)
+        while queue:
+            for left in users[queue.pop()]:
+                if left not in first_dirty:
+                    first_dirty.add(left)
+                    queue.append(left)
+        symbols = set(vns) | set(users) | {'ε'}
+        for symbol, first in self.first.items():
+            if symbol not in first_dirty and symbol in symbols:
+                ff.first[symbol] = set(first)
+        ff.cal_first([vn for vn in vns if vn in first_dirty])
+        ff.touch_first()
+        first_changed = {vn for vn in first_dirty if ff.first.get(vn, set()) != self.first.get(vn, set())}
+
+        follow_dirty = set(changed)
+        for vn in changed:
+            follow_dirty |= ff.right_vns(vn) | self.right_vns(vn)
+        for vn in first_changed:
+            for left in users[vn]:
+                follow_dirty |= ff.right_vns(left)
+        queue = list(follow_dirty)
+        while queue:
+            for vn in ff.right_vns(queue.pop()):
+                if vn not in follow_dirty:
+                    follow_dirty.add(vn)
+                    queue.append(vn)
+        for vn in vns:
+            if vn not in follow_dirty:
+                ff.follow[vn] = set(self.follow[vn])
+        ff.cal_follow([vn for vn in vns if vn in follow_dirty])
+        ff.recomputed = (len(first_dirty & set(vns)), len(follow_dirty & set(vns)))
+        return ff
+
 
 class SLR1:
-    def __init__(self, formulas_list):
+    def __init__(self, formulas_list, prune=False):
         self.formulas_list = formulas_list  # 存储产生式  ---list形式
+        self.grammar_list = list(formulas_list)  # 输入的产生式（未拆分），用于增量分析时应用修改
         self.S = ""
         self.Vn = []
         self.Vt = []
         self.dot_items = []  # 所有可能的.项目集
         self.dot = ""
+        self.dot_spans = []  # 每个状态的DOT语句在 dot 中的字符区间
         self.all_DFA = []
-        self.actions = {}
-        self.gotos = {}
+        self.table = None  # 整数形式的ACTION/GOTO表（LRTable）
+        self.productions = None  # 产生式元数据（Productions）
+        self.collection = None  # LR(0)项目集规范族（LR0Collection），保存闭包缓存
+        self.ff = None  # FirstAndFollow
         self.first = defaultdict(set)
         self.follow = defaultdict(set)
         self.info = {}
+        self.reuse_info = {}  # 增量分析时各部分的复用情况
         self.isSLR1 = False
+        self.conflicts = []  # 所有冲突及其反例（见 utils/Grammar_Conflicts.py）
+        self.prune = prune  # 构造前是否删除无用符号
+        self.removed = None  # 删除的无用符号和产生式（prune=True 时）
+
+    @property
+    def actions(self):  # 字典形式的ACTION表，仅用于JSON输出
+        return self.table.action_dict() if self.table is not None else {}
+
+    @property
+    def gotos(self):  # 字典形式的GOTO表，仅用于JSON输出
+        return self.table.goto_dict() if self.table is not None else {}
 
-    def step1_pre_process(self, grammar_list):
+    def step1_pre_process(self, grammar_list, base=None):
         formulas_list = []
         S = grammar_list[0][0]  # 开始符
         Vt = []  # 终结符
@@ -232,9 +343,12 @@ class SLR1:
         # print("Vn:", Vn)
         # print("Vt:", Vt)
 
-        ff = FirstAndFollow(formulas_list)
-        first, follow = ff.solve()
-        return S, Vn, Vt, formulas_list, first, follow
+        if base is not None:  # 只重算受修改影响的First/Follow集
+            self.ff = base.ff.update(formulas_list)
+        else:
+            self.ff = FirstAndFollow(formulas_list)
+            self.ff.solve()
+        return S, Vn, Vt, formulas_list, self.ff.first, self.ff.follow
 
     def step2_all_dot_pros(self, grammar_str):
         dot_items = []
@@ -250,85 +364,14 @@ class SLR1:
 
         return dot_items
 
-    def closure(self, item):  # 求item所有的产生式的闭包
-        c_item = item
-        old_c_item = []
-        while len(old_c_item) != len(c_item):
-            old_c_item = copy.deepcopy(c_item)
-            for pro in old_c_item:
-                if pro not in c_item:
-                    c_item.append(pro)
-                dot_left, dot_right = pro.split(".")
-                if dot_right == "":  # 当前产生式为最后一项为. .不能继续移动，跳过
-                    continue
-                if dot_right[0] in self.Vn:  # .后面为非终结符， 加入它的Vn->.xxxx
-                    for dot_p in self.dot_items:
-                        ind = dot_p.find("->")  # 返回-的下标
-                        if dot_p[0] == dot_right[0] \
-                                and dot_p[ind + 2] == "." \
-                                and dot_p[1] != "'" \
-                                and dot_p not in c_item:  # 首字符匹配 且不为增广符
-                            c_item.append(dot_p)
-
-        return c_item
-
-    def go(self, item, v):  # 生成item向v移动后的item_production
-        to_v_item = []
-        for pro in item:  # 1. 生成item能够用v跳转的新的产生式
-            dot_left, dot_right = pro.split(".")
-            if dot_right != "":  # 非归约/接受项目
-                if dot_right[0] == v:  # .右边是跳转符v
-                    to_v_item.append(dot_left + dot_right[0] + "." + dot_right[1:])  # 右移一位
-
-        new_item = None
-        if len(to_v_item) != 0:  # 2. 求新产生式的闭包
-            new_item = self.closure(to_v_item)
-
-        return new_item
-
-    def exist_idx(self, all_DFA, new_dfa):
-        if new_dfa.pros_ is None:
-            return -1
-        for i in range(len(all_DFA)):
-            if new_dfa == all_DFA[i]:
-                return i
-        return -1
-
-    def step3_construct_SLR1_DFA(self, dot_items):
-        # 生成初始Item0
-        all_DFA = []
-        item0_pros = []
-        item0_pros.extend(self.closure([dot_items[0]]))
-        all_DFA.append(DFA(0, item0_pros, {}))
-
-        visited_dfa = []  # close表
-        old_visted_dfa = []  # 用于判断close表长度是否再变化
-
-        V = list(self.Vn) + list(self.Vt)  # 合并非终结符和终结符
-        while True:
-            old_visted_dfa = copy.deepcopy(visited_dfa)  # 副本
-
-            for dfa in all_DFA:
-                if dfa in visited_dfa:  # 已经访问过，则continue
-                    continue
-                visited_dfa.append(dfa)  # 加入close表
-                item = dfa.pros_
-                for v in V:
-                    new_item = self.go(item, v)
-                    if new_item is not None:
-                        new_dfa = DFA(-1, new_item, {})
-                        idx = self.exist_idx(all_DFA, new_dfa)
-                        if idx == -1:  # 不存在，添加新dfa
-                            new_dfa.id_ = len(all_DFA)
-                            dfa.next_ids_[v] = new_dfa.id_
-                            all_DFA.append(new_dfa)
-                        else:  # 存在，指向原有dfa
-                            dfa.next_ids_[v] = idx
-
-            if len(old_visted_dfa) == len(visited_dfa):  # close表长度不变，退出循环
-                break
-
-        return all_DFA
+    def step3_construct_SLR1_DFA(self, dot_items, base=None):
+        # 生成项目集规范族（按核心项目缓存闭包），给出修改前的分析器时沿用其中未受影响的闭包
+        if base is not None:
+            changed = changed_lefts(base.formulas_list, self.formulas_list)
+            self.collection = LR0Collection(dot_items, self.Vn, self.Vt, base.collection, changed)
+        else:
+            self.collection = LR0Collection(dot_items, self.Vn, self.Vt)
+        return self.collection.build(DFA)
 
     def print_DFA(self, all_DFA):
         for dfa in all_DFA:
@@ -337,10 +380,16 @@ class SLR1:
             print(f"item={dfa.pros_}")
             print(f"next={dfa.next_ids_} \n")
 
-    def step4_draw_DFA(self, all_DFA):
+    def step4_draw_DFA(self, all_DFA, base=None):
         # 创建Digraph对象
         dot = graphviz.Digraph(comment='SLR1_DFA', graph_attr={'rankdir': 'LR'})
+        body_spans = []  # 每个状态的语句在 dot.body 中的下标区间
         for dfa in all_DFA:
+            start = len(dot.body)
+            if base is not None and same_state(base.all_DFA, dfa):  # 与修改前相同的状态，直接复制原来的DOT语句
+                dot.body.append(base.dot[slice(*base.dot_spans[dfa.id_])])
+                body_spans.append((start, len(dot.body)))
+                continue
             label = f"I{dfa.id_}\n"
             node_color = "lightblue"
             if dfa.id_ == 0:
@@ -354,196 +403,117 @@ class SLR1:
             if len(dfa.next_ids_) != 0:
                 for v, to_id in dfa.next_ids_.items():
                     dot.edge(str(dfa.id_), str(to_id), label=v, fontcolor='red')
+            body_spans.append((start, len(dot.body)))
         # 显示图形
         # dot.view()
+        self.dot_spans = source_spans(dot.source, dot.body, body_spans)
         return dot.source
 
-    def step5_check_SLR1(self, all_DFA):  # 判断是否为SLR1文法
-        flag = True
+    def step5_check_SLR1(self, all_DFA):  # 判断是否为SLR1文法，列出所有冲突
+        symbols = self.Vt + ['#']
+        Vt = set(self.Vt)
+
+        def lookaheads(pro):  # 归约项目在其左部的follow集上归约（接受项目 S'->S. 的follow集为 #）
+            return self.follow[self.productions.left[self.productions.item_pro(pro)]]
+
+        self.conflicts = []
         for dfa in all_DFA:
-            item = dfa.pros_
-            shift_num = 0  # 移进数目
-            protocol_num = 0  # 归约数目
-            shift_vt = set()
-            protocol_vn = set()
-            shift_pro = set()
-            protocol_pro = set()
-            for pro in item:
-                dot_left, dot_right = pro.split(".")
-                if dot_right == "":  # .在最后，为归约项目
-                    # if dot_left[:2] == self.S + "'":  # 接受项目，不考虑为归约项目
-                    #     continue
-                    protocol_num += 1
-                    pro_left, pro_right = pro.split("->")
-                    protocol_vn.add(pro_left)
-                    protocol_pro.add(pro)
-                elif dot_right[0] in self.Vt:  # .后面为终结符，为移进项目；
-                    shift_num += 1
-                    shift_vt.add(dot_right[0])
-                    shift_pro.add(pro)
-            if protocol_num == 1 and shift_num >= 1:  # SLR能解决 移进归约冲突（只存在一个归约）
-                shift_conf_msg = ""
-                for s_pro in shift_pro:
-                    shift_conf_msg += s_pro + " "
-                print(f"I{dfa.id_}中：{shift_conf_msg} 与  {next(iter(protocol_pro))}存在移进-归约冲突")
-                for vt in shift_vt:
-                    for vn in protocol_vn:
-                        if self.first[vt].intersection(self.follow[vn]):  # 有交集
-                            flag = False
-                            print(f"它们的first与follow交集不为空，不满足SLR")
-                            return flag
-                flag = True
-                print(f"但它们的first与follow交集为空，可忽略")
-            elif protocol_num >= 2:  # SLR不能解决 归约-归约冲突
-                pro_conf_msg = ""
-                for p_pro in protocol_pro:
-                    pro_conf_msg += p_pro + " "
-                print(f"I{dfa.id_}中: {pro_conf_msg} 存在归约-归约冲突，不满足SLR")
-                flag = False
-
-        return flag
-
-    def step6_construct_SLR1_table(self, all_DFA, formulas_list):
-        actions = {}
-        gotos = {}
+            self.conflicts.extend(dot_item_conflicts(dfa, Vt, symbols, lookaheads))
+        explain_lr_conflicts(self.conflicts, self.formulas_list, all_DFA)  # 为冲突找反例
+        return not self.conflicts
+
+    def step6_construct_SLR1_table(self, all_DFA, formulas_list, base=None):
+        table = LRTable(len(all_DFA), self.Vt, self.Vn)
+        # 给出修改前的分析器时，项目集、转移和归约用到的follow集都没变的状态直接复制原来的行
+        reused_rows = self.collection.reusable_rows(all_DFA, self.productions, base, self.follow) \
+            if base is not None else {}
+        self.reuse_info["rows"] = len(reused_rows)
         for dfa in all_DFA:
             id_ = dfa.id_
+            if id_ in reused_rows:
+                table.copy_row(id_, base.table, reused_rows[id_])
+                continue
             next_ids = dfa.next_ids_
             if len(next_ids) == 0:  # 无下一个状态，必定为归约项目或接受项目，且只有一个产生式
                 pro = dfa.pros_[0].replace(".", "")  # 去除.
                 if pro == formulas_list[0]:  # 如果这一个为接受项目：S'->S
-                    actions[(id_, "#")] = "acc"
+                    table.set_accept(id_)
                 else:  # 其他的指定产生式
                     # ===========LR0===========
                     # for vt in self.Vt:
-                    #     actions[(id_, vt)] = "r" + str(formulas_list.index(pro))
-                    # actions[(id_, "#")] = "r" + str(formulas_list.index(pro))
+                    #     table.set_reduce(id_, vt, self.productions.index[pro])
+                    # table.set_reduce(id_, "#", self.productions.index[pro])
 
                     # ===========SLR1===========
-                    pro_left, pro_right = pro.split("->")
-                    for ch in self.follow[pro_left]:
-                        actions[(id_, ch)] = "r" + str(formulas_list.index(pro))
-                    # actions[(id_, "#")] = "r" + str(formulas_list.index(pro))
+                    p = self.productions.index[pro]
+                    for ch in self.follow[self.productions.left[p]]:
+                        table.set_reduce(id_, ch, p)
+                    # table.set_reduce(id_, "#", self.productions.index[pro])
             else:  # 有指向下一个项目，同时当前项目可能存在接受项目、归约项目（点在末尾）、移进项目
                 for item in dfa.pros_:
                     pro_left, pro_right = item.split(".")
                     if pro_right == "":  # .在最后   为归约项目
                         pro = item.replace(".", "")
                         if pro == formulas_list[0]:  # 为接受项目
-                            actions[(id_, "#")] = "acc"
-                        else:  # 为其他的归约项目
-                            left, right = pro.split("->")
-                            if right == '':  # 由于在生成all_dot_pro时把A->ε ==> A->.，因此这里需要复原判断一下
-                                pro += 'ε'
-                            for ch in self.follow[left]:
-                                actions[(id_, ch)] = "r" + str(formulas_list.index(pro))
-                            actions[(id_, "#")] = "r" + str(formulas_list.index(pro))
+                            table.set_accept(id_)
+                        else:  # 为其他的归约项目（A->ε 的项目 A->. 也能直接查到产生式序号）
+                            p = self.productions.index[pro]
+                            for ch in self.follow[self.productions.left[p]]:
+                                table.set_reduce(id_, ch, p)
 
                 for v, to_dfa_id in next_ids.items():
                     if v in self.Vt:
-                        actions[(id_, v)] = "s" + str(to_dfa_id)
+                        table.set_shift(id_, v, to_dfa_id)
                     elif v in self.Vn:
-                        gotos[(id_, v)] = to_dfa_id
-
-        # 转成df对象
-        merged_dict = {key: value for d in (actions, gotos) for key, value in d.items()}
-        sorted_keys = sorted(merged_dict.keys(), key=lambda x:
-        (x[1].isupper(), x[1] == "#", x[1]))
-        sort_dict = {key: merged_dict[key] for key in sorted_keys}
-        columns = []
-        for k in sort_dict.keys():
-            if k[1] not in columns:
-                columns.append(k[1])
-        rows = sorted(set(key[0] for key in sort_dict.keys()))
-        df = pd.DataFrame(index=rows, columns=columns)
-        for key, value in sort_dict.items():
-            df.loc[key[0], key[1]] = value
-
-        # print(df)
-        return actions, gotos
-
-    def step7_SLR1_analyse(self, actions, gotos, formulas_list, input_str):
-        s = list(input_str)
-        s.append("#")
-        sp = 0  # 字符串指针
-
-        state_stack = []
-        symbol_stack = []
-        state_stack.append(0)
-        symbol_stack.append("#")
-
-        step = 0
-        msg = ""
-        info_step, info_state_stack, info_symbol_stack, info_str, info_msg, info_res = [], [], [], [], [], ""
-        # 分析
-        while sp != len(s):
-            step += 1
-            ch = s[sp]
-            top_state = state_stack[-1]
-            top_symbol = symbol_stack[-1]
-            info_step.append(step)
-            info_state_stack.append("".join([str(x) for x in state_stack]))
-            info_symbol_stack.append("".join(symbol_stack))
-            info_str.append("".join(s[sp:]))
-            if (top_state, ch) not in actions.keys():
-                info_res = f"error：分析失败，找不到Action({(top_state, ch)})"
-                info_msg.append("error")
-                break
-            find_action = actions[(top_state, ch)]
-
-            if find_action[0] == "s":  # 移进操作
-                state_stack.append(int(find_action[1:]))
-                symbol_stack.append(ch)
-                sp += 1
-                msg = f"Action[{top_state},{ch}]={find_action}: 状态{find_action[1:]}入栈"
-            elif find_action[0] == 'r':  # 归约操作
-                pro = formulas_list[int(find_action[1:])]  # 获取第r行的产生式
-                pro_left, pro_right = pro.split("->")
-                pro_right_num = len(pro_right) if pro_right != 'ε' else 0
-                for i in range(pro_right_num):
-                    state_stack.pop()
-                    symbol_stack.pop()
-                symbol_stack.append(pro_left)
-                goto_key = (state_stack[-1], symbol_stack[-1])
-                if goto_key in gotos.keys():
-                    msg = f"Action[{top_state},{ch}]={find_action}: 用{pro}归约，Goto[{state_stack[-1]},{symbol_stack[-1]}]={gotos[goto_key]}入栈"
-                    state_stack.append(gotos[goto_key])
-                else:
-                    info_res = f"error：分析失败，找不到GOTO({state_stack[-1]},{symbol_stack[-1]})"
-            elif find_action == "acc":
-                msg = "acc: 分析成功！"
-                info_msg.append(msg)
-                info_res = "Success!"
-                break
-            info_msg.append(msg)
-
-        # print
-        for i in range(len(info_step)):
-            print(f"{info_step[i]}\t{info_state_stack[i]}\t{info_symbol_stack[i]}\t{info_str[i]}\t{info_msg[i]}\n")
-
-        info = {
-            "info_step": info_step,
-            "info_state_stack": info_state_stack,
-            "info_symbol_stack": info_symbol_stack,
-            "info_str": info_str,
-            "info_msg": info_msg,
-            "info_res": info_res
-        }
-        return info
+                        table.set_goto(id_, v, to_dfa_id)
 
-    def init(self):
+        table.maybe_compress()  # 大表做行位移压缩
+        return table
+
+    def step7_SLR1_analyse(self, table, productions, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        return lr_analyse(table, productions, input_str, trace, tree_format)
+
+    def prepare(self, base=None):
+        """
+        预处理、First/Follow、项目集规范族和DFA图（step1~step4）
+        多算法统一分析时，prepare() 过的SLR1分析器作为同一文法的共享中间结果（见 init 的 shared）
+        """
+        if self.prune:  # 删除推不出终结符串、不可到达的非终结符
+            self.formulas_list, self.removed = remove_useless(self.formulas_list)
         self.S, self.Vn, self.Vt, self.formulas_list, self.first, self.follow = self.step1_pre_process(
-            self.formulas_list)
+            self.formulas_list, base)
+        self.productions = Productions(self.formulas_list, self.Vn)  # 产生式元数据，只计算一次
         self.dot_items = self.step2_all_dot_pros(self.formulas_list)  # 计算所有项目（带点）
-        self.all_DFA = self.step3_construct_SLR1_DFA(self.dot_items)  # 计算项目集的DFA转换关系
+        self.all_DFA = self.step3_construct_SLR1_DFA(self.dot_items, base)  # 计算项目集的DFA转换关系
         # self.print_DFA(self.all_DFA)
-        self.dot = self.step4_draw_DFA(self.all_DFA)  # 画项目集的DFA转换图
+        self.dot = self.step4_draw_DFA(self.all_DFA, base)  # 画项目集的DFA转换图
+
+    def init(self, base=None, shared=None):
+        """
+        :param base: 修改前文法的SLR1分析器（已 init()），给出时增量分析：
+                     只重算受影响的First/Follow集，沿用未受影响的闭包和分析表行
+        :param shared: 同一文法已 prepare() 的SLR1分析器，给出时直接沿用 step1~step4 的结果
+        """
+        if shared is not None:
+            for name in SHARED_FIELDS + ('ff', 'dot', 'dot_spans', 'removed'):
+                setattr(self, name, getattr(shared, name))
+            self.first = defaultdict(set, shared.first)  # 查询时会添加键，不修改共享的集合
+            self.follow = defaultdict(set, shared.follow)
+        else:
+            self.prepare(base)
         self.isSLR1 = self.step5_check_SLR1(self.all_DFA)
         if self.isSLR1:  # 检测是否符合SLR1文法
-            self.actions, self.gotos = self.step6_construct_SLR1_table(self.all_DFA, self.formulas_list)  # 画表
-
-    def solve(self, input_str):
-        self.info = self.step7_SLR1_analyse(self.actions, self.gotos, self.formulas_list, input_str)
+            self.table = self.step6_construct_SLR1_table(self.all_DFA, self.formulas_list, base)  # 画表
+        self.reuse_info.update({
+            "first": self.ff.recomputed[0],  # 重算first集的非终结符数
+            "follow": self.ff.recomputed[1],  # 重算follow集的非终结符数
+            "closures": self.collection.reused,  # 沿用的闭包数
+            "states": len(self.all_DFA)
+        })
+
+    def solve(self, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+        self.info = self.step7_SLR1_analyse(self.table, self.productions, input_str, trace, tree_format)
+        return self.info
 
 
 if __name__ == "__main__":
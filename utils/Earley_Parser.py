@@ -0,0 +1,303 @@
+"""
+Earley 通用分析程序（文法不是 LL(1)/LR 文法时，输入串分析的后备方法）
+在文法的中间表示上工作，适用于任意上下文无关文法（含左递归、二义性文法）：
+    项目 (产生式序号, 点的位置, 起点)，第 i 个项目集为读入前 i 个字符后的所有项目
+    可推空的非终结符预先计算（Aycock-Horspool）：预测可推空的非终结符时直接把点移过它，不需要反复完成ε产生式
+    Leo 优化：某项目集中点后为 A 的项目只有一个且 A 在末尾时，完成 A 沿确定的归约路径直接得到最顶端的项目，
+             右递归文法不再在每个项目集中重复完成整条链（建树用到的路径才补出其中省略的项目）
+LR 类文法上每个项目集的项目数有界，分析时间与输入串长度成线性关系，最坏（二义性文法）为立方
+"""
+from utils.Grammar_IR import GrammarIR, is_nonterminal
+from utils.Parse_Tree import ParseTree
+
+START = ""  # 增广开始符（S' -> S），不会与文法符号重名
+
+
+class EarleyChart:
+    """一次分析的所有项目集"""
+
+    def __init__(self, tokens):
+        n = len(tokens)
+        self.tokens = tokens
+        self.sets = [[] for _ in range(n + 1)]  # 项目集：[(产生式序号, 点, 起点), ...]
+        self.index = [{} for _ in range(n + 1)]  # 项目 -> 在项目集中的序号
+        self.waiting = [{} for _ in range(n + 1)]  # 非终结符 -> 点在它前面的项目
+        self.leo = [{} for _ in range(n + 1)]  # 非终结符 -> (最顶端项目, 点在它前面的唯一项目)，没有确定路径时为None
+        self.leo_entries = [[] for _ in range(n + 1)]  # 在该项目集中经 Leo 路径完成的 (起点, 非终结符, 完成项目的序号)
+        self.completed = {}  # 项目集序号 -> {非终结符: [(起点, 产生式序号, 序号), ...]}，建树时按需构造
+        self.leo_tops = {}  # 项目集序号 -> {(产生式序号, 起点, 序号): [Leo 路径 (起点, 非终结符, 完成项目的序号), ...]}
+        self.leo_children = {}  # 项目集序号 -> {(产生式序号, 起点, 序号): 最后一个子结点}，建树用到的 Leo 路径才补出
+        self.leo_seen = {}  # 项目集序号 -> 已补出的 Leo 路径上的项目
+
+    def add(self, i, item):
+        index = self.index[i]
+        if item not in index:
+            index[item] = len(self.sets[i])
+            self.sets[i].append(item)
+
+    def size(self):
+        return sum(len(items) for items in self.sets)
+
+
+class EarleyParser:
+    def __init__(self, grammar_list):
+        """:param grammar_list: 产生式串 ["S->aA|b", ...]"""
+        ir = GrammarIR.parse(grammar_list)
+        self.S = ir.S
+        self.rules = [(START, (ir.S,))]  # [(左部, 右部符号元组)]，0号为增广产生式
+        self.by_lhs = {}  # 非终结符 -> 产生式序号
+        for left, candidates in ir.rules.items():
+            for candidate in candidates:
+                self.by_lhs.setdefault(left, []).append(len(self.rules))
+                self.rules.append((left, candidate))
+        self.nullable = ir.nullable()
+        self.epsilon_rules = self.step1_epsilon_rules()
+
+    def step1_epsilon_rules(self):
+        """可推空的非终结符 -> 推出ε所用的产生式（按确定可推空的先后选取，建ε子树时不会成环）"""
+        result = {}
+        changed = True
+        while changed:
+            changed = False
+            for left, rule_ids in self.by_lhs.items():
+                if left in result:
+                    continue
+                for r in rule_ids:
+                    if all(s in result for s in self.rules[r][1]):
+                        result[left] = r
+                        changed = True
+                        break
+        return result
+
+    def transitive(self, chart, j, symbol):
+        """
+        Leo 确定归约路径：项目集 j 中点在 symbol 前的项目只有一个且 symbol 在末尾时，沿路径找到最顶端的项目
+        没有确定路径时返回None；结果记在 chart.leo 中，同一路径只走一次
+        """
+        path = []
+        top = None
+        while True:
+            memo = chart.leo[j]
+            if symbol in memo:  # 已计算过（或正在计算，成环时按没有路径处理）
+                top = memo[symbol][0] if memo[symbol] else None
+                break
+            memo[symbol] = None
+            waits = chart.waiting[j].get(symbol)
+            if not waits or len(waits) != 1:
+                break
+            r, d, o = waits[0]
+            if d + 1 != len(self.rules[r][1]):
+                break
+            path.append((j, symbol, waits[0]))
+            j, symbol = o, self.rules[r][0]
+        for j, symbol, wait in reversed(path):
+            r, d, o = wait
+            if top is None:
+                top = (r, d + 1, o)
+            chart.leo[j][symbol] = (top, wait)
+        return top
+
+    def step2_recognize(self, tokens):
+        """构造所有项目集"""
+        chart = EarleyChart(tokens)
+        rules, by_lhs, nullable = self.rules, self.by_lhs, self.nullable
+        n = len(tokens)
+        chart.add(0, (0, 0, 0))
+        for i in range(n + 1):
+            items = chart.sets[i]
+            waiting = chart.waiting[i]
+            predicted = set()
+            k = 0
+            while k < len(items):
+                item = items[k]
+                r, d, o = item
+                rhs = rules[r][1]
+                if d < len(rhs):
+                    symbol = rhs[d]
+                    if is_nonterminal(symbol):
+                        waiting.setdefault(symbol, []).append(item)
+                        if symbol not in predicted:  # 预测
+                            predicted.add(symbol)
+                            for r2 in by_lhs.get(symbol, ()):
+                                chart.add(i, (r2, 0, i))
+                        if symbol in nullable:  # 可推空，直接把点移过它
+                            chart.add(i, (r, d + 1, o))
+                    elif i < n and tokens[i] == symbol:  # 扫描
+                        chart.add(i + 1, (r, d + 1, o))
+                elif o < i:  # 完成（起点为 i 的完成项目已由可推空规则处理）
+                    left = rules[r][0]
+                    top = self.transitive(chart, o, left)
+                    if top is not None:
+                        chart.add(i, top)
+                        chart.leo_entries[i].append((o, left, k))
+                    else:
+                        for r2, d2, o2 in chart.waiting[o].get(left, ()):
+                            chart.add(i, (r2, d2 + 1, o2))
+                k += 1
+        return chart
+
+    def completed_items(self, chart, e):
+        """
+        项目集 e 中的完成项目 {非终结符: [(起点, 产生式序号, 序号), ...]}，序号为 (加入项目集的次序, 0)
+        Leo 路径上省略的项目只是路径上一层的子结点，不在这里列出，由 leo_child 按需补出
+        """
+        result = chart.completed.get(e)
+        if result is not None:
+            return result
+        result = {}
+        for k, (r, d, o) in enumerate(chart.sets[e]):
+            if d == len(self.rules[r][1]):
+                result.setdefault(self.rules[r][0], []).append((o, r, (k, 0)))
+        chart.completed[e] = result
+        return result
+
+    def leo_child(self, chart, r, o, e, order):
+        """
+        完成项目 [r, 起点 o] (项目集 e, 序号 order) 若为 Leo 路径上的项目（含最顶端项目），返回它的最后一个子结点，否则返回None
+        最顶端项目第一次查询时才补出以它为顶的路径，建树的时间与用到的路径长度成正比
+        """
+        children = chart.leo_children.setdefault(e, {})
+        child = children.get((r, o, order))
+        if child is not None or order[1] != 0:  # 省略的项目（order[1] > 0）在补出路径时已登记
+            return child
+        tops = chart.leo_tops.get(e)
+        if tops is None:
+            tops = chart.leo_tops[e] = {}
+            for entry in chart.leo_entries[e]:
+                top = chart.leo[entry[0]][entry[1]][0]
+                tops.setdefault((top[0], top[2], (chart.index[e][top], 0)), []).append(entry)
+        for entry in tops.pop((r, o, order), ()):
+            if entry[2] < order[0]:  # 最顶端项目由本路径加入时才取用（也可能之前已由别的途径加入）
+                self.expand_leo_path(chart, e, *entry)
+                child = children.get((r, o, order))
+                if child is not None:
+                    return child
+        return None
+
+    def expand_leo_path(self, chart, e, o, symbol, k):
+        """
+        补出项目集 e 中由第 k 个项目（完成 symbol，起点 o）触发的 Leo 路径上省略的项目，登记各项目的最后一个子结点
+        省略的项目的序号排在触发它的完成项目之后、最顶端项目之前：(触发项目的次序, 路径上的层数)
+        """
+        children = chart.leo_children[e]
+        seen = chart.leo_seen.setdefault(e, set())
+        top, wait = chart.leo[o][symbol]
+        child = ('node', symbol, chart.sets[e][k][0], o, e, (k, 0))  # 触发路径的完成项目
+        level = 1
+        while True:
+            r, d, origin = wait
+            item = (r, d + 1, origin)
+            if item in seen:  # 与已补出的路径汇合
+                return
+            if item == top:
+                children.setdefault((r, origin, (chart.index[e][top], 0)), child)
+                return
+            seen.add(item)
+            left = self.rules[r][0]
+            order = (k, level)
+            children[(r, origin, order)] = child
+            child = ('node', left, r, origin, e, order)
+            level += 1
+            memo = chart.leo[origin].get(left)
+            if not memo:
+                return
+            wait = memo[1]
+
+    def walk_back(self, chart, r, o, e, order):
+        """
+        由完成项目 [r, 起点 o] (项目集 e, 序号 order) 从右往左确定各个子结点：
+        终结符、推出ε的非终结符 ('ε', 符号) 或 ('node', 符号, 产生式序号, 起点, 终点, 序号)
+        只选序号更小（同一项目集中更早加入）的项目作为依据，不会成环
+        """
+        rhs = self.rules[r][1]
+        children = []
+        leo_child = self.leo_child(chart, r, o, e, order)
+        for d in range(len(rhs), 0, -1):
+            symbol = rhs[d - 1]
+            prefix = (r, d - 1, o)
+            if leo_child is not None:  # Leo 路径上的项目，子结点已知
+                children.append(leo_child)
+                e = leo_child[3]
+                order = (chart.index[e][prefix], 0)
+                leo_child = None
+                continue
+            if not is_nonterminal(symbol):
+                e -= 1
+                children.append(symbol)
+                order = (chart.index[e][prefix], 0)
+                continue
+            k = chart.index[e].get(prefix)
+            if symbol in self.nullable and k is not None and (k, 0) < order:
+                children.append(('ε', symbol))
+                order = (k, 0)
+                continue
+            for j, r2, child_order in self.completed_items(chart, e).get(symbol, ()):
+                if j < e and child_order < order and prefix in chart.index[j]:
+                    children.append(('node', symbol, r2, j, e, child_order))
+                    e = j
+                    order = (chart.index[j][prefix], 0)
+                    break
+        children.reverse()
+        return children
+
+    def step3_build_tree(self, chart):
+        """由项目集建一棵语法树（二义性文法时为其中一棵），自顶向下用显式栈，不受递归深度限制"""
+        n = len(chart.tokens)
+        top = (0, 1, 0)
+        start, = self.walk_back(chart, 0, 0, n, (chart.index[n][top], 0))
+        tree = ParseTree()
+        tree.root = tree.add(self.S)
+        if start[0] == 'ε':
+            self.build_epsilon(tree, tree.root, self.S)
+            return tree
+        stack = [(tree.root,) + start[2:]]
+        while stack:
+            node, r, o, e, order = stack.pop()
+            children = self.walk_back(chart, r, o, e, order)
+            if not children:
+                tree.expand(node, ['ε'])
+                continue
+            nodes = tree.expand(node, [child if isinstance(child, str) else child[1] for child in children])
+            for child_node, child in zip(nodes, children):
+                if isinstance(child, str):
+                    continue
+                if child[0] == 'ε':
+                    self.build_epsilon(tree, child_node, child[1])
+                else:
+                    stack.append((child_node, child[2], child[3], child[4], child[5]))
+        return tree
+
+    def build_epsilon(self, tree, node, symbol):
+        rhs = self.rules[self.epsilon_rules[symbol]][1]
+        if not rhs:
+            tree.expand(node, ['ε'])
+            return
+        for child_node, child in zip(tree.expand(node, rhs), rhs):
+            self.build_epsilon(tree, child_node, child)
+
+    def recognize(self, input_str):
+        """输入串是否是文法的句子"""
+        chart = self.step2_recognize(list(input_str))
+        return (0, 1, 0) in chart.index[len(input_str)]
+
+    def solve(self, input_str, tree_format=None):
+        """
+        分析输入串，返回与各分析器 solve() 相同格式的 info（info_res），并附上 info_parser、info_items（项目总数）
+        :param tree_format: 语法树输出格式（arrays/dot），给出时分析成功后建一棵语法树放在 info_tree 中
+        """
+        tokens = list(input_str)
+        chart = self.step2_recognize(tokens)
+        n = len(tokens)
+        info = {"info_parser": "earley", "info_items": chart.size()}
+        if (0, 1, 0) in chart.index[n]:
+            info["info_res"] = "Success!"
+        else:
+            last = max(i for i in range(n + 1) if chart.sets[i])
+            if last < n:
+                info["info_res"] = f"error：分析失败，第{last + 1}个字符 {tokens[last]} 处无法继续分析"
+            else:
+                info["info_res"] = "error：分析失败，输入串不完整"
+        if tree_format is not None:
+            success = info["info_res"] == "Success!"
+            info["info_tree"] = self.step3_build_tree(chart).export(tree_format) if success else None
+        return info
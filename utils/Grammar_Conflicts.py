@@ -0,0 +1,297 @@
+"""
+冲突分析：列出文法的所有冲突（状态/非终结符、向前看符号、涉及的项目或候选式），并为每个冲突找反例
+    反例前缀：LR 在自动机上从 I0 广度优先找到冲突状态的最短路径（活前缀），LL 按最左推导找到冲突非终结符最先出现的句型，
+             其中的非终结符换成它能推出的最短终结符串。读完该前缀、向前看为冲突符号时，分析器无法确定动作
+    二义句子：在文法上按最左推导做有界搜索（最短推出长度小的句型先展开），两个不同的最左推导到达同一句型时，
+             把该句型推导成以反例前缀开头的句子，即为二义的反例；超出界限时只给出反例前缀
+"""
+import heapq
+import os
+from collections import defaultdict, deque
+
+from utils.Grammar_IR import GrammarIR, is_nonterminal
+
+# 搜索界限
+MAX_LENGTH = int(os.environ.get('CONFLICT_MAX_LENGTH', 12))  # 搜索的句子最大长度
+MAX_NODES = int(os.environ.get('CONFLICT_MAX_NODES', 5000))  # 每次搜索最多展开的句型数
+MAX_SEARCHES = int(os.environ.get('CONFLICT_MAX_SEARCHES', 5))  # 最多为前几个冲突搜索二义句子
+
+# 冲突类型
+SHIFT_REDUCE = 'shift-reduce'
+REDUCE_REDUCE = 'reduce-reduce'
+FIRST_FIRST = 'first-first'
+FIRST_FOLLOW = 'first-follow'
+CONFLICT_NAMES = {
+    SHIFT_REDUCE: "移进-归约冲突",
+    REDUCE_REDUCE: "归约-归约冲突",
+    FIRST_FIRST: "FIRST集冲突",
+    FIRST_FOLLOW: "FIRST/FOLLOW集冲突",
+}
+
+
+# =============列出冲突=============
+def lr_state_conflicts(state, shifts, reduces, symbols):
+    """
+    LR 状态中的冲突，涉及的项目相同的冲突合并为一条
+    :param shifts: { 终结符: [在它上移进的项目, ...] }
+    :param reduces: [(归约项目, 在哪些符号上归约), ...]（接受项目在 # 上归约）
+    :param symbols: Vt + ['#']，决定向前看符号的顺序
+    :return: [{"state": 状态号, "type": 冲突类型, "lookaheads": [...], "items": [...], "message": 说明}, ...]
+    """
+    by_symbol = defaultdict(list)
+    for item, lookaheads in reduces:
+        for t in lookaheads:
+            by_symbol[t].append(item)
+    groups = {}
+    for t in symbols:
+        items = by_symbol.get(t)
+        if not items or (len(items) == 1 and t not in shifts):
+            continue
+        kind = SHIFT_REDUCE if t in shifts else REDUCE_REDUCE
+        involved = tuple(shifts.get(t, ())) + tuple(items)
+        conflict = groups.get((kind, involved))
+        if conflict is None:
+            conflict = groups[(kind, involved)] = {
+                "state": state,
+                "type": kind,
+                "lookaheads": [],
+                "items": list(involved)
+            }
+        conflict["lookaheads"].append(t)
+    for conflict in groups.values():
+        conflict["message"] = (f"I{state}中：{' '.join(conflict['items'])} 在 {'、'.join(conflict['lookaheads'])} "
+                               f"上存在{CONFLICT_NAMES[conflict['type']]}")
+    return list(groups.values())
+
+
+def dot_item_conflicts(dfa, Vt, symbols, lookaheads):
+    """
+    LR0/SLR1 状态（项目为 "A->α.β" 串）中的冲突
+    :param lookaheads: lookaheads(归约项目) -> 在哪些符号上归约
+    """
+    shifts = {}
+    reduces = []
+    for pro in dfa.pros_:
+        dot_right = pro[pro.find(".") + 1:]
+        if dot_right == "":  # .在最后，为归约项目
+            reduces.append((pro, lookaheads(pro)))
+        elif dot_right[0] in Vt and dot_right[0] in dfa.next_ids_:  # .后面为终结符，为移进项目
+            shifts.setdefault(dot_right[0], []).append(pro)
+    return lr_state_conflicts(dfa.id_, shifts, reduces, symbols)
+
+
+def viable_prefixes(all_DFA):
+    """从 I0 到各状态的最短路径上的符号串（活前缀），广度优先"""
+    prefixes = {0: ""}
+    queue = deque([0])
+    while queue:
+        sid = queue.popleft()
+        for v, to_id in all_DFA[sid].next_ids_.items():
+            if to_id not in prefixes:
+                prefixes[to_id] = prefixes[sid] + v
+                queue.append(to_id)
+    return prefixes
+
+
+# =============反例搜索=============
+class Counterexamples:
+    """
+    在文法上搜索反例，句型用字符串表示（单字符符号），ε候选式为空串
+    """
+
+    def __init__(self, grammar_list, max_length=MAX_LENGTH, max_nodes=MAX_NODES):
+        ir = GrammarIR.parse(grammar_list)
+        self.S = ir.S
+        self.rules = {left: ["".join(c) for c in candidates] for left, candidates in ir.rules.items()}
+        self.max_length = max_length
+        self.max_nodes = max_nodes
+        self.budget = 0  # 本次搜索还能加入的句型数（二义搜索与其中补全句子的搜索共用）
+        self.shortest, self.best = self.shortest_yields()
+
+    def shortest_yields(self):
+        """
+        各非终结符能推出的最短终结符串，以及推出它所用的候选式
+        按长度从小到大逐个确定（Knuth 对 Dijkstra 的推广），候选式只用已确定的非终结符，按 best 展开一定终止
+        """
+        shortest = {}
+        best = {}
+        while True:
+            found = None
+            for left, candidates in self.rules.items():
+                if left in shortest:
+                    continue
+                for c in candidates:
+                    if all(not is_nonterminal(s) or s in shortest for s in c):
+                        n = sum(len(shortest[s]) if is_nonterminal(s) else 1 for s in c)
+                        if found is None or n < found[0]:
+                            found = (n, left, c)
+            if found is None:
+                return shortest, best
+            _, left, c = found
+            best[left] = c
+            shortest[left] = "".join(shortest[s] if is_nonterminal(s) else s for s in c)
+
+    def terminal_string(self, symbols):
+        """符号串中的非终结符换成最短终结符串，有推不出终结符串的非终结符时为None"""
+        if any(is_nonterminal(s) and s not in self.shortest for s in symbols):
+            return None
+        return "".join(self.shortest[s] if is_nonterminal(s) else s for s in symbols)
+
+    def min_length(self, form):
+        return sum(len(self.shortest[s]) if is_nonterminal(s) else 1 for s in form)
+
+    @staticmethod
+    def split(form):
+        """句型 -> 最左非终结符的位置（没有时为句型长度）"""
+        for i, s in enumerate(form):
+            if is_nonterminal(s):
+                return i
+        return len(form)
+
+    def children(self, form):
+        """
+        对最左非终结符做一步推导得到的句型
+        跳过用到推不出终结符串的符号、最短推出长度超出界限的；可推空的非终结符也计入长度界限，避免 S->SS|ε 无限展开
+        """
+        i = self.split(form)
+        for c in self.rules.get(form[i], ()) if i < len(form) else ():
+            child = form[:i] + c + form[i + 1:]
+            if len(child) <= 2 * self.max_length and all(not is_nonterminal(s) or s in self.shortest for s in c) \
+                    and self.min_length(child) <= self.max_length:
+                yield child
+
+    @staticmethod
+    def compatible(form, target, end):
+        """句型的终结符前缀是否可能推出以 target 开头（end=True 时恰为 target）的句子"""
+        prefix = form[:Counterexamples.split(form)]
+        if len(prefix) < len(target):
+            return len(prefix) < len(form) and target.startswith(prefix)
+        return prefix.startswith(target) and (not end or len(prefix) == len(target))
+
+    def covers(self, form, target, end):
+        """句型按最短串补全后的句子是否以 target 开头（end=True 时恰为 target）"""
+        prefix = form[:self.split(form)]
+        if end:
+            return prefix == target and self.min_length(form) == len(target)
+        return len(prefix) >= len(target) and prefix.startswith(target)
+
+    def complete(self, form):
+        """按最短串对应的候选式做最左推导，直到全为终结符：[form, ..., 句子]"""
+        path = [form]
+        i = self.split(form)
+        while i < len(form):
+            form = form[:i] + self.best[form[i]] + form[i + 1:]
+            path.append(form)
+            i = self.split(form)
+        return path
+
+    @staticmethod
+    def path(parent, form):
+        path = []
+        while form is not None:
+            path.append(form)
+            form = parent[form]
+        return path[::-1]
+
+    def find_form(self, start, goal, target="", end=False, budget=None):
+        """
+        从句型 start 出发按最左推导有界搜索满足 goal 的句型（终结符前缀须与 target 相容）
+        :param budget: 最多加入的句型数，None 时为 max_nodes；在二义搜索中调用时共用其剩余数（self.budget）
+        :return: 推导过程 [start, ..., 句型]，未找到为None
+        """
+        if self.terminal_string(start) is None:  # 推不出终结符串
+            return None
+        if budget is not None:
+            self.budget = budget
+        parent = {start: None}
+        heap = [(self.min_length(start), 0, start)]
+        seq = 1
+        while heap and self.budget > 0:
+            _, _, form = heapq.heappop(heap)
+            if goal(form):
+                return self.path(parent, form)
+            for child in self.children(form):
+                if child not in parent and self.compatible(child, target, end):
+                    parent[child] = form
+                    heapq.heappush(heap, (self.min_length(child), seq, child))
+                    seq += 1
+                    self.budget -= 1
+        return None
+
+    def ambiguous(self, target, end=False):
+        """
+        有界搜索以 target 开头（end=True 时恰为 target）的二义句子
+        :return: {"sentence": 句子, "derivations": [最左推导1, 最左推导2]}，未找到为None
+        """
+        if self.S not in self.shortest:
+            return None
+        self.budget = self.max_nodes
+        parent = {self.S: None}
+        heap = [(self.min_length(self.S), 0, self.S)]
+        seq = 1
+        while heap and self.budget > 0:
+            _, _, form = heapq.heappop(heap)
+            for child in self.children(form):
+                if not self.compatible(child, target, end):
+                    continue
+                if child not in parent:
+                    parent[child] = form
+                    heapq.heappush(heap, (self.min_length(child), seq, child))
+                    seq += 1
+                    self.budget -= 1
+                    continue
+                # 两个不同的最左推导到达同一句型，从它推出以 target 开头的句子
+                tail = self.find_form(child, lambda f: self.covers(f, target, end), target, end)
+                if tail is None:
+                    continue
+                tail = tail + self.complete(tail[-1])[1:]
+                return {
+                    "sentence": tail[-1],
+                    "derivations": [self.path(parent, child) + tail[1:], self.path(parent, form) + tail]
+                }
+        return None
+
+    def explain(self, conflict, prefix, example, search=True):
+        """
+        给冲突加上反例：prefix（活前缀/句型前缀）、example（读到冲突处的终结符串，推不出时为None）、
+        counterexample（以 example + 冲突符号开头的二义句子，未搜索或未找到为None）
+        """
+        lookahead = conflict["lookaheads"][0] if conflict["lookaheads"] else '#'
+        conflict["prefix"] = prefix
+        conflict["example"] = example
+        conflict["counterexample"] = None
+        if search and example is not None:
+            end = lookahead == '#'
+            conflict["counterexample"] = self.ambiguous(example if end else example + lookahead, end)
+        return conflict
+
+
+def explain_lr_conflicts(conflicts, formulas_list, all_DFA, max_searches=MAX_SEARCHES):
+    """
+    为 LR 冲突加上反例
+    :param formulas_list: 拆分后的增广文法产生式，formulas_list[0] 为 S'->S
+    """
+    if not conflicts:
+        return conflicts
+    search = Counterexamples(formulas_list[1:])
+    prefixes = viable_prefixes(all_DFA)
+    for i, conflict in enumerate(conflicts):
+        prefix = prefixes.get(conflict["state"], "")
+        search.explain(conflict, prefix, search.terminal_string(prefix), i < max_searches)
+    return conflicts
+
+
+def explain_ll1_conflicts(conflicts, S, formulas_dict, max_searches=MAX_SEARCHES):
+    """为 LL1 冲突加上反例，前缀为冲突的非终结符最先成为最左非终结符的句型（到该非终结符为止）"""
+    if not conflicts:
+        return conflicts
+    search = Counterexamples([left + "->" + "|".join(right) for left, right in formulas_dict.items()])
+    for i, conflict in enumerate(conflicts):
+        vn = conflict["nonterminal"]
+        path = search.find_form(S, lambda f: f[search.split(f):][:1] == vn, budget=search.max_nodes)
+        if path is None:  # 界限内找不到
+            search.explain(conflict, vn, None)
+            continue
+        example = path[-1][:search.split(path[-1])]  # 最左非终结符之前都是终结符
+        search.explain(conflict, example + vn, example, i < max_searches)
+    return conflicts
@@ -0,0 +1,177 @@
+"""
+文法的中间表示（文法变换、无用符号删除等在此表示上进行，结果再转回产生式串）
+    rules: 左部 -> 候选式列表（按输入顺序），候选式为符号元组，ε候选式为空元组
+    符号可以由多个字符组成（如变换时新增的 A'），首字符为大写字母的是非终结符
+"""
+EPSILON = 'ε'
+
+
+def is_nonterminal(symbol):
+    return symbol[:1].isupper()
+
+
+class GrammarIR:
+    def __init__(self, S, rules):
+        self.S = S  # 开始符
+        self.rules = rules  # { 左部: [(符号, ...), ...] }
+
+    @classmethod
+    def parse(cls, grammar_list):
+        """由产生式串 ["S->aA|b", ...] 构造（单字符符号，与各分析器的预处理一致）"""
+        rules = {}
+        for pro in grammar_list:
+            left, right = pro.split("->")
+            candidates = rules.setdefault(left, [])
+            for r in right.split("|"):
+                candidates.append(tuple(symbol for symbol in r if symbol != EPSILON))
+        return cls(grammar_list[0].split("->")[0], rules)
+
+    def copy(self):
+        return GrammarIR(self.S, {left: list(candidates) for left, candidates in self.rules.items()})
+
+    def symbols(self):
+        """文法中出现的所有符号"""
+        used = set(self.rules)
+        for candidates in self.rules.values():
+            for candidate in candidates:
+                used.update(candidate)
+        return used
+
+    @staticmethod
+    def candidate_str(candidate):
+        return "".join(candidate) if candidate else EPSILON
+
+    def to_productions(self):
+        """转回产生式串，每个左部一行： ["S->aA|b", ...]"""
+        return [left + "->" + "|".join(self.candidate_str(c) for c in candidates)
+                for left, candidates in self.rules.items() if candidates]
+
+    def single_char(self):
+        """所有符号是否都是单个字符（现有分析器按字符切分产生式，只能分析这样的文法）"""
+        return all(len(symbol) == 1 for symbol in self.symbols())
+
+    def productive(self):
+        """
+        能推出终结符串的非终结符：候选式用到的非终结符都可推出时，左部可推出（位集 + 工作表，线性时间）
+        未定义的非终结符不可推出
+        """
+        lefts = list(self.rules)
+        bit = {left: 1 << i for i, left in enumerate(lefts)}
+        never = 1 << len(lefts)  # 未定义的非终结符，永远不会置位
+        candidates = []  # (左部, 用到的非终结符位集)
+        users = {left: [] for left in lefts}  # 非终结符 -> 用到它的候选式序号
+        for left, group in self.rules.items():
+            for candidate in group:
+                need = 0
+                for symbol in candidate:
+                    if is_nonterminal(symbol):
+                        need |= bit.get(symbol, never)
+                        if symbol in users:
+                            users[symbol].append(len(candidates))
+                candidates.append((left, need))
+        done = 0
+        work = []
+        for left, need in candidates:
+            if need == 0 and not done & bit[left]:
+                done |= bit[left]
+                work.append(left)
+        while work:
+            symbol = work.pop()
+            for k in users[symbol]:
+                left, need = candidates[k]
+                if not done & bit[left] and not need & ~done:
+                    done |= bit[left]
+                    work.append(left)
+        return {left for left in lefts if done & bit[left]}
+
+    def nullable(self):
+        """能推出ε的非终结符"""
+        result = set()
+        changed = True
+        while changed:
+            changed = False
+            for left, candidates in self.rules.items():
+                if left not in result and any(all(s in result for s in c) for c in candidates):
+                    result.add(left)
+                    changed = True
+        return result
+
+    def min_lengths(self):
+        """
+        各非终结符能推出的终结符串的最短长度（最短推导长度），推不出终结符串的非终结符不在结果中
+        逐轮松弛直到不再变化，每个非终结符的最短长度由一棵推导树确定，轮数不超过非终结符个数
+        """
+        lengths = {}
+        changed = True
+        while changed:
+            changed = False
+            for left, candidates in self.rules.items():
+                for c in candidates:
+                    if all(not is_nonterminal(s) or s in lengths for s in c):
+                        n = sum(lengths[s] if is_nonterminal(s) else 1 for s in c)
+                        if n < lengths.get(left, n + 1):
+                            lengths[left] = n
+                            changed = True
+        return lengths
+
+    def reachable(self):
+        """从开始符出发能到达的非终结符（广度优先，位集记录已访问）"""
+        bit = {left: 1 << i for i, left in enumerate(self.rules)}
+        if self.S not in bit:
+            return set()
+        seen = bit[self.S]
+        queue = [self.S]
+        for left in queue:  # 新到达的非终结符加在末尾
+            for candidate in self.rules[left]:
+                for symbol in candidate:
+                    b = bit.get(symbol, 0)
+                    if b and not seen & b:
+                        seen |= b
+                        queue.append(symbol)
+        return set(queue)
+
+
+def remove_useless(grammar_list):
+    """
+    删除无用符号：先删去推不出终结符串的非终结符及用到它们的候选式，再删去从开始符不可到达的非终结符
+    保持剩余产生式的行和候选式顺序（产生式序号尽量与原文法一致）
+
+    :return: (删除后的产生式串, 删除情况 {"unproductive": [...], "unreachable": [...],
+              "removedProductions": ["A->b", ...], "emptyLanguage": 开始符推不出终结符串时为True（此时不删除）})
+    """
+    ir = GrammarIR.parse(grammar_list)
+    productive = ir.productive()
+    undefined = [symbol for group in ir.rules.values() for c in group for symbol in c
+                 if is_nonterminal(symbol) and symbol not in ir.rules]
+    removed = {
+        "unproductive": [left for left in ir.rules if left not in productive] + list(dict.fromkeys(undefined)),
+        "unreachable": [],
+        "removedProductions": [],
+        "emptyLanguage": ir.S not in productive
+    }
+    if removed["emptyLanguage"]:
+        return list(grammar_list), removed
+
+    def useful(candidate):
+        return all(not is_nonterminal(symbol) or symbol in productive for symbol in candidate)
+
+    kept = GrammarIR(ir.S, {left: [c for c in group if useful(c)]
+                            for left, group in ir.rules.items() if left in productive})
+    reachable = kept.reachable()
+    removed["unreachable"] = [left for left in kept.rules if left not in reachable]
+
+    result = []
+    for pro in grammar_list:
+        left, right = pro.split("->")
+        keep = []
+        for r in right.split("|"):
+            if left in reachable and useful(tuple(symbol for symbol in r if symbol != EPSILON)):
+                keep.append(r)
+            else:
+                removed["removedProductions"].append(left + "->" + r)
+        if keep:
+            result.append(left + "->" + "|".join(keep))
+    first = next(i for i, pro in enumerate(result) if pro.split("->")[0] == ir.S)
+    if first:  # 开始符的第一行被整行删去时，把它剩下的第一行移到最前面，保持开始符不变
+        result.insert(0, result.pop(first))
+    return result, removed
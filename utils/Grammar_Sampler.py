@@ -0,0 +1,262 @@
+"""
+随机句子生成（出练习题、生成分析程序的测试/压测输入）
+    1. 在文法的中间表示上删去无用的候选式，把候选式拆成至多两个符号，再删去ε候选式和单一候选式（A->B），
+       语言不变（除ε外）；
+       此后每个候选式要么是单个终结符，要么每个符号都推出非空串，子结点推出的串一定比父结点短
+    2. 按长度从小到大用位集计算各非终结符能推出的串长集合 L[A]（位 n 为1表示能推出长为 n 的串），
+       以及每个候选式各后缀能推出的串长集合，同时保存按位反转的位集，判断拆分是否可行只需一次移位和按位与
+    3. 生成长为 n 的句子：在能推出长为 n 的候选式中随机选一个，依次为各符号随机选一个可行的长度；
+       每个 (非终结符, 长度) 保留 POOL_SIZE 个已生成的串，由短到长预先生成，组合时随机取用；
+       从根出发沿最长的子结点重新生成 FRESH_DEPTH 层，其余子结点取自池中。句子不是严格均匀分布的，但各候选式、各种拆分都会出现
+近似句子（near-miss）：对句子做一次替换/插入/删除一个终结符，可选用识别程序过滤掉仍然合法的串
+"""
+import itertools
+import random
+
+from utils.Grammar_IR import GrammarIR, is_nonterminal
+
+POOL_SIZE = 4  # 每个 (非终结符, 长度) 保留的已生成串个数
+FRESH_DEPTH = 32  # 生成句子时，深度小于该值的结点的最长子结点重新生成（不从池中取），保证句子的多样性
+
+MUTATIONS = ('replace', 'insert', 'delete')
+
+
+def _expand_nullable(candidate, nullable):
+    """候选式中可推空的非终结符各自保留或删去，得到所有非空的组合"""
+    options = [((s,), ()) if s in nullable else ((s,),) for s in candidate]
+    for choice in itertools.product(*options):
+        symbols = tuple(s for part in choice for s in part)
+        if symbols:
+            yield symbols
+
+
+def _binarize(rules):
+    """
+    超过两个符号的候选式拆成两个符号一组（X1 X2 X3 -> X1 N, N -> X2 X3），删去ε候选式时组合数不会指数增长
+    新增的非终结符名由左部、候选式序号和位置组成（含 #，不会与文法符号重名），只在生成过程中使用
+    """
+    result = {}
+    for left, candidates in rules.items():
+        result[left] = []
+        for k, c in enumerate(candidates):
+            head = left
+            while len(c) > 2:
+                rest = f"{left}#{k}.{len(c)}"
+                result.setdefault(head, []).append((c[0], rest))
+                head, c = rest, c[1:]
+            result.setdefault(head, []).append(c)
+    return result
+
+
+def normal_rules(ir):
+    """
+    删去无用的候选式、ε候选式和单一候选式，返回 {左部: [候选式, ...]}（不含ε的语言不变）
+    只能推出ε的非终结符不出现在结果中
+    """
+    productive = ir.productive()
+    rules = _binarize({left: [c for c in candidates if all(not is_nonterminal(s) or s in productive for s in c)]
+                       for left, candidates in ir.rules.items() if left in productive})
+    nullable = GrammarIR(ir.S, rules).nullable()
+    rules = {left: list(dict.fromkeys(e for c in candidates for e in _expand_nullable(c, nullable)))
+             for left, candidates in rules.items()}
+    units = {}  # A -> 经单一候选式可到达的非终结符（含自身）
+    for left in rules:
+        seen = [left]
+        for symbol in seen:
+            for c in rules[symbol]:
+                if len(c) == 1 and is_nonterminal(c[0]) and c[0] not in seen:
+                    seen.append(c[0])
+        units[left] = seen
+    rules = {left: list(dict.fromkeys(c for symbol in units[left] for c in rules[symbol]
+                                      if not (len(c) == 1 and is_nonterminal(c[0]))))
+             for left in rules}
+    productive = GrammarIR(ir.S, rules).productive()  # 只能推出ε的非终结符此时没有候选式
+    return {left: [c for c in candidates if all(not is_nonterminal(s) or s in productive for s in c)]
+            for left, candidates in rules.items() if left in productive}
+
+
+class SentenceSampler:
+    def __init__(self, grammar_list, max_length, seed=None):
+        """
+        :param grammar_list: 产生式串 ["S->aA|b", ...]
+        :param max_length: 生成句子的最大长度（串长集合计算到该长度）
+        :param seed: 随机数种子，相同种子生成相同的句子
+        """
+        self.ir = GrammarIR.parse(grammar_list)
+        self.S = self.ir.S
+        self.max_length = max_length
+        self.random = random.Random(seed)
+        self.min_lengths = self.ir.min_lengths()  # 各非终结符的最短推导长度
+        self.nullable = self.S in self.ir.nullable()
+        self.terminals = sorted(s for s in self.ir.symbols() if not is_nonterminal(s))
+        self.rules = normal_rules(self.ir)
+        self.lengths = {}  # 非终结符 -> 串长集合位集
+        self.reversed = {}  # 非终结符 -> 反转的串长集合位集（位 max_length - n 对应长度 n）
+        self.suffixes = {}  # (左部, 候选式序号, j) -> [后缀 j.. 的串长位集, 反转位集]，j >= 1 且后缀至少两个符号
+        self.pools = {}  # (非终结符, 长度) -> 已生成的串
+        self.warmed = 0  # 已预先生成到的长度
+        self.plans = {}  # 左部 -> [(候选式, 各符号是否非终结符, 各符号的串长位集, 各后缀的反转位集), ...]
+        self.feasible_plans = {}  # (左部, 长度) -> 能推出该长度的候选式的 plan
+        self.step1_lengths()
+        self.step2_plans()
+
+    def lengths_of(self, symbol):
+        return self.lengths[symbol] if is_nonterminal(symbol) else 2
+
+    def reversed_of(self, symbol):
+        return self.reversed[symbol] if is_nonterminal(symbol) else 1 << (self.max_length - 1)
+
+    def suffix_reversed(self, left, k, j):
+        """候选式后缀 j.. 的反转串长位集"""
+        c = self.rules[left][k]
+        if j == len(c) - 1:
+            return self.reversed_of(c[j])
+        return self.suffixes[(left, k, j)][1]
+
+    def split_lengths(self, left, k, j, n):
+        """长为 n 的串由后缀 j.. 推出时，符号 j 可以推出的长度（位集）"""
+        c = self.rules[left][k]
+        return self.lengths_of(c[j]) & (self.suffix_reversed(left, k, j + 1) >> (self.max_length - n))
+
+    def feasible(self, left, k, n):
+        c = self.rules[left][k]
+        if len(c) == 1:
+            return n == 1
+        return self.split_lengths(left, k, 0, n) != 0
+
+    def step1_lengths(self):
+        """按长度从小到大计算各非终结符、各候选式后缀的串长集合"""
+        for left in self.rules:
+            self.lengths[left] = 0
+            self.reversed[left] = 0
+            for k, c in enumerate(self.rules[left]):
+                for j in range(1, len(c) - 1):
+                    self.suffixes[(left, k, j)] = [0, 0]
+        top = self.max_length
+        for n in range(1, top + 1):
+            for left, candidates in self.rules.items():
+                if any(self.feasible(left, k, n) for k in range(len(candidates))):
+                    self.lengths[left] |= 1 << n
+                    self.reversed[left] |= 1 << (top - n)
+            for (left, k, j), suffix in self.suffixes.items():  # 后缀的串长只用到更短的长度，本轮最后更新
+                if self.split_lengths(left, k, j, n):
+                    suffix[0] |= 1 << n
+                    suffix[1] |= 1 << (top - n)
+
+    def can_derive(self, n):
+        """开始符能否推出长为 n 的句子"""
+        if n == 0:
+            return self.nullable
+        return 0 < n <= self.max_length and self.S in self.lengths and bool(self.lengths[self.S] >> n & 1)
+
+    def nearest_length(self, n):
+        """最接近 n 的句子长度（相同距离时取较长的），语言为空时为None"""
+        for d in range(self.max_length + 1):
+            for m in (n + d, n - d):
+                if self.can_derive(m):
+                    return m
+        return None
+
+    def pick(self, bits, n):
+        """在位集 bits 的 [1, n) 中随机选一个置位的长度"""
+        r = self.random.randint(1, n - 1)
+        x = bits >> r
+        if x:
+            return r + (x & -x).bit_length() - 1
+        return bits.bit_length() - 1
+
+    def step2_plans(self):
+        """串长集合确定后，为每个候选式预先取出各符号的串长位集和其后缀的反转位集，生成时不再查表"""
+        for left, candidates in self.rules.items():
+            self.plans[left] = [(c, tuple(is_nonterminal(s) for s in c),
+                                 tuple(self.lengths_of(s) for s in c[:-1]),
+                                 tuple(self.suffix_reversed(left, k, j) for j in range(1, len(c))))
+                                for k, c in enumerate(candidates)]
+
+    def choices(self, left, n):
+        """能推出长为 n 的串的候选式（缓存）"""
+        key = (left, n)
+        result = self.feasible_plans.get(key)
+        if result is None:
+            result = self.feasible_plans[key] = [self.plans[left][k] for k in range(len(self.rules[left]))
+                                                 if self.feasible(left, k, n)]
+        return result
+
+    def generate(self, left, n, depth=FRESH_DEPTH):
+        """生成 left 推出的一个长为 n 的串，最长的子结点在深度小于 FRESH_DEPTH 时重新生成，其余从池中随机取用"""
+        c, nts, lens, revs = self.random.choice(self.choices(left, n))
+        top = self.max_length
+        sizes = []
+        rest = n
+        for j in range(len(c) - 1):
+            size = self.pick(lens[j] & (revs[j] >> (top - rest)), rest)
+            sizes.append(size)
+            rest -= size
+        sizes.append(rest)
+        fresh = -1
+        if depth < FRESH_DEPTH:
+            for j in range(len(c)):
+                if nts[j] and (fresh < 0 or sizes[j] > sizes[fresh]):
+                    fresh = j
+        parts = []
+        for j, symbol in enumerate(c):
+            if not nts[j]:
+                parts.append(symbol)
+            elif j == fresh:
+                parts.append(self.generate(symbol, sizes[j], depth + 1))
+            else:
+                parts.append(self.random.choice(self.pools[(symbol, sizes[j])]))
+        return "".join(parts)
+
+    def warm(self, n):
+        """由短到长为长度小于 n 的 (非终结符, 长度) 生成串池"""
+        for m in range(self.warmed + 1, n):
+            for left in self.rules:
+                if self.lengths[left] >> m & 1:
+                    self.pools[(left, m)] = [self.generate(left, m) for _ in range(POOL_SIZE)]
+        self.warmed = max(self.warmed, n - 1)
+
+    def sentence(self, n):
+        """一个长为 n 的随机句子，推不出时为None"""
+        if not self.can_derive(n):
+            return None
+        if n == 0:
+            return ""
+        self.warm(n)
+        return self.generate(self.S, n, 0)
+
+    def sentences(self, n, count):
+        """count 个长为 n 的随机句子（可能重复）"""
+        if not self.can_derive(n):
+            return []
+        return [self.sentence(n) for _ in range(count)]
+
+    def mutate(self, sentence):
+        """对句子做一次随机的单个终结符替换/插入/删除"""
+        mutation = self.random.choice(MUTATIONS if sentence else ('insert',))
+        if mutation == 'replace' and len(self.terminals) > 1:
+            i = self.random.randrange(len(sentence))
+            t = self.random.choice([t for t in self.terminals if t != sentence[i]])
+            return sentence[:i] + t + sentence[i + 1:]
+        if mutation == 'delete':
+            i = self.random.randrange(len(sentence))
+            return sentence[:i] + sentence[i + 1:]
+        i = self.random.randint(0, len(sentence))
+        return sentence[:i] + self.random.choice(self.terminals) + sentence[i:]
+
+    def near_misses(self, sentences, count, accepts=None):
+        """
+        由句子变异得到 count 个不同的近似句子（可能不足 count 个）
+        :param accepts: 识别程序 accepts(串) -> 是否是句子，给出时去掉仍然合法的串
+        """
+        result = {}
+        if not sentences or not self.terminals:
+            return []
+        valid = set(sentences)
+        for _ in range(count * 10):
+            if len(result) >= count:
+                break
+            s = self.mutate(self.random.choice(sentences))
+            if s not in result and s not in valid and (accepts is None or not accepts(s)):
+                result[s] = True
+        return list(result)
@@ -0,0 +1,191 @@
+"""
+按单词（token）书写的文法
+    每行一个左部，符号之间用空白分隔，候选式之间用 | 分隔，ε 或空候选式表示空串：
+        Stmt -> "while" "(" Expr ")" Stmt | id "=" Expr ";"
+        Expr -> Expr "+" Term | Term
+    出现在左部的名字为非终结符；其余不加引号的名字为单词类别（由词法分析的正则表达式定义，如 id、num），
+    加引号的为字面终结符（关键字、运算符，词法分析时按原文匹配）
+
+各分析器按字符切分产生式（大写字母为非终结符），这里为每个符号分配一个字符（编码），
+文法转为单字符产生式后所有分析器、分析总控程序不需要修改，输入串的单词序列也编码为字符串（每个字符为一个单词的编号）：
+    非终结符：名字本身是单个大写字母时不变，否则使用非 ASCII 的大写字母（希腊、西里尔字母等）
+    终结符：名字本身是单个非大写、非保留字符时不变，否则使用 Unicode 私用区字符（U+E000 起）
+分析结果中的编码字符再由符号表还原为名字
+"""
+import re
+
+from utils.Grammar_IR import EPSILON
+
+RESERVED = set("|->#'.ε·•@ \t\r\n\"")  # 分析器、结果中有特殊含义的字符，不作为符号本身使用
+
+TOKEN_PATTERN = re.compile(r"""\s*(?:("(?:[^"\\]|\\.)+"|'(?:[^'\\]|\\.)+')|([A-Za-z_][A-Za-z0-9_']*)|(ε)|(\|)|(\S))""")
+
+
+class TokenGrammarError(ValueError):
+    pass
+
+
+def _unquote(text):
+    return re.sub(r"\\(.)", r"\1", text[1:-1])
+
+
+def nonterminal_codes():
+    """非终结符可用的编码（非 ASCII 的大写字母）"""
+    for c in range(0x0391, 0x2C00):
+        ch = chr(c)
+        if ch.isupper() and ch not in RESERVED:
+            yield ch
+
+
+def terminal_codes():
+    """终结符可用的编码（私用区字符）"""
+    for c in range(0xE000, 0xF900):
+        yield chr(c)
+
+
+def split_rule(line):
+    """一行 -> (左部, [[(类型, 名字), ...], ...])，类型为 name（名字）或 literal（字面终结符）"""
+    if "->" not in line:
+        raise TokenGrammarError(f"产生式缺少 ->：{line}")
+    left, right = line.split("->", 1)
+    left = left.strip()
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_']*", left):
+        raise TokenGrammarError(f"左部必须是一个名字：{line}")
+    candidates = [[]]
+    pos = 0
+    right = right.rstrip()
+    while pos < len(right):
+        m = TOKEN_PATTERN.match(right, pos)
+        pos = m.end()
+        quoted, name, epsilon, bar, other = m.groups()
+        if quoted:
+            candidates[-1].append(('literal', _unquote(quoted)))
+        elif name:
+            candidates[-1].append(('name', name))
+        elif bar:
+            candidates.append([])
+        elif other:
+            raise TokenGrammarError(f"无法识别的符号 {other}（字面终结符需要加引号）：{line}")
+    return left, candidates
+
+
+class SymbolTable:
+    """符号名字 <-> 编码字符"""
+
+    def __init__(self):
+        self.nonterminals = {}  # 名字 -> 编码
+        self.terminals = {}  # 名字 -> 编码（字面终结符的名字为原文）
+        self.literals = []  # 字面终结符（按出现顺序）
+        self.token_names = []  # 单词类别名（不加引号的终结符，按出现顺序）
+        self.names = {}  # 编码 -> 名字
+        self._nonterminal_codes = nonterminal_codes()
+        self._terminal_codes = terminal_codes()
+
+    def _allocate(self, name, nonterminal):
+        used = self.names
+        if nonterminal:
+            if len(name) == 1 and name.isupper() and name.isascii() and name not in used:
+                return name
+            codes = self._nonterminal_codes
+        else:
+            if len(name) == 1 and not name.isupper() and name not in RESERVED and name not in used:
+                return name
+            codes = self._terminal_codes
+        for code in codes:
+            if code not in used:
+                return code
+        raise TokenGrammarError("文法符号过多，无法编码")
+
+    def add(self, name, nonterminal):
+        table = self.nonterminals if nonterminal else self.terminals
+        if name not in table:
+            code = table[name] = self._allocate(name, nonterminal)
+            self.names[code] = name
+        return table[name]
+
+    def decode_text(self, text):
+        """把字符串中的编码字符还原为名字，相邻两个符号中有多字符名字时用空格隔开"""
+        names = self.names
+        if not any(names.get(ch, ch) != ch for ch in text):
+            return text
+        parts = []
+        prev = None
+        for ch in text:
+            name = names.get(ch)
+            if name is None:
+                parts.append(ch)
+                prev = None
+                continue
+            if prev is not None and (len(prev) > 1 or len(name) > 1):
+                parts.append(' ')
+            parts.append(name)
+            prev = name
+        return "".join(parts)
+
+    def decode(self, value):
+        """递归还原结果（字典的键和值、列表、字符串）中的编码字符"""
+        if isinstance(value, str):
+            return self.decode_text(value)
+        if isinstance(value, dict):
+            return {self.decode(k) if isinstance(k, str) else k: self.decode(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.decode(v) for v in value]
+        if isinstance(value, (set, frozenset)):
+            return [self.decode(v) for v in value]
+        return value
+
+    def to_dict(self):
+        return {"nonterminals": dict(self.nonterminals), "terminals": dict(self.terminals)}
+
+
+class TokenGrammar:
+    def __init__(self, lines):
+        """:param lines: 按单词书写的产生式 ["Expr -> Expr \\"+\\" Term | Term", ...]"""
+        rules = []
+        for line in lines:
+            if line and line.strip():
+                rules.append(split_rule(line.strip()))
+        if not rules:
+            raise TokenGrammarError("文法为空")
+        self.table = SymbolTable()
+        defined = {left for left, _ in rules}
+        for left, _ in rules:
+            self.table.add(left, True)
+        for _, candidates in rules:
+            for candidate in candidates:
+                for kind, name in candidate:
+                    if kind == 'name' and name in defined:
+                        continue
+                    same, other = ((self.table.literals, self.table.token_names) if kind == 'literal'
+                                   else (self.table.token_names, self.table.literals))
+                    if name in other:
+                        raise TokenGrammarError(f"{name} 不能既是单词类别又是字面终结符")
+                    if name not in same:
+                        same.append(name)
+                    self.table.add(name, False)
+        self.rules = rules
+        self.S = rules[0][0]
+
+    def code(self, kind, name):
+        if kind == 'name' and name in self.table.nonterminals:
+            return self.table.nonterminals[name]
+        return self.table.terminals[name]
+
+    def productions(self):
+        """编码后的单字符产生式串 ["S->aA|b", ...]（同一左部的多行合并），可直接用于各分析器"""
+        merged = {}
+        for left, candidates in self.rules:
+            merged.setdefault(self.table.nonterminals[left], []).extend(candidates)
+        return [left + "->" + "|".join("".join(self.code(kind, name) for kind, name in c) or EPSILON
+                                       for c in candidates)
+                for left, candidates in merged.items()]
+
+    def display(self):
+        """便于阅读的产生式（符号之间加空格，字面终结符加引号）"""
+        def symbol(kind, name):
+            if kind == 'literal':
+                return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+            return name
+        return [left + " -> " + " | ".join(" ".join(symbol(kind, name) for kind, name in c) or EPSILON
+                                          for c in candidates)
+                for left, candidates in self.rules]
@@ -0,0 +1,235 @@
+"""
+文法变换：消除左递归、提取左公因子
+    消除左递归：Paull 算法，只在左递归涉及的非终结符（左角图中有环的强连通分量）内部代入，代入用工作栈展开；
+               左角图包括能推出ε的前缀之后的符号，这种左递归代入后仍然存在时报错（需要先消除ε产生式）
+    提取左公因子：每个非终结符的候选式建一棵前缀树，沿只有一个分支的路径取最长公因子，一次遍历完成
+新增的非终结符命名为 A'、A''……（naming="letter" 时先用未使用的大写字母，用完再加'），不会用完
+"""
+import os
+
+from utils.Class_SLR1_GrammarAnalysis import scc_order
+from utils.Grammar_IR import GrammarIR
+
+# 支持的变换（按给出的顺序执行）
+LEFT_RECURSION = 'left_recursion'
+LEFT_FACTORING = 'left_factoring'
+OPERATIONS = (LEFT_RECURSION, LEFT_FACTORING)
+
+# 新增非终结符的命名方式
+NAMING_PRIME = 'prime'  # A'、A''
+NAMING_LETTER = 'letter'  # 未使用的大写字母（结果仍为单字符文法，可以直接交给各分析器）
+NAMINGS = (NAMING_PRIME, NAMING_LETTER)
+
+# 消除左递归时每个非终结符代入产生的符号总数上限（左角可推出ε时代入可能不终止）
+MAX_EXPANSION_SYMBOLS = int(os.environ.get('TRANSFORM_MAX_SYMBOLS', 200000))
+
+
+class TransformError(ValueError):
+    pass
+
+
+class GrammarTransformer:
+    def __init__(self, grammar_list, naming=NAMING_PRIME):
+        self.ir = GrammarIR.parse(grammar_list)
+        self.naming = naming
+        self.used = self.ir.symbols()  # 已使用的符号，新增非终结符不能与之重名
+        self.free_letters = [chr(c) for c in range(ord('Z'), ord('A') - 1, -1) if chr(c) not in self.used]
+        self.new_symbols = []  # 新增的非终结符
+        self.steps = []  # 变换过程 [{"operation": 变换, "symbol": 非终结符, "message": 说明, "productions": 变换后该部分产生式}]
+
+    def fresh_symbol(self, base):
+        """为 base 生成一个未使用的新非终结符"""
+        if self.naming == NAMING_LETTER:
+            while self.free_letters:
+                symbol = self.free_letters.pop()
+                if symbol not in self.used:
+                    break
+            else:
+                symbol = None
+            if symbol is not None:
+                self.used.add(symbol)
+                self.new_symbols.append(symbol)
+                return symbol
+        symbol = base + "'"
+        while symbol in self.used:
+            symbol += "'"
+        self.used.add(symbol)
+        self.new_symbols.append(symbol)
+        return symbol
+
+    def log(self, operation, symbol, message, lefts):
+        step = {
+            "operation": operation,
+            "symbol": symbol,
+            "message": message,
+            "productions": self.productions_of(lefts)
+        }
+        self.steps.append(step)
+        return step
+
+    def productions_of(self, lefts):
+        rules = self.ir.rules
+        return [left + "->" + "|".join(GrammarIR.candidate_str(c) for c in rules[left])
+                for left in lefts if rules.get(left)]
+
+    # =============消除左递归=============
+    def left_corner_deps(self):
+        """左角图：A -> 它的候选式中前面都能推出ε的非终结符（含首符号），A->BAα 且 B 能推出ε时 A 也是左递归的"""
+        rules = self.ir.rules
+        nullable = self.ir.nullable()
+        deps = {}
+        for left, candidates in rules.items():
+            corners = []
+            for candidate in candidates:
+                for symbol in candidate:
+                    if symbol not in rules:
+                        break
+                    corners.append(symbol)
+                    if symbol not in nullable:
+                        break
+            deps[left] = list(dict.fromkeys(corners))
+        return deps
+
+    def check_hidden_left_recursion(self):
+        """代入只处理首符号，经过可推出ε的前缀的左递归仍然存在时报错（A->A… 无法消除的已记录在变换过程中）"""
+        rules = self.ir.rules
+        deps = self.left_corner_deps()
+        for comp in scc_order(list(rules), deps):
+            if len(comp) == 1 and (comp[0] not in deps[comp[0]]
+                                   or any(c[:1] == (comp[0],) for c in rules[comp[0]])):
+                continue
+            raise TransformError(f"{', '.join(comp)} 的左递归经过能推出ε的前缀（如 A->BAα 中 B 能推出ε），"
+                                 f"只代入首符号无法消除，请先消除ε产生式")
+
+    def eliminate_direct(self, left):
+        """消除 left 的直接左递归： A->Aα|β  =>  A->βA'， A'->αA'|ε"""
+        rules = self.ir.rules
+        recursive = []
+        others = []
+        for candidate in rules[left]:
+            if candidate[:1] == (left,):
+                if len(candidate) > 1:  # A->A 无意义，直接去掉
+                    recursive.append(candidate[1:])
+            else:
+                others.append(candidate)
+        if not recursive and not others:  # 只有 A->A，去掉后 A 没有产生式（若为开始符号，文法会变成以别的符号开始）
+            self.log(LEFT_RECURSION, left, f"{left} 只有产生式 {left}->{left}，推不出终结符串，保持原样", [left])
+            return
+        if len(recursive) + len(others) < len(rules[left]):
+            self.log(LEFT_RECURSION, left, f"去掉无意义的产生式 {left}->{left}", [left])
+        if not recursive:
+            rules[left] = others
+            return
+        if not others:  # 所有候选式都左递归，推不出终结符串，保持原样（可用无用符号删除去掉）
+            rules[left] = [(left,) + alpha for alpha in recursive]
+            self.log(LEFT_RECURSION, left, f"{left} 的候选式都是左递归的，推不出终结符串，无法消除", [left])
+            return
+        new_left = self.fresh_symbol(left)
+        rules[left] = [beta + (new_left,) for beta in others]
+        rules[new_left] = [alpha + (new_left,) for alpha in recursive] + [()]
+        self.log(LEFT_RECURSION, left, f"消除 {left} 的直接左递归，新增 {new_left}", [left, new_left])
+
+    def eliminate_left_recursion(self):
+        rules = self.ir.rules
+        deps = self.left_corner_deps()
+        grammar_order = {left: i for i, left in enumerate(rules)}
+        for comp in scc_order(list(rules), deps):
+            if len(comp) == 1 and comp[0] not in deps[comp[0]]:  # 不涉及左递归
+                continue
+            members = sorted(comp, key=grammar_order.get)  # 分量内按文法中的顺序排列 A1, A2, ...
+            order = {left: i for i, left in enumerate(members)}
+            for i, left in enumerate(members):
+                # 把 Ai->Ajγ (j<i) 中的 Aj 代入为它（已无左递归）的候选式，代入结果仍以 Ak (k<i) 开头时继续代入
+                # 代入过的候选式不再入栈；左角可推出ε时（如 S->ASB, A->ε）候选式会越代入越长，超过上限时报错
+                result = []
+                seen = set()
+                pushed = set(rules[left])
+                substituted = []
+                generated = 0
+                stack = list(reversed(rules[left]))
+                while stack:
+                    candidate = stack.pop()
+                    head = candidate[0] if candidate else None
+                    if head in order and order[head] < i:
+                        new_candidates = [c + candidate[1:] for c in rules[head]]
+                        generated += sum(len(c) for c in new_candidates)
+                        if generated > MAX_EXPANSION_SYMBOLS:
+                            raise TransformError(f"消除 {left} 的左递归时代入产生的符号数超过上限 {MAX_EXPANSION_SYMBOLS}，"
+                                                 f"文法的左角可能推出ε（如 A->BC 中 B 能推出ε），请先消除ε产生式")
+                        stack.extend(reversed([c for c in new_candidates if c not in pushed]))
+                        pushed.update(new_candidates)
+                        if head not in substituted:
+                            substituted.append(head)
+                    elif candidate not in seen:
+                        seen.add(candidate)
+                        result.append(candidate)
+                rules[left] = result
+                if substituted:
+                    self.log(LEFT_RECURSION, left, f"将 {', '.join(substituted)} 的候选式代入 {left}，间接左递归变为直接左递归",
+                             [left])
+                self.eliminate_direct(left)
+        self.check_hidden_left_recursion()
+
+    # =============提取左公因子=============
+    def factor_node(self, left, node):
+        """
+        由前缀树结点生成候选式（结点下的候选式都已去掉到该结点为止的公共前缀）
+        :param node: [子结点 { 符号: 结点 }, 经过该结点的候选式数, 是否有候选式在此结束]
+        """
+        candidates = []
+        for symbol, child in node[0].items():
+            prefix = [symbol]
+            while child[1] > 1 and not child[2] and len(child[0]) == 1:  # 只有一个分支，继续延长公因子
+                (symbol, child), = child[0].items()
+                prefix.append(symbol)
+            if child[1] == 1:  # 只剩一个候选式，不需要提取
+                while child[0]:
+                    (symbol, child), = child[0].items()
+                    prefix.append(symbol)
+                candidates.append(tuple(prefix))
+                continue
+            new_left = self.fresh_symbol(left)
+            candidates.append(tuple(prefix) + (new_left,))
+            self.ir.rules[new_left] = []  # 先占位，新增的非终结符按提取的先后排列
+            step = self.log(LEFT_FACTORING, left, f"提取 {left} 的左公因子 {''.join(prefix)}，新增 {new_left}", [])
+            self.ir.rules[new_left] = self.factor_node(new_left, child)
+            step["productions"] = self.productions_of([new_left])
+        if node[2]:  # 有候选式在此结束，剩余部分为ε
+            candidates.append(())
+        return candidates
+
+    def left_factor(self):
+        rules = self.ir.rules
+        for left in list(rules):
+            candidates = list(dict.fromkeys(rules[left]))  # 去掉重复的候选式
+            root = [{}, 0, False]
+            for candidate in candidates:  # 建前缀树
+                node = root
+                node[1] += 1
+                for symbol in candidate:
+                    node = node[0].setdefault(symbol, [{}, 0, False])
+                    node[1] += 1
+                node[2] = True
+            if all(child[1] == 1 for child in root[0].values()):  # 各候选式首符号都不同，不需要提取
+                if len(candidates) < len(rules[left]):
+                    rules[left] = candidates
+                    self.log(LEFT_FACTORING, left, f"去掉 {left} 重复的候选式", [left])
+                continue
+            rules[left] = self.factor_node(left, root)
+            self.log(LEFT_FACTORING, left, f"{left} 提取左公因子后的产生式", [left])
+
+    def transform(self, operations=OPERATIONS):
+        for operation in operations:
+            if operation == LEFT_RECURSION:
+                self.eliminate_left_recursion()
+            elif operation == LEFT_FACTORING:
+                self.left_factor()
+        return self.ir
+
+    def result(self):
+        return {
+            "productions": self.ir.to_productions(),
+            "newSymbols": self.new_symbols,
+            "steps": self.steps,
+            "singleChar": self.ir.single_char()  # 是否可以直接交给各分析器
+        }
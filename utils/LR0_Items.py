@@ -0,0 +1,169 @@
+"""
+LR(0)项目集规范族（LR0、SLR1共用，LALR(1)按它的转移传播向前看符号）
+项目集的闭包只由核心项目（点不在最左边的项目，以及初始项目 S'->.S）决定，按核心项目缓存闭包；
+文法修改后，点后面的非终结符的产生式都没有改动的闭包可以直接沿用
+"""
+from collections import defaultdict
+
+# 同一文法的 LR0、SLR1 分析器可以共用的属性（多算法统一分析时由 SLR1.prepare() 计算一次）
+SHARED_FIELDS = ('S', 'Vn', 'Vt', 'formulas_list', 'productions', 'dot_items', 'collection', 'all_DFA')
+
+
+def changed_lefts(old_formulas_list, new_formulas_list):
+    """两版（拆分后的）产生式中，产生式（含顺序）有变化的左部"""
+    old_pros = defaultdict(list)
+    new_pros = defaultdict(list)
+    for pro in old_formulas_list:
+        old_pros[pro.split("->")[0]].append(pro)
+    for pro in new_formulas_list:
+        new_pros[pro.split("->")[0]].append(pro)
+    return {left for left in set(old_pros) | set(new_pros) if old_pros.get(left) != new_pros.get(left)}
+
+
+class LR0Collection:
+    """
+    LR(0)项目集规范族
+    closures: 核心项目元组 -> 闭包（见 closure()）
+    states:   闭包项目集合 -> 状态号
+    """
+
+    def __init__(self, dot_items, Vn, Vt, base=None, changed=None):
+        """
+        :param dot_items: 所有项目（带点），dot_items[0] 为 S'->.S
+        :param base: 修改前文法的 LR0Collection，给出时沿用其中未受影响的闭包
+        :param changed: 产生式有变化的左部（见 changed_lefts）
+        """
+        self.dot_items = dot_items
+        self.Vn = list(Vn)
+        self.Vt = list(Vt)
+        self.vn_set = set(Vn)
+        self.start_items = defaultdict(list)  # 非终结符 -> 它的所有 A->.xxx 项目
+        for dot_p in dot_items:
+            ind = dot_p.find("->")  # 返回-的下标
+            if dot_p[ind + 2] == "." and dot_p[1] != "'":  # 点在最左边 且不为增广符
+                if dot_p not in self.start_items[dot_p[0]]:
+                    self.start_items[dot_p[0]].append(dot_p)
+        self.closures = {}
+        self.states = {}
+        self.reused = 0  # 沿用修改前的闭包数
+        self.inherited = set()  # 从修改前沿用、尚未用到的核心项目
+        if base is not None:
+            dirty = {left[0] for left in changed or ()}  # 闭包按左部首字符展开
+            self.closures = {kernel: value for kernel, value in base.closures.items()
+                             if not value[1] & dirty}
+            self.inherited = set(self.closures)
+
+    def closure(self, kernel):
+        """
+        核心项目的闭包
+        :return: (闭包项目元组（顺序与逐轮扩充的结果一致）, 点后面出现过的符号, 项目集合, ((符号, 跳转后的核心项目), ...))
+        """
+        cached = self.closures.get(kernel)
+        if cached is not None:
+            if kernel in self.inherited:
+                self.inherited.discard(kernel)
+                self.reused += 1
+            return cached
+        items = list(kernel)
+        seen = set(items)
+        after_dot = set()
+        for pro in items:  # 新加入的项目在列表末尾，会被继续展开
+            dot_right = pro[pro.find(".") + 1:]
+            if dot_right == "" or dot_right[0] in after_dot:
+                continue
+            after_dot.add(dot_right[0])
+            if dot_right[0] in self.vn_set:  # .后面为非终结符， 加入它的Vn->.xxxx
+                for dot_p in self.start_items[dot_right[0]]:
+                    if dot_p not in seen:
+                        seen.add(dot_p)
+                        items.append(dot_p)
+        moves = defaultdict(list)  # 符号 -> 用它跳转后的核心项目（右移一位）
+        for pro in items:
+            ind = pro.find(".")
+            if ind + 1 < len(pro):  # 非归约/接受项目
+                moves[pro[ind + 1]].append(pro[:ind] + pro[ind + 1] + "." + pro[ind + 2:])
+        self.closures[kernel] = (tuple(items), frozenset(after_dot), frozenset(seen),
+                                 tuple((v, tuple(k)) for v, k in moves.items()))
+        return self.closures[kernel]
+
+    def build(self, dfa_cls):
+        """
+        构造项目集规范族：状态按广度优先的发现顺序编号，每个状态按 Vn + Vt 的顺序求转移
+        :param dfa_cls: 状态类，dfa_cls(id_, pros_, next_ids_)
+        :return: 状态列表
+        """
+        kernel0 = (self.dot_items[0],)
+        used = {kernel0}  # 本文法用到的核心项目
+        items, _, key, moves = self.closure(kernel0)
+        all_DFA = [dfa_cls(0, list(items), {})]
+        self.states = {key: 0}
+        all_moves = [moves]
+        v_order = {v: i for i, v in enumerate(self.Vn + self.Vt)}  # 按 Vn + Vt 的顺序跳转
+        i = 0
+        while i < len(all_DFA):
+            dfa = all_DFA[i]
+            for v, kernel in sorted((m for m in all_moves[i] if m[0] in v_order), key=lambda m: v_order[m[0]]):
+                used.add(kernel)
+                items, _, key, moves = self.closure(kernel)
+                to_id = self.states.get(key)
+                if to_id is None:  # 不存在，添加新状态
+                    to_id = len(all_DFA)
+                    self.states[key] = to_id
+                    all_DFA.append(dfa_cls(to_id, list(items), {}))
+                    all_moves.append(moves)
+                dfa.next_ids_[v] = to_id
+            i += 1
+        self.inherited = set()
+        self.closures = {kernel: self.closures[kernel] for kernel in used}  # 丢掉修改前文法才用到的闭包
+        return all_DFA
+
+    def reusable_rows(self, all_DFA, productions, base, follow=None):
+        """
+        分析表中可以从修改前的分析器直接复制的行：新旧状态的项目（含顺序）、转移相同，
+        项目所属产生式的序号相同（SLR1还要求这些产生式左部的follow集相同）
+        :param base: 修改前文法的分析器（LR0/SLR1）
+        :param follow: SLR1的follow集，LR0为None
+        :return: {新状态号: 旧状态号}
+        """
+        if base.table is None or base.Vt != self.Vt or base.Vn != self.Vn:  # 表的列不同
+            return {}
+        rows = {}
+        for dfa in all_DFA:
+            old_id = base.collection.states.get(frozenset(dfa.pros_))
+            if old_id is None:
+                continue
+            old_dfa = base.all_DFA[old_id]
+            if old_dfa.pros_ != dfa.pros_ or old_dfa.next_ids_ != dfa.next_ids_:  # 项目顺序也影响填表
+                continue
+            for pro in dfa.pros_:  # 不只看归约项目：无转移的状态按第一个项目归约
+                p = productions.item_pro(pro)
+                if p != base.productions.item_pro(pro):
+                    break
+                left = productions.left[p]
+                if follow is not None and follow.get(left) != base.follow.get(left):
+                    break
+            else:
+                rows[dfa.id_] = old_id
+        return rows
+
+
+def same_state(old_all_DFA, dfa):
+    """修改前的项目集族中同一编号的状态，项目和转移（含顺序）是否都相同"""
+    if dfa.id_ >= len(old_all_DFA):
+        return False
+    old_dfa = old_all_DFA[dfa.id_]
+    return old_dfa.pros_ == dfa.pros_ and list(old_dfa.next_ids_.items()) == list(dfa.next_ids_.items())
+
+
+def source_spans(source, body, body_spans):
+    """
+    graphviz 语句在DOT源码中的字符区间
+    :param source: Digraph.source（头部 + body + "}\\n"）
+    :param body: Digraph.body
+    :param body_spans: 每个状态的语句在 body 中的下标区间
+    :return: 每个状态的语句在 source 中的字符区间
+    """
+    offsets = [len(source) - len("}\n") - sum(len(line) for line in body)]
+    for line in body:
+        offsets.append(offsets[-1] + len(line))
+    return [(offsets[start], offsets[end]) for start, end in body_spans]
@@ -0,0 +1,270 @@
+import numpy as np
+
+from utils.Parse_Trace import DEFAULT_TRACE_MODE, TraceRecorder
+from utils.Parse_Tree import ParseTree
+
+ACC = int(np.iinfo(np.int32).max)  # 接受
+ERROR = 0  # 出错（空白格）
+NO_GOTO = -1  # GOTO表空白格
+
+COMPRESS_THRESHOLD = 64 * 1024  # ACTION+GOTO 表格数超过该值时做行位移压缩
+
+
+def comb_compress(matrix, empty):
+    """
+    行位移（comb-vector）压缩：把每一行的非空格子平移base[row]后叠放到一维数组中
+    :param matrix: 二维表
+    :param empty: 空白格的值
+    :return:
+        base: 每一行的位移
+        check: 每个格子所属的行号（-1为空）
+        value: 每个格子的值
+    """
+    n_rows, n_cols = matrix.shape
+    base = np.zeros(n_rows, dtype=np.int32)
+    size = n_rows * n_cols  # 最坏情况下的长度
+    check = np.full(size, -1, dtype=np.int32)
+    value = np.full(size, empty, dtype=np.int32)
+    occupied = np.zeros(size + n_cols, dtype=bool)
+    used = 0  # 已用长度
+    rows_cols = [np.nonzero(matrix[row] != empty)[0] for row in range(n_rows)]
+    # 先放非空格子多的行，更容易填满空隙
+    for row in sorted(range(n_rows), key=lambda r: -len(rows_cols[r])):
+        cols = rows_cols[row]
+        if len(cols) == 0:
+            continue
+        # 对所有候选位移d同时判断 d+c 是否都空闲，取最小的d
+        conflict = np.zeros(used + 1, dtype=bool)
+        for c in cols:
+            conflict |= occupied[c:c + used + 1]
+        d = int(np.argmin(conflict))
+        slots = d + cols
+        occupied[slots] = True
+        check[slots] = row
+        value[slots] = matrix[row, cols]
+        base[row] = d
+        used = max(used, int(slots[-1]) + 1)
+    return base, check[:used].copy(), value[:used].copy()
+
+
+class Productions:
+    """
+    产生式元数据，文法载入时计算一次，建表、冲突检测、分析总控程序共用
+        display[p]: 展示串 "A->ab"
+        left[p]:    左部符号
+        lhs_id[p]:  左部在Vn中的序号（即GOTO表的列号）
+        rhs_len[p]: 右部长度（ε产生式为0）
+        index:      产生式串（或去掉.后的归约项目串）-> 序号，取首次出现，代替 formulas_list.index
+    """
+
+    def __init__(self, formulas_list, Vn):
+        n_index = {v: i for i, v in enumerate(Vn)}
+        self.display = list(formulas_list)
+        self.left = []
+        self.lhs_id = []
+        self.rhs_len = []
+        self.index = {}
+        for idx, pro in enumerate(formulas_list):
+            pro_left, pro_right = pro.split("->")
+            self.left.append(pro_left)
+            self.lhs_id.append(n_index[pro_left])
+            self.rhs_len.append(len(pro_right) if pro_right != 'ε' else 0)
+            self.index.setdefault(pro, idx)
+            if pro_right == 'ε':  # A->ε 的归约项目为 A->. ，去掉.后为 A->
+                self.index.setdefault(pro_left + "->", idx)
+
+    def __len__(self):
+        return len(self.display)
+
+    def item_pro(self, item):  # 归约项目 "A->ab." -> 产生式序号
+        return self.index[item.replace(".", "")]
+
+
+class LRTable:
+    """
+    整数形式的LR分析表
+    ACTION[state, 终结符列]: 移进 -> +状态号， 归约 -> -产生式序号， 接受 -> ACC， 出错 -> 0
+    GOTO[state, 非终结符列]: 状态号， 空白 -> -1
+    "s5"/"r3"/"acc" 形式的字典只在输出JSON时由 action_dict()/goto_dict() 生成
+    """
+
+    def __init__(self, n_states, Vt, Vn):
+        self.terminals = list(Vt) + ['#']  # ACTION表的列
+        self.nonterminals = list(Vn)  # GOTO表的列
+        self.t_index = {t: i for i, t in enumerate(self.terminals)}
+        self.n_index = {v: i for i, v in enumerate(self.nonterminals)}
+        self.n_states = n_states
+        self.action = np.zeros((n_states, len(self.terminals)), dtype=np.int32)
+        self.goto = np.full((n_states, len(self.nonterminals)), NO_GOTO, dtype=np.int32)
+        self.compressed = False
+
+    def set_shift(self, state, vt, to_state):
+        self.action[state, self.t_index[vt]] = to_state
+
+    def set_reduce(self, state, vt, pro_idx):
+        self.action[state, self.t_index[vt]] = -pro_idx
+
+    def set_accept(self, state):
+        self.action[state, self.t_index['#']] = ACC
+
+    def set_goto(self, state, vn, to_state):
+        self.goto[state, self.n_index[vn]] = to_state
+
+    def copy_row(self, state, other, other_state):
+        """从列相同的另一张表（可能已压缩）复制一行ACTION/GOTO"""
+        if not other.compressed:
+            self.action[state] = other.action[other_state]
+            self.goto[state] = other.goto[other_state]
+            return
+        for col in range(len(self.terminals)):
+            self.action[state, col] = other.action_at(other_state, col)
+        for col in range(len(self.nonterminals)):
+            self.goto[state, col] = other.goto_at(other_state, col)
+
+    def compress(self):
+        """对ACTION、GOTO表做行位移压缩，之后丢弃稠密矩阵"""
+        if self.compressed:
+            return
+        self.action_base, self.action_check, self.action_value = comb_compress(self.action, ERROR)
+        self.goto_base, self.goto_check, self.goto_value = comb_compress(self.goto, NO_GOTO)
+        self.action = None
+        self.goto = None
+        self.compressed = True
+
+    def action_at(self, state, col):  # 查ACTION表，col为终结符列号
+        if not self.compressed:
+            return self.action.item(state, col)
+        i = self.action_base.item(state) + col
+        if i < len(self.action_check) and self.action_check.item(i) == state:
+            return self.action_value.item(i)
+        return ERROR
+
+    def goto_at(self, state, col):  # 查GOTO表，col为非终结符列号
+        if not self.compressed:
+            return self.goto.item(state, col)
+        i = self.goto_base.item(state) + col
+        if i < len(self.goto_check) and self.goto_check.item(i) == state:
+            return self.goto_value.item(i)
+        return NO_GOTO
+
+    @staticmethod
+    def action_str(action):  # 整数动作 -> "s5"/"r3"/"acc"
+        if action == ACC:
+            return "acc"
+        if action > 0:
+            return "s" + str(action)
+        return "r" + str(-action)
+
+    def action_dict(self):
+        """字典形式的ACTION表（仅用于JSON输出）: {(state, vt): "s5"/"r3"/"acc"}"""
+        actions = {}
+        for state in range(self.n_states):
+            for col, vt in enumerate(self.terminals):
+                action = self.action_at(state, col)
+                if action != ERROR:
+                    actions[(state, vt)] = self.action_str(action)
+        return actions
+
+    def goto_dict(self):
+        """字典形式的GOTO表（仅用于JSON输出）: {(state, vn): state}"""
+        gotos = {}
+        for state in range(self.n_states):
+            for col, vn in enumerate(self.nonterminals):
+                to_state = self.goto_at(state, col)
+                if to_state != NO_GOTO:
+                    gotos[(state, vn)] = to_state
+        return gotos
+
+    def maybe_compress(self):
+        """表格较大时自动压缩"""
+        if self.n_states * (len(self.terminals) + len(self.nonterminals)) > COMPRESS_THRESHOLD:
+            self.compress()
+
+
+def lr_analyse(table, productions, input_str, trace=DEFAULT_TRACE_MODE, tree_format=None):
+    """
+    LR分析总控程序（LR0/SLR1/LR1共用），每一步只查一次整数ACTION表，归约时直接用产生式元数据
+    :param table: LRTable，文法不符合时为None
+    :param productions: Productions，产生式元数据（增广后）
+    :param input_str: 输入串
+    :param trace: 分析过程记录模式（none/summary/full/delta）
+    :param tree_format: 语法树输出格式（arrays/dot），给出时自底向上建树，分析成功后放在 info_tree 中
+    :return: 分析过程info
+    """
+    s = list(input_str)
+    s.append("#")
+    sp = 0  # 字符串指针
+
+    state_stack = []
+    symbol_stack = []
+    state_stack.append(0)
+    symbol_stack.append("#")
+
+    # 只记录两个栈的增量，完整的栈字符串按需重放生成
+    rec = TraceRecorder(trace, "".join(s), (state_stack, symbol_stack), ("info_state_stack", "info_symbol_stack"))
+    info_res = ""
+    t_index = table.t_index if table is not None else {}
+    tree = ParseTree() if tree_format is not None else None
+    node_stack = []  # 与符号栈对应的语法树结点（不含栈底#）
+    # 分析
+    while sp != len(s):
+        ch = s[sp]
+        top_state = state_stack[-1]
+        rec.step(sp)
+        col = t_index.get(ch)
+        action = table.action_at(top_state, col) if col is not None else ERROR
+        if action == ERROR:
+            info_res = f"error：分析失败，找不到Action({(top_state, ch)})"
+            rec.msg("error")
+            break
+
+        if action == ACC:
+            rec.msg("acc: 分析成功！")
+            info_res = "Success!"
+            break
+        elif action > 0:  # 移进操作
+            state_stack.append(action)
+            symbol_stack.append(ch)
+            rec.push(0, (action,))
+            rec.push(1, (ch,))
+            if tree is not None:
+                node_stack.append(tree.add(ch))
+            sp += 1
+            msg = f"Action[{top_state},{ch}]=s{action}: 状态{action}入栈"
+        else:  # 归约操作
+            p = -action  # 第p个产生式
+            pro_right_num = productions.rhs_len[p]
+            if pro_right_num:
+                del state_stack[-pro_right_num:]
+                del symbol_stack[-pro_right_num:]
+                rec.pop(0, pro_right_num)
+                rec.pop(1, pro_right_num)
+            pro_left = productions.left[p]
+            if tree is not None:  # 右部的结点成为新结点的子结点，ε产生式的子结点为ε
+                if pro_right_num:
+                    children = node_stack[-pro_right_num:]
+                    del node_stack[-pro_right_num:]
+                else:
+                    children = [tree.add('ε')]
+                node_stack.append(tree.reduce(pro_left, children))
+            symbol_stack.append(pro_left)
+            rec.push(1, (pro_left,))
+            to_state = table.goto_at(state_stack[-1], productions.lhs_id[p])
+            if to_state != NO_GOTO:
+                msg = f"Action[{top_state},{ch}]=r{p}: 用{productions.display[p]}归约，Goto[{state_stack[-1]},{pro_left}]={to_state}入栈"
+                state_stack.append(to_state)
+                rec.push(0, (to_state,))
+            else:
+                info_res = f"error：分析失败，找不到GOTO({state_stack[-1]},{pro_left})"
+                rec.msg("error")
+                break
+        rec.msg(msg)
+
+    info = rec.to_info(info_res)
+    if tree is not None:
+        if info_res == "Success!":
+            tree.root = node_stack[-1]
+            info["info_tree"] = tree.export(tree_format)
+        else:
+            info["info_tree"] = None
+    return info
@@ -0,0 +1,119 @@
+"""
+分析过程记录器（LL1/LR0/SLR1/LR1 分析总控程序共用）
+每一步只记录栈的增量（出栈个数、入栈符号）和输入串指针，记录开销与步数成线性关系，
+完整的栈/剩余输入串字符串只在需要时重放生成
+
+trace 模式：
+    none:    只返回分析结果 info_res
+    summary: 分析结果 + 步数 + 最后一步的说明
+    full:    完整分析过程（默认，与原接口格式一致）
+    delta:   增量形式的分析过程，由前端展开
+"""
+
+TRACE_MODES = ('none', 'summary', 'full', 'delta')
+DEFAULT_TRACE_MODE = 'full'
+
+
+def parse_trace_mode(mode):
+    """请求参数 -> trace 模式，非法值按默认处理"""
+    return mode if mode in TRACE_MODES else DEFAULT_TRACE_MODE
+
+
+class TraceRecorder:
+    """
+    记录若干个栈（LL1为符号栈；LR为状态栈、符号栈）的增量
+        deltas[i] = [输入指针, 栈0出栈个数, 栈0入栈列表, 栈1出栈个数, 栈1入栈列表, ...]
+    表示第i步开始时相对上一步的变化（第1步相对初始栈）
+    """
+
+    def __init__(self, mode, input_str, stacks, stack_keys):
+        """
+        :param mode: trace 模式
+        :param input_str: 加上#之后的输入串
+        :param stacks: 各栈的初始内容
+        :param stack_keys: 各栈在 full 模式下的输出字段名，如 ("info_stack",)
+        """
+        self.mode = mode
+        self.record = mode in ('full', 'delta')  # 是否逐步记录
+        self.input_str = input_str
+        self.init_stacks = [list(stack) for stack in stacks]
+        self.stack_keys = stack_keys
+        self.steps = 0
+        self.deltas = []
+        self.msgs = []
+        self.last_msg = ""
+        self._pops = [0] * len(stacks)  # 本步尚未提交的出栈个数
+        self._pushes = [[] for _ in stacks]  # 本步尚未提交的入栈符号
+
+    def step(self, sp):
+        """新的一步开始：提交上一步以来的增量"""
+        self.steps += 1
+        if not self.record:
+            return
+        delta = [sp]
+        for k in range(len(self._pops)):
+            delta.append(self._pops[k])
+            delta.append(self._pushes[k])
+            self._pops[k] = 0
+            self._pushes[k] = []
+        self.deltas.append(delta)
+
+    def pop(self, k, n=1):
+        if not self.record:
+            return
+        pushes = self._pushes[k]
+        while n and pushes:  # 先抵消本步内刚入栈的符号
+            pushes.pop()
+            n -= 1
+        self._pops[k] += n
+
+    def push(self, k, items):
+        if self.record:
+            self._pushes[k].extend(items)
+
+    def msg(self, msg):
+        self.last_msg = msg
+        if self.record:
+            self.msgs.append(msg)
+
+    def replay(self):
+        """重放增量，生成每一步的栈字符串和剩余输入串"""
+        stacks = [list(stack) for stack in self.init_stacks]
+        stack_strs = [[] for _ in stacks]
+        info_str = []
+        for delta in self.deltas:
+            for k, stack in enumerate(stacks):
+                n = delta[2 * k + 1]
+                if n:
+                    del stack[-n:]
+                stack.extend(delta[2 * k + 2])
+                stack_strs[k].append("".join([str(x) for x in stack]))
+            info_str.append(self.input_str[delta[0]:])
+        return stack_strs, info_str
+
+    def to_info(self, info_res):
+        """按 trace 模式生成分析过程info"""
+        if self.mode == 'none':
+            return {"info_res": info_res}
+        if self.mode == 'summary':
+            return {
+                "info_steps": self.steps,
+                "info_last_msg": self.last_msg,
+                "info_res": info_res
+            }
+        if self.mode == 'delta':
+            return {
+                "info_input": self.input_str,
+                "info_init": self.init_stacks,
+                "info_delta": self.deltas,
+                "info_msg": self.msgs,
+                "info_res": info_res
+            }
+        stack_strs, info_str = self.replay()
+        info = {"info_step": list(range(1, self.steps + 1))}
+        for key, strs in zip(self.stack_keys, stack_strs):
+            info[key] = strs
+        info["info_str"] = info_str
+        info["info_msg"] = self.msgs
+        info["info_res"] = info_res
+        return info
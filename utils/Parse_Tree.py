@@ -0,0 +1,97 @@
+"""
+语法分析树（LL1/LR0/SLR1/LR1 分析总控程序共用）
+结点存放在并行的整数数组中（arena），不为每个结点创建Python对象：
+    symbol[i]:       结点i的符号在 symbols 中的序号
+    first_child[i]:  第一个子结点，-1 表示叶子
+    next_sibling[i]: 下一个兄弟结点，-1 表示没有
+每个结点只在创建时写入一次，建树的开销与分析步数成线性关系
+
+tree 格式（请求参数）：
+    arrays: 扁平数组 {"symbols", "symbol", "firstChild", "nextSibling", "root"}
+    dot:    graphviz DOT 源码
+"""
+from array import array
+
+import graphviz
+
+TREE_FORMATS = ('arrays', 'dot')
+NONE = -1  # 没有子结点/兄弟结点
+
+
+def parse_tree_format(value):
+    """请求参数 -> 语法树输出格式，不输出时为None"""
+    return value if value in TREE_FORMATS else None
+
+
+class ParseTree:
+    def __init__(self):
+        self.symbols = []  # 符号表
+        self.symbol_ids = {}  # 符号 -> 序号
+        self.symbol = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.root = NONE
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def add(self, symbol):
+        """新建一个结点（暂无子结点和兄弟结点），返回结点号"""
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            sid = self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        self.symbol.append(sid)
+        self.first_child.append(NONE)
+        self.next_sibling.append(NONE)
+        return len(self.symbol) - 1
+
+    def link(self, parent, children):
+        """设置 parent 的子结点（按从左到右的顺序）"""
+        if not children:
+            return
+        self.first_child[parent] = children[0]
+        for left, right in zip(children, children[1:]):
+            self.next_sibling[left] = right
+
+    def expand(self, parent, symbols):
+        """自顶向下建树：为 parent 新建子结点 symbols（从左到右），返回子结点号列表"""
+        children = [self.add(symbol) for symbol in symbols]
+        self.link(parent, children)
+        return children
+
+    def reduce(self, symbol, children):
+        """自底向上建树：新建结点 symbol，以 children（从左到右）为子结点，返回结点号"""
+        node = self.add(symbol)
+        self.link(node, children)
+        return node
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child != NONE:
+            yield child
+            child = self.next_sibling[child]
+
+    def to_arrays(self):
+        return {
+            "symbols": self.symbols,
+            "symbol": self.symbol.tolist(),
+            "firstChild": self.first_child.tolist(),
+            "nextSibling": self.next_sibling.tolist(),
+            "root": self.root
+        }
+
+    def to_dot(self):
+        dot = graphviz.Digraph(comment='ParseTree', graph_attr={'ordering': 'out'})
+        for i in range(len(self.symbol)):
+            symbol = self.symbols[self.symbol[i]]
+            leaf = self.first_child[i] == NONE
+            dot.node(str(i), label=symbol, shape='plaintext' if leaf else 'ellipse',
+                     fontcolor='red' if leaf else 'black', fontname='Verdana')
+        for i in range(len(self.symbol)):
+            for child in self.children(i):
+                dot.edge(str(i), str(child))
+        return dot.source
+
+    def export(self, tree_format):
+        return self.to_dot() if tree_format == 'dot' else self.to_arrays()
@@ -0,0 +1,175 @@
+"""
+由分析表生成专用的 Python 分析程序（也可下载作为教学材料）
+    LL(1): 递归下降分析程序，每个非终结符一个函数，按向前看字符选择候选式
+    LR:    每个状态一个 {终结符: 动作} 字典、{非终结符: 状态} 字典的表驱动程序，
+           动作编码与 LRTable 相同（移进 -> 正的状态号，归约 -> 负的产生式序号，接受 -> ACC）
+生成的程序只判断输入串是否合法，结论（info_res）与分析器的 solve() 完全一致：
+    parse(text) -> "Success!" 或出错信息
+生成的源码会被 exec() 执行：文法中的字符串（产生式、符号）只以 repr() 字面量的形式出现，不写入注释或标识符
+"""
+from utils.LR_Table import ACC, ERROR, NO_GOTO
+
+SUCCESS = "Success!"
+
+
+def _tuple_literal(name, items, comment):
+    """字符串元组常量，每项一行（repr 转义换行等字符，不会改变源码结构）"""
+    return [f"{name} = (  # {comment}"] + [f"    {item!r}," for item in items] + [")"]
+
+
+def _set_literal(symbols):
+    """终结符集合的字面量，单个符号时直接比较"""
+    symbols = sorted(symbols)
+    if len(symbols) == 1:
+        return "== " + repr(symbols[0])
+    return "in {" + ", ".join(repr(t) for t in symbols) + "}"
+
+
+def _function_name(vn, names):
+    return names.setdefault(vn, f"parse_{vn}" if vn.isascii() and vn.isidentifier() else f"parse_{len(names)}")
+
+
+def ll1_parser_source(ll1):
+    """
+    LL(1) 递归下降分析程序的源码，文法不是LL(1)文法时为None
+    :param ll1: 已 init() 的LL1分析器
+    """
+    if not ll1.isLL1:
+        return None
+    names = {}
+    for vn in ll1.formulas_dict:
+        _function_name(vn, names)
+    grammar = [left + "->" + "|".join(right) for left, right in ll1.formulas_dict.items()]
+    out = [
+        '"""',
+        "LL(1) 递归下降分析程序（由预测分析表自动生成）",
+        "每个非终结符对应一个函数：按当前字符选择候选式，依次匹配终结符、调用非终结符的函数",
+        '"""',
+        *_tuple_literal("GRAMMAR", grammar, "文法"),
+        "",
+        "",
+        "class ParseError(Exception):",
+        "    pass",
+        "",
+    ]
+    for vn, right in ll1.formulas_dict.items():
+        by_candidate = {}  # 候选式 -> 选择它的终结符（保持候选式顺序）
+        for r_candidate in right:
+            by_candidate[r_candidate] = []
+        for (left, vt), r_candidate in ll1.table.items():
+            if left == vn:
+                by_candidate.setdefault(r_candidate, []).append(vt)
+        out += ["", f"def {names[vn]}(s, i):", "    c = s[i]"]
+        for r_candidate, terminals in by_candidate.items():
+            if not terminals:
+                continue
+            out.append(f"    if c {_set_literal(terminals)}:")
+            for symbol in r_candidate:
+                if symbol == 'ε':
+                    continue
+                if symbol in names:
+                    out.append(f"        i = {names[symbol]}(s, i)")
+                else:
+                    out += [f"        if s[i] != {symbol!r}:",
+                            f"            raise ParseError({'error: 栈顶元素' + symbol + ' 与 字符'!r} + s[i] + ' 不匹配!')",
+                            "        i += 1"]
+            out.append("        return i")
+        out.append(f"    raise ParseError({'error: table找不到匹配的(' + vn + ','!r} + c + ')')")
+    out += [
+        "",
+        "",
+        "def parse(text):",
+        "    s = text + '#'",
+        "    try:",
+        f"        i = {names[ll1.S]}(s, 0)",
+        "        if s[i] != '#':",
+        "            raise ParseError('error: 栈顶元素# 与 字符' + s[i] + ' 不匹配!')",
+        "    except ParseError as e:",
+        "        return str(e)",
+        f"    return {SUCCESS!r}",
+    ]
+    return _with_main(out)
+
+
+def lr_parser_source(analyzer, title):
+    """
+    LR 表驱动分析程序的源码，分析表未构造（文法不符合）时为None
+    :param analyzer: 已 init() 的 LR0/SLR1/LR1 分析器
+    :param title: 分析方法名，如 "SLR(1)"
+    """
+    table = analyzer.table
+    productions = analyzer.productions
+    if table is None:
+        return None
+    out = [
+        '"""',
+        f"{title} 分析程序（由 ACTION/GOTO 表自动生成）",
+        "ACTION[状态]: {终结符: 动作}，移进为正的状态号，归约为负的产生式序号，接受为 ACC",
+        "GOTO[状态]: {非终结符: 状态号}",
+        '"""',
+        *_tuple_literal("PRODUCTIONS", productions.display, "产生式，下标为产生式序号"),
+        "",
+        f"ACC = {ACC}",
+        "",
+        "ACTION = [",
+    ]
+    for state in range(table.n_states):
+        entries = []
+        for col, vt in enumerate(table.terminals):
+            action = table.action_at(state, col)
+            if action != ERROR:
+                entries.append(f"{vt!r}: {'ACC' if action == ACC else action}")
+        out.append(f"    {{{', '.join(entries)}}},  # I{state}")
+    out += ["]", "", "GOTO = ["]
+    for state in range(table.n_states):
+        entries = []
+        for col, vn in enumerate(table.nonterminals):
+            to_state = table.goto_at(state, col)
+            if to_state != NO_GOTO:
+                entries.append(f"{vn!r}: {to_state}")
+        out.append(f"    {{{', '.join(entries)}}},  # I{state}")
+    out += [
+        "]",
+        "",
+        f"LHS = {tuple(productions.left)!r}  # 各产生式的左部",
+        f"RHS_LEN = {tuple(productions.rhs_len)!r}  # 各产生式右部的长度",
+        "",
+        "",
+        "def parse(text):",
+        "    s = text + '#'",
+        "    i = 0",
+        "    states = [0]",
+        "    while True:",
+        "        state = states[-1]",
+        "        c = s[i]",
+        "        action = ACTION[state].get(c, 0)",
+        "        if action == 0:",
+        "            return f\"error：分析失败，找不到Action({(state, c)})\"",
+        "        if action == ACC:",
+        f"            return {SUCCESS!r}",
+        "        if action > 0:  # 移进",
+        "            states.append(action)",
+        "            i += 1",
+        "            continue",
+        "        n = RHS_LEN[-action]  # 归约",
+        "        if n:",
+        "            del states[-n:]",
+        "        to_state = GOTO[states[-1]].get(LHS[-action])",
+        "        if to_state is None:",
+        "            return f\"error：分析失败，找不到GOTO({states[-1]},{LHS[-action]})\"",
+        "        states.append(to_state)",
+    ]
+    return _with_main(out)
+
+
+def _with_main(out):
+    out += [
+        "",
+        "",
+        "if __name__ == \"__main__\":",
+        "    import sys",
+        "    for line in sys.argv[1:] or sys.stdin.read().split():",
+        "        print(line, parse(line))",
+        "",
+    ]
+    return "\n".join(out)
@@ -30,6 +30,14 @@ class State:
         all_validate_State[self.id] = self
 
 
+def reset_state():
+    """重置模块级全局状态，每次由正则表达式构造自动机前调用"""
+    global all_validate_State, nfa_state_id_map
+    all_validate_State = {}
+    nfa_state_id_map = bidict()
+    State._id_counter = 0
+
+
 def is_valid_regex(regex):
     stack = []
     i = 0
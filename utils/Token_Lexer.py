@@ -0,0 +1,128 @@
+"""
+词法分析（输入串 -> 单词序列），供按单词书写的文法（utils/Grammar_Tokens.py）分析输入串
+    单词类别由正则表达式定义，每个正则表达式经 Regex_to_DFAM 转为最小化DFA，按DFA逐字符识别；
+    正则表达式的写法与有限自动机接口相同（| * () ε），另外可以用字符类 [a-z0-9_]（展开为 (a|b|...)）
+    文法中加引号的字面终结符按原文匹配
+    最长匹配：每个位置取能识别的最长单词，长度相同时字面终结符优先（关键字优先于标识符），其次按定义顺序
+    单词之间的空白字符跳过；名字以 _ 开头的单词类别（如注释）识别后丢弃
+"""
+import utils.Regex_to_DFAM as RF
+
+WHITESPACE = " \t\r\n"
+REGEX_META = set("()*|•ε")
+
+
+class LexError(ValueError):
+    def __init__(self, position, char):
+        super().__init__(f"词法错误：第{position + 1}个字符 {char} 无法识别")
+        self.position = position
+        self.char = char
+
+
+def expand_classes(regex):
+    """字符类 [a-z0-9_] 展开为 (a|b|...)，不合法时返回None"""
+    result = []
+    i = 0
+    while i < len(regex):
+        if regex[i] != '[':
+            result.append(regex[i])
+            i += 1
+            continue
+        end = regex.find(']', i + 1)
+        if end < 0:
+            return None
+        body = regex[i + 1:end]
+        chars = []
+        j = 0
+        while j < len(body):
+            if j + 2 < len(body) and body[j + 1] == '-':
+                chars.extend(chr(c) for c in range(ord(body[j]), ord(body[j + 2]) + 1))
+                j += 3
+            else:
+                chars.append(body[j])
+                j += 1
+        chars = list(dict.fromkeys(chars))
+        if not chars or any(ch in REGEX_META for ch in chars):
+            return None
+        result.append("(" + "|".join(chars) + ")")
+        i = end + 1
+    return "".join(result)
+
+
+class TokenDFA:
+    """由正则表达式构造的最小化DFA：start 初态，accepting 终态集合，moves[状态] = {字符: 下一状态}"""
+
+    def __init__(self, regex):
+        expanded = expand_classes(regex)
+        if expanded is None or not RF.is_valid_regex(expanded):
+            raise ValueError(f"不合规的正则表达式：{regex}")
+        RF.reset_state()
+        regex, cins = RF.insert_concatenation(expanded)
+        nfa, _ = RF.Regex_to_NFA(RF.shunt(regex))
+        _, table_to_num, initial_states, termination_states, transition_map, _ = RF.NFA_to_DFA(nfa, cins)
+        P, _, table_to_num_min, _ = RF.Min_DFA(table_to_num, initial_states, termination_states,
+                                               transition_map, cins)
+        self.start = next(i for i, group in enumerate(P) if any(s in initial_states for s in group))
+        self.accepting = {i for i, group in enumerate(P) if group[0] in termination_states}
+        self.moves = [{} for _ in P]
+        for ch, targets in table_to_num_min.items():
+            if ch == 'S':
+                continue
+            for i, target in enumerate(targets):
+                if target != "":
+                    self.moves[i][ch] = int(target)
+
+    def match(self, text, pos):
+        """从 pos 开始能识别的最长单词的长度，识别不了时为-1"""
+        state = self.start
+        longest = 0 if state in self.accepting else -1
+        moves = self.moves
+        i = pos
+        while i < len(text):
+            state = moves[state].get(text[i])
+            if state is None:
+                break
+            i += 1
+            if state in self.accepting:
+                longest = i - pos
+        return longest
+
+
+class Lexer:
+    def __init__(self, definitions, literals=()):
+        """
+        :param definitions: 单词类别 [(名字, 正则表达式), ...]，按优先顺序
+        :param literals: 字面终结符
+        """
+        self.dfas = [(name, TokenDFA(regex)) for name, regex in definitions]
+        self.literals = sorted(literals, key=len, reverse=True)
+
+    def next_token(self, text, pos):
+        """pos 处的最长单词 (名字, 长度)，名字为None表示字面终结符"""
+        best = None
+        for literal in self.literals:  # 按长度从长到短，第一个匹配的就是最长的字面终结符
+            if text.startswith(literal, pos):
+                best = (literal, len(literal), True)
+                break
+        for name, dfa in self.dfas:
+            length = dfa.match(text, pos)
+            if length > 0 and (best is None or length > best[1]):
+                best = (name, length, False)
+        return best
+
+    def tokenize(self, text):
+        """输入串 -> [(单词类别或字面终结符, 原文, 起始位置), ...]，无法识别时抛出 LexError"""
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            if text[pos] in WHITESPACE:
+                pos += 1
+                continue
+            best = self.next_token(text, pos)
+            if best is None:
+                raise LexError(pos, text[pos])
+            name, length, _ = best
+            if not name.startswith('_') or best[2]:
+                tokens.append((name, text[pos:pos + length], pos))
+            pos += length
+        return tokens